@@ -0,0 +1,390 @@
+"""性能测试脚本。
+
+    python bench.py history [--sizes 1000,100000,1000000] [--backend json|sqlite]
+    python bench.py compare [--size 10000000]
+    python bench.py parallel [--count 200000] [--max-workers N]
+    python bench.py writes [--base 100000] [--appends 200]
+    python bench.py index [--size 10000000]
+    python bench.py suite [--full] [-o results.json] [--save-baseline] [--tolerance 0.25]
+
+在临时目录里生成合成数据，不会改动程序目录下的真实数据文件。
+"""
+import argparse, itertools, json, os, platform, random, statistics, sys, tempfile, time
+from array import array
+from pathlib import Path
+
+HERE = Path(os.path.abspath(os.path.dirname(__file__)))
+
+def load_app():
+    """导入本目录下的 dualcolorball 包（不会加载 tkinter）。"""
+    if str(HERE) not in sys.path:
+        sys.path.insert(0, str(HERE))
+    import dualcolorball
+    return dualcolorball
+
+def timeit(fn, repeat=7):
+    """返回 fn 多次运行耗时的中位数（秒）。"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+def write_history(app, path, n):
+    """写入 n 条合成历史记录，按块重复以便快速生成大文件。"""
+    from dualcolorball.tickets import _json_line
+    block = "".join(
+        _json_line({"reds": sorted(random.sample(range(1, 34), 6)),
+                    "blue": random.randint(1, 16), "ts": 1755070882.5712533})
+        for _ in range(1000))
+    with open(path, "w", encoding="utf-8") as f:
+        full, rest = divmod(n, 1000)
+        for _ in range(full):
+            f.write(block)
+        f.write("".join(block.splitlines(True)[:rest]))
+
+def bench_history(args):
+    app = load_app()
+    print(f"{'records':>12} {'file MB':>9} {'list_history(50) ms':>20} {'query_history ms':>17}")
+    with tempfile.TemporaryDirectory() as d:
+        store = app.use_storage(app.JsonStorage(d))
+        for n in args.sizes:
+            write_history(app, store.history_path, n)
+            path = store.history_path
+            if args.backend == "sqlite":
+                db = Path(d) / f"bench{n}.db"
+                app.migrate_json_to_sqlite(d, db)
+                store = app.use_storage(app.SqliteStorage(db))
+                path = db
+            mb = path.stat().st_size / 1e6
+            def cold():
+                if args.backend == "json":
+                    store._history_cache = None   # 测的是尾部读取本身，不走进程内缓存
+                app.list_history(50)
+            t = timeit(cold)
+            q = timeit(lambda: app.query_history([7], 12, limit=50), repeat=3)
+            print(f"{n:>12} {mb:>9.1f} {t * 1000:>20.3f} {q * 1000:>17.3f}")
+            store = app.use_storage(app.JsonStorage(d))
+
+def bench_compare(args):
+    app = load_app()
+    pool = [app.Ticket(sorted(random.sample(range(1, 34), 6)), random.randint(1, 16))
+            for _ in range(10000)]
+    masks = array("Q", app.ticket_masks(pool)) * (args.size // len(pool))
+    draw = app.Ticket((3, 8, 15, 21, 27, 33), 9)
+    t = timeit(lambda: app.compare_many(draw, masks), repeat=3)
+    print(f"compare_many: {len(masks)} tickets in {t * 1000:.1f} ms "
+          f"({len(masks) / t / 1e6:.1f} M tickets/s)")
+
+def bench_parallel(args):
+    app = load_app()
+    cond = {"red_ranges": [(1, 20, 3), (21, 33, 3)], "odd_count": 3, "sum_range": (80, 120)}
+    top = args.max_workers or os.cpu_count() or 1
+    print(f"generate_parallel: {args.count} 条件号码, cpu_count={os.cpu_count()}")
+    print(f"{'workers':>8} {'seconds':>9} {'tickets/s':>12} {'speedup':>8}")
+    first = None
+    w = 1
+    while True:
+        t = timeit(lambda: app.generate_parallel(args.count, w, seed=1, conditions=cond, append=False),
+                   repeat=3)
+        first = first or t
+        print(f"{w:>8} {t:>9.2f} {args.count / t:>12,.0f} {first / t:>8.2f}")
+        if w >= top:
+            break
+        w = min(w * 2, top)
+
+def legacy_append(path, tickets):
+    """改版前的 _append_history：读入整个 history.json，追加后带缩进整体重写。"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except:
+        data = []
+    data.extend({"reds": list(t.reds), "blue": t.blue, "ts": t.ts} for t in tickets)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def bench_writes(args):
+    app = load_app()
+    batch = [app.Ticket(sorted(random.sample(range(1, 34), 6)), random.randint(1, 16), time.time())
+             for _ in range(5)]
+    print(f"每次追加 5 注，已有历史 {args.base} 条，共追加 {args.appends} 次")
+    print(f"{'mode':<28} {'seconds':>9} {'appends/s':>11}")
+    with tempfile.TemporaryDirectory() as d:
+        legacy = Path(d) / "history.json"
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump([{"reds": [1, 2, 3, 4, 5, 6], "blue": 7, "ts": 0.0}] * args.base, f, indent=2)
+        n = max(1, args.appends // 20)   # 旧方式太慢，只跑一部分再折算
+        t0 = time.perf_counter()
+        for _ in range(n):
+            legacy_append(legacy, batch)
+        t = (time.perf_counter() - t0) / n * args.appends
+        print(f"{'json rewrite (before)':<28} {t:>9.2f} {args.appends / t:>11.1f}")
+
+        store = app.use_storage(app.JsonStorage(d))
+        write_history(app, store.history_path, args.base)
+        app.migrate_json_to_sqlite(d, Path(d) / "bench.db")
+        from dualcolorball.records import _append_history
+        for label, window in (("jsonl append + fsync", 0), ("jsonl coalesced 50ms", 0.05),
+                              ("sqlite transaction", None)):
+            if window is None:
+                app.use_storage(app.SqliteStorage(Path(d) / "bench.db"))
+                window = 0
+            app.set_write_coalescing(window)
+            t0 = time.perf_counter()
+            for _ in range(args.appends):
+                _append_history(batch)
+            app.flush_history()
+            t = time.perf_counter() - t0
+            print(f"{label:<28} {t:>9.3f} {args.appends / t:>11.1f}")
+        app.set_write_coalescing(0)
+        app.use_storage(app.JsonStorage(d))
+
+def bench_index(args):
+    app = load_app()
+    rng = random.Random(1)
+    pool = array("Q", (app.Ticket(sorted(rng.sample(range(1, 34), 6)), rng.randint(1, 16)).to_mask()
+                       for _ in range(10000)))
+    masks = pool * (args.size // len(pool))
+    t0 = time.perf_counter()
+    idx = app.TicketIndex(masks)
+    print(f"build: {len(masks)} tickets in {time.perf_counter() - t0:.2f} s")
+    t0 = time.perf_counter()
+    data = idx.dumps([0])
+    t1 = time.perf_counter()
+    app.TicketIndex.loads(data, [0])
+    print(f"dumps {t1 - t0:.2f} s, loads {time.perf_counter() - t1:.2f} s, {len(data) / 1e6:.1f} MB")
+    probe = (3, 8, 15, 21, 27, 33)
+    for label, fn in (("contains_all {3,17,22}", lambda: idx.contains_all((3, 17, 22))),
+                      ("contains_all {7} + blue 12", lambda: idx.contains_all((7,), 12)),
+                      ("contains_any {3,17,22}", lambda: idx.contains_any((3, 17, 22))),
+                      ("at_least 4 of a ticket", lambda: idx.at_least(probe, 4)),
+                      ("at_least 4 + positions(50)", lambda: idx.positions(idx.at_least(probe, 4), 50, True))):
+        t = timeit(fn, repeat=5)
+        print(f"{label:<28} {t * 1000:>9.1f} ms")
+
+# ====== 基准套件 ======
+# 每个用例给出单次运行耗时（多次取中位数）和每次处理的条数 ops，另附用例自己的指标。
+# 结果可写成 JSON；给出基准文件时逐项比较“每条耗时”，变慢超过容差即判为退化，退出码为 1。
+
+SUITE_SIZES = {"quick": (1000, 100000), "full": (1000, 100000, 1000000)}
+LOOSE = {"odd_count": 3}
+TIGHT = {"red_ranges": [(1, 11, 2), (12, 22, 2), (23, 33, 2)], "odd_count": 3, "sum_range": (100, 102),
+         "exclude_blues": list(range(1, 13))}
+
+def fixture_masks(app, n, seed=1):
+    """n 注可复现的随机号码掩码（可能有重复）。"""
+    masks = array("Q")
+    for chunk in app.iter_bulk_tickets(n, seed=seed):
+        masks.extend(chunk)
+    return masks
+
+def fixture_unique(app, n, seed=1):
+    """n 注互不相同的 Ticket。"""
+    keys = dict.fromkeys(fixture_masks(app, n + n // 8 + 100, seed))
+    return [app.Ticket.from_mask(k) for k in itertools.islice(keys, n)]
+
+def fixture_favorites(app, path, n, seed=1):
+    """直接写出含 n 注收藏的 favorites.jsonl，返回这些号码。"""
+    from dualcolorball.tickets import _json_line, _dict_from_ticket
+    tickets = fixture_unique(app, n, seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(_json_line(_dict_from_ticket(t)) for t in tickets)
+    return tickets
+
+def synthetic_weights(skew):
+    """冷热权重：号码越小权重越大，skew 越大越偏（0 为均匀）。"""
+    return ([0.0] + [1 - skew * (r - 1) / 32 for r in range(1, 34)],
+            [0.0] + [1 - skew * (b - 1) / 15 for b in range(1, 17)])
+
+def measure(fn, repeat=5, setup=None):
+    """fn 多次运行耗时的中位数（秒）；setup 在每次计时前调用，不计入耗时。"""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+def _case(seconds, ops, **extra):
+    return {"seconds": seconds, "ops": ops, "per_op_us": seconds / ops * 1e6, **extra}
+
+def counted(fn, *names):
+    """运行 fn 并返回期间 instrument 计数器 names 各自的增量（临时打开统计）。"""
+    from dualcolorball import instrument
+    was = instrument.ENABLED
+    before = instrument.snapshot()["counters"]
+    instrument.enable()
+    try:
+        fn()
+    finally:
+        instrument.enable(was)
+    after = instrument.snapshot()["counters"]
+    return [after.get(n, 0) - before.get(n, 0) for n in names]
+
+def suite_generate(app, d, res, mode):
+    app.use_storage(app.JsonStorage(d))
+    res["generate_random_tickets[1000]"] = _case(measure(lambda: app.generate_random_tickets(1000)), 1000)
+    for label, cond in (("loose", LOOSE), ("tight", TIGHT)):
+        total = app.count_with_conditions(**cond)["total"]
+        count = min(1000, total)
+        for skew in (None, 0.5, 0.9):
+            kw = dict(cond, weights=None if skew is None else synthetic_weights(skew))
+            run = lambda: app.generate_with_conditions(count, **kw)
+            t = measure(run, repeat=5 if skew is None else 3)
+            # 每采用一注的试抽次数取自 tickets.attempts / tickets.accepted 计数器，单独跑一次统计
+            attempts, accepted = counted(run, "tickets.attempts", "tickets.accepted")
+            name = label if skew is None else f"{label},weighted {skew}"
+            res[f"generate_with_conditions[{name}]"] = _case(t, count, combos=total,
+                                                             attempts_per_ticket=attempts / accepted)
+
+def suite_history(app, d, res, mode):
+    batch = [app.Ticket(sorted(random.sample(range(1, 34), 6)), random.randint(1, 16), time.time())
+             for _ in range(5)]
+    from dualcolorball.records import _append_history
+    for n in SUITE_SIZES[mode]:
+        sub = Path(d) / f"history{n}"
+        sub.mkdir()
+        store = app.use_storage(app.JsonStorage(sub))
+        write_history(app, store.history_path, n)
+        app.set_write_coalescing(0)
+        res[f"_append_history[{n}]"] = _case(measure(lambda: _append_history(batch), repeat=20), 5)
+        def cold():
+            store._history_cache = None   # 测尾部读取本身，不走进程内缓存
+        res[f"list_history(50)[{n}]"] = _case(measure(lambda: app.list_history(50), setup=cold), 50)
+        res[f"list_history(all)[{n}]"] = _case(measure(lambda: app.list_history(0), repeat=3, setup=cold),
+                                                n + 100)
+        app.use_storage(app.JsonStorage(d))
+
+def suite_favorites(app, d, res, mode):
+    k = 200
+    for n in SUITE_SIZES[mode]:
+        sub = Path(d) / f"favorites{n}"
+        sub.mkdir()
+        store = app.use_storage(app.JsonStorage(sub))
+        have = fixture_favorites(app, store.favorites.path, n)
+        t0 = time.perf_counter()
+        app.is_favorite(have[0])
+        res[f"favorites load[{n}]"] = _case(time.perf_counter() - t0, n)
+        fresh = [t for t in fixture_unique(app, n + k, seed=2) if not app.is_favorite(t)][:k]
+        saves, removes = [], []
+        for _ in range(3):
+            t0 = time.perf_counter()
+            for t in fresh:
+                app.save_favorite(t)
+            t1 = time.perf_counter()
+            for t in fresh:
+                app.remove_favorite(t)
+            saves.append(t1 - t0)
+            removes.append(time.perf_counter() - t1)
+        res[f"save_favorite[{n}]"] = _case(statistics.median(saves), len(fresh))
+        res[f"remove_favorite[{n}]"] = _case(statistics.median(removes), len(fresh))
+        app.use_storage(app.JsonStorage(d))
+
+def suite_compare(app, d, res, mode):
+    draw = app.Ticket((3, 8, 15, 21, 27, 33), 9)
+    pool = [app.Ticket.from_mask(m) for m in fixture_masks(app, 100000)]
+    res["compare_ticket[100000]"] = _case(
+        measure(lambda: [app.compare_ticket(draw, t) for t in pool], repeat=3), len(pool))
+    big = 1000000 if mode == "quick" else 10000000
+    masks = fixture_masks(app, big)
+    res[f"compare_many[{big}]"] = _case(measure(lambda: app.compare_many(draw, masks), repeat=3), big)
+    res[f"prize_summary[{big}]"] = _case(measure(lambda: app.prize_summary(draw, masks), repeat=3), big)
+
+SUITE = (("generate", suite_generate), ("history", suite_history),
+         ("favorites", suite_favorites), ("compare", suite_compare))
+
+def compare_baseline(results, baseline, tolerance):
+    """逐项对比每条耗时，返回退化的用例名列表。"""
+    old = baseline.get("results", {})
+    bad = []
+    print(f"\n{'case':<48} {'per op us':>11} {'baseline':>11} {'ratio':>7} {'tries':>6}")
+    for name, r in results.items():
+        tries = f"{r['attempts_per_ticket']:.1f}" if "attempts_per_ticket" in r else ""
+        if name not in old:
+            print(f"{name:<48} {r['per_op_us']:>11.3f} {'-':>11} {'-':>7} {tries:>6}")
+            continue
+        ratio = r["per_op_us"] / old[name]["per_op_us"] if old[name]["per_op_us"] else 1.0
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  <-- 退化"
+            bad.append(name)
+        print(f"{name:<48} {r['per_op_us']:>11.3f} {old[name]['per_op_us']:>11.3f} {ratio:>7.2f} {tries:>6}{flag}")
+    return bad
+
+def bench_suite(args):
+    app = load_app()
+    mode = "full" if args.full else "quick"
+    only = set(args.only.split(",")) if args.only else None
+    random.seed(1)
+    results = {}
+    with tempfile.TemporaryDirectory() as d:
+        for name, fn in SUITE:
+            if only and name not in only:
+                continue
+            t0 = time.perf_counter()
+            fn(app, d, results, mode)
+            print(f"{name:<10} 完成，用时 {time.perf_counter() - t0:.1f} 秒", file=sys.stderr)
+        app.use_storage(app.JsonStorage(HERE))
+    report = {"meta": {"mode": mode, "python": platform.python_version(), "platform": platform.platform(),
+                       "cpu_count": os.cpu_count(), "time": time.strftime("%Y-%m-%d %H:%M:%S")},
+              "results": results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    baseline = Path(args.baseline)
+    if args.save_baseline:
+        with open(baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"已保存基准：{baseline}", file=sys.stderr)
+    if not baseline.exists() or args.save_baseline:
+        compare_baseline(results, {}, args.tolerance)
+        return 0
+    with open(baseline, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    if base.get("meta", {}).get("mode") != mode:
+        print(f"基准是 {base.get('meta', {}).get('mode')} 模式，本次为 {mode}，只比较同名用例", file=sys.stderr)
+    bad = compare_baseline(results, base, args.tolerance)
+    if bad:
+        print(f"\n{len(bad)} 项比基准慢 {args.tolerance:.0%} 以上", file=sys.stderr)
+        return 1
+    return 0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="双色球工具性能测试")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("history", help="list_history 尾部读取延迟随历史规模的变化")
+    p.add_argument("--sizes", default="1000,100000,1000000",
+                   type=lambda s: [int(x) for x in s.split(",")])
+    p.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    p.set_defaults(func=bench_history)
+    p = sub.add_parser("compare", help="compare_many 批量对照吞吐")
+    p.add_argument("--size", type=int, default=10000000)
+    p.set_defaults(func=bench_compare)
+    p = sub.add_parser("parallel", help="generate_parallel 随进程数的扩展性")
+    p.add_argument("--count", type=int, default=200000)
+    p.add_argument("--max-workers", type=int, default=None)
+    p.set_defaults(func=bench_parallel)
+    p = sub.add_parser("writes", help="历史追加写入吞吐：旧的整体重写 vs 追加 vs 合并落盘 vs SQLite")
+    p.add_argument("--base", type=int, default=100000)
+    p.add_argument("--appends", type=int, default=200)
+    p.set_defaults(func=bench_writes)
+    p = sub.add_parser("index", help="号码倒排索引的建立与查询耗时")
+    p.add_argument("--size", type=int, default=10000000)
+    p.set_defaults(func=bench_index)
+    p = sub.add_parser("suite", help="整套基准：选号、历史、收藏、对照，输出 JSON 并与基准比较")
+    p.add_argument("--full", action="store_true", help="加上 100 万条规模（默认只跑 1K / 10 万）")
+    p.add_argument("--only", default=None, help="只跑部分用例组，如 generate,compare")
+    p.add_argument("-o", "--out", default=None, help="把结果写成 JSON 文件")
+    p.add_argument("--baseline", default=str(HERE / "bench_baseline.json"), help="基准结果文件")
+    p.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基准")
+    p.add_argument("--tolerance", type=float, default=0.25, help="每条耗时超过基准的比例，默认 0.25")
+    p.set_defaults(func=bench_suite)
+    args = ap.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""双色球选号核心库：号码模型、选号、存储、对照与统计，不依赖 tkinter。
+
+    from dualcolorball import generate_random_tickets, compare_ticket, load_latest_draw
+
+图形界面在 dualcolorball.gui（导入时才加载 tkinter），命令行在 dualcolorball.cli。
+公开名称按需从各子模块加载，命令行只导入用到的部分，启动更快。
+"""
+import importlib
+
+_EXPORTS = {
+    "tickets": ("Ticket", "Draw", "ticket_masks", "parse_ticket", "BLUE_SHIFT", "RED_MASK"),
+    "storage": ("BASE", "JsonStorage", "SqliteStorage", "get_storage", "use_storage",
+                "migrate_json_to_sqlite"),
+    "records": ("list_history", "query_history", "set_write_coalescing", "flush_history", "remove_history_at",
+                "save_favorite", "remove_favorite", "is_favorite", "list_favorites", "favorite_masks",
+                "update_latest_draw", "load_latest_draw", "add_draw", "add_draws", "get_draw", "get_draw_on", "list_draws",
+                "parse_draws", "parse_draws_text", "import_draws"),
+    "generate": ("ConditionsInfeasible", "GenerationCancelled", "generate_random_tickets",
+                 "generate_with_conditions", "count_with_conditions", "iter_with_conditions",
+                 "iter_bulk_tickets", "bulk_generate", "generate_parallel", "wheel_tickets"),
+    "compare": ("PRIZE_NAMES", "PRIZE_TIERS", "PRIZE_PAYOUTS", "TICKET_PRICE", "prize_tier", "compare_ticket",
+                "compare_many", "compare_tiers", "prize_summary", "iter_draw_scores", "score_tickets",
+                "compare_favorites", "favorites_draw_summaries"),
+    "ranking": ("RED_TOTAL", "TOTAL", "rank", "unrank", "rank_mask", "unrank_mask", "ticket_rank",
+                "ticket_from_rank", "TicketBitmap", "seen_bitmap", "is_seen"),
+    "index": ("TicketIndex", "ticket_index", "tickets_with_all", "tickets_with_any", "tickets_overlapping"),
+    "stats": ("NumberStats", "history_stats", "draw_stats", "hot_cold_weights", "format_stats"),
+    "simulation": ("simulate", "format_simulation"),
+    "archive": ("HistoryArchive", "write_archive", "export_history", "import_history"),
+}
+_WHERE = {name: mod for mod, names in _EXPORTS.items() for name in names}
+__all__ = list(_WHERE)
+
+def __getattr__(name):
+    mod = _WHERE.get(name)
+    if mod is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{mod}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,232 @@
+"""历史号码的定长二进制归档：内存映射读取，按块扫描、对照和统计，内存占用与总量无关。
+
+磁盘格式（两个文件，按列存放，均为小端）：
+    history.bin      16 字节文件头（b"DCBKEYS1" + 8 字节保留），之后每注一个 uint64 掩码（Ticket.to_mask()）
+    history.bin.ts   16 字节文件头（b"DCBTIME1" + 8 字节保留），之后每注一个 float64 时间戳
+注数由文件大小得出；两列长度不一致（追加中途中断）时以短的为准。每注 16 字节，
+JSON Lines 约 65 字节，Ticket 对象则是几百字节。
+
+    with HistoryArchive("history.bin") as ar:
+        ar.keys                     # 映射到文件的 memoryview("Q")，不复制
+        ar.prize_summary(draw)      # 逐块对照
+        ar.stats()                  # 逐块统计，得到 NumberStats
+"""
+import mmap, os, sys
+from array import array
+from pathlib import Path
+
+from . import instrument as _inst
+from .tickets import Ticket
+from .fileio import _fsync
+
+KEYS_MAGIC = b"DCBKEYS1"
+TIME_MAGIC = b"DCBTIME1"
+_HEADER = 16
+_CHUNK = 1 << 20   # 扫描时每块的注数（8 MB 掩码）
+
+def ts_path(path):
+    """掩码文件对应的时间戳文件。"""
+    path = Path(path)
+    return path.with_name(path.name + ".ts")
+
+def _map_column(path, magic, fmt):
+    """只读映射一列，返回 (mmap 或 None, memoryview)。大端机器上退回到复制并翻转字节序的 array。"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return None, memoryview(array(fmt))
+        head = f.read(_HEADER)
+        if len(head) < _HEADER or head[:8] != magic:
+            raise ValueError(f"不是号码归档文件：{path}")
+        n = (size - _HEADER) // 8
+        if n == 0:
+            return None, memoryview(array(fmt))
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if sys.byteorder == "little":
+        return mm, memoryview(mm)[_HEADER:_HEADER + 8 * n].cast(fmt)
+    a = array(fmt)
+    a.frombytes(mm[_HEADER:_HEADER + 8 * n])
+    a.byteswap()
+    mm.close()
+    return None, memoryview(a)
+
+class HistoryArchive:
+    """只读打开一个二进制归档。
+
+    keys / ts 是直接映射文件内容的 memoryview（格式 "Q" / "d"），下标、切片都不复制数据；
+    chunks() 逐块产出掩码切片，compare_many / compare_tiers 可直接使用。
+    用完调用 close()（或用 with）；调用方仍持有切片时，映射要等切片释放后才真正关闭。
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self._maps = []
+        self._views = []
+        keys = self._open(self.path, KEYS_MAGIC, "Q")
+        try:
+            ts = self._open(ts_path(self.path), TIME_MAGIC, "d")
+        except FileNotFoundError:
+            ts = None   # 没有时间戳列时一律为 0
+        n = len(keys) if ts is None else min(len(keys), len(ts))
+        self.keys = keys[:n]
+        self.ts = ts[:n] if ts is not None else None
+        self._views += [self.keys] + ([self.ts] if ts is not None else [])
+
+    def _open(self, path, magic, fmt):
+        mm, view = _map_column(path, magic, fmt)
+        if mm is not None:
+            self._maps.append(mm)
+        self._views.append(view)
+        return view
+
+    def close(self):
+        for v in self._views:
+            v.release()
+        self._views = []
+        for mm in self._maps:
+            try:
+                mm.close()
+            except BufferError:   # 调用方仍持有切片，留给垃圾回收关闭
+                pass
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, i):
+        return Ticket.from_mask(self.keys[i], self.ts[i] if self.ts is not None else 0.0)
+
+    def __iter__(self):
+        """从旧到新逐注产出 Ticket。"""
+        for start, keys in self.chunks(1 << 16):
+            ts = self.ts[start:start + len(keys)] if self.ts is not None else None
+            for i, k in enumerate(keys):
+                yield Ticket.from_mask(k, ts[i] if ts is not None else 0.0)
+
+    def chunks(self, size=_CHUNK):
+        """按块产出 (起始编号, 掩码 memoryview 切片)。"""
+        for start in range(0, len(self.keys), size):
+            yield start, self.keys[start:start + size]
+
+    def masks(self, start=0, stop=None):
+        """[start, stop) 的掩码复制成 array("Q")，供只接受 array 的接口使用。"""
+        a = array("Q")
+        a.frombytes(self.keys[start:stop].cast("B"))
+        return a
+
+    @_inst.timed("archive.compare")
+    def prize_summary(self, win, chunk=_CHUNK):
+        """全部号码对照一期开奖的汇总，结果与 compare.prize_summary 相同；逐块计算。"""
+        from .compare import PRIZE_PAYOUTS, TICKET_PRICE, compare_tiers
+        counts = [0] * 7
+        for _, keys in self.chunks(chunk):
+            tiers = compare_tiers(win, keys)
+            for k in range(7):
+                counts[k] += tiers.count(k)
+        n = len(self)
+        return {"tickets": n, "counts": counts, "winning": n - counts[0],
+                "payout": sum(c * p for c, p in zip(counts, PRIZE_PAYOUTS)), "cost": n * TICKET_PRICE}
+
+    @_inst.timed("archive.stats")
+    def stats(self, chunk=_CHUNK):
+        """全部号码的 NumberStats（编号即归档里的先后顺序）；逐块建索引后合并。"""
+        from .stats import NumberStats
+        st = NumberStats()
+        for start, _ in self.chunks(chunk):
+            st.add(self.masks(start, start + chunk))
+        return st
+
+# ====== 写入 ======
+def _write_header(f, magic):
+    f.write(magic + bytes(_HEADER - len(magic)))
+
+def _records(path, magic):
+    """核对文件头并返回完整记录的条数。"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _HEADER or f.read(8) != magic:
+            raise ValueError(f"不是号码归档文件：{path}")
+    return (size - _HEADER) // 8
+
+@_inst.timed("archive.write")
+def write_archive(path, tickets, append=False, chunk=1 << 16):
+    """把 Ticket 序列（可以是生成器）写成二进制归档，返回写入的注数。
+
+    append 为假时先写临时文件再替换；为真时追加到已有归档末尾（没有则新建）。
+    """
+    path = Path(path)
+    paths = (path, ts_path(path))
+    magics = (KEYS_MAGIC, TIME_MAGIC)
+    if append and path.exists():
+        n0 = _records(path, KEYS_MAGIC)
+        if paths[1].exists():
+            n0 = min(n0, _records(paths[1], TIME_MAGIC))
+        else:   # 没有时间戳列时补一列 0
+            with open(paths[1], "wb") as f:
+                _write_header(f, TIME_MAGIC)
+                f.write(bytes(8 * n0))
+        # 两列截到同样长度：上次追加中断留下的半条或多出的记录丢弃，与读取时的处理一致
+        files = [open(p, "r+b") for p in paths]
+        for f in files:
+            f.truncate(_HEADER + 8 * n0)
+            f.seek(0, os.SEEK_END)
+        targets = None
+    else:
+        targets = [p.with_name(p.name + ".tmp") for p in paths]
+        files = [open(p, "wb") for p in targets]
+        for f, m in zip(files, magics):
+            _write_header(f, m)
+    n = 0
+    try:
+        kf, tf = files
+        it = iter(tickets)
+        while True:
+            keys, ts = array("Q"), array("d")
+            for t in it:
+                keys.append(t.to_mask())
+                ts.append(t.ts)
+                if len(keys) >= chunk:
+                    break
+            if not keys:
+                break
+            if sys.byteorder == "big":
+                keys.byteswap()
+                ts.byteswap()
+            keys.tofile(kf)
+            ts.tofile(tf)
+            n += len(keys)
+        for f in files:
+            _fsync(f)
+    finally:
+        for f in files:
+            f.close()
+    if targets is not None:
+        os.replace(targets[1], paths[1])
+        os.replace(targets[0], paths[0])
+    _inst.count("bytes_written", 16 * n)
+    return n
+
+def export_history(path=None):
+    """把当前存储后端里的全部历史逐条写成二进制归档（默认程序目录下的 history.bin），返回注数。"""
+    from .storage import BASE, get_storage
+    return write_archive(path or BASE / "history.bin", get_storage().iter_history())
+
+@_inst.timed("archive.import")
+def import_history(path, chunk=100000):
+    """把二进制归档里的号码按原时间戳追加到历史（经由当前存储后端），返回注数。"""
+    from .records import _append_history
+    n = 0
+    with HistoryArchive(path) as ar:
+        for start, keys in ar.chunks(chunk):
+            ts = ar.ts[start:start + len(keys)] if ar.ts is not None else None
+            _append_history([Ticket.from_mask(k, ts[i] if ts is not None else 0.0)
+                             for i, k in enumerate(keys)])
+            n += len(keys)
+        keys = ts = None   # 关闭映射前释放切片
+    return n
@@ -0,0 +1,444 @@
+"""命令行入口：python 2balls.py <命令> ...，或 python -m dualcolorball <命令> ...
+
+不带命令时打开图形界面；只有这时才导入 tkinter，命令行和库调用不依赖 Tk。
+选号、收藏、对照等命令把结果逐行写到标准输出（--format jsonl|csv），便于接管道或重定向。
+命令前加 --instrument / --profile 记录运行统计或 cProfile，结束时保存在程序目录下。
+"""
+import argparse, csv, itertools, json, sys, time
+
+from . import instrument
+from .tickets import Ticket, parse_ticket, _valid_numbers, _dict_from_ticket
+
+# 各命令在函数内导入所需模块，启动时只加载用到的部分
+
+# ====== 输出 ======
+_CSV_FIELDS = ["r1", "r2", "r3", "r4", "r5", "r6", "blue", "ts"]
+
+def _ticket_row(t: Ticket):
+    row = dict(zip(_CSV_FIELDS, t.reds))
+    row["blue"], row["ts"] = t.blue, t.ts
+    return row
+
+def _emit(rows, fmt, extra=(), out=None):
+    """把 (Ticket, 附加字段 dict) 逐行写出；jsonl 为 {"reds": [...], "blue": .., ...}，csv 带表头。"""
+    out = out or sys.stdout
+    n = 0
+    if fmt == "csv":
+        w = csv.DictWriter(out, _CSV_FIELDS + list(extra), lineterminator="\n")
+        w.writeheader()
+        for t, more in rows:
+            w.writerow({**_ticket_row(t), **more})
+            n += 1
+    else:
+        for t, more in rows:
+            out.write(json.dumps({**_dict_from_ticket(t), **more}, ensure_ascii=False,
+                                 separators=(",", ":")) + "\n")
+            n += 1
+    out.flush()
+    return n
+
+def _plain(tickets):
+    return ((t, {}) for t in tickets)
+
+def _parse_ticket_arg(text):
+    """"01 02 03 04 05 06 | 07" 或 "1,2,3,4,5,6+7" -> Ticket，不合法时抛出 ArgumentTypeError。"""
+    t = parse_ticket(text.replace(",", " ").replace("+", "|"))
+    if t is None or not _valid_numbers(t.reds, t.blue):
+        raise argparse.ArgumentTypeError(f"无法识别的号码：{text!r}（格式如 \"01 02 03 04 05 06 | 07\"）")
+    return Ticket(sorted(t.reds), t.blue)
+
+def _read_tickets(stream):
+    """从 jsonl（{"reds": [...], "blue": n}）或 "01 .. 06 | 07" 文本行中读号码，跳过无法识别的行。"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            try:
+                d = json.loads(line)
+                t = Ticket(sorted(int(r) for r in d["reds"]), int(d["blue"]), d.get("ts", 0.0))
+            except (ValueError, KeyError, TypeError):
+                continue
+            if _valid_numbers(t.reds, t.blue):
+                yield t
+        else:
+            try:
+                yield _parse_ticket_arg(line)
+            except argparse.ArgumentTypeError:
+                continue
+
+def _format_arg(ap):
+    ap.add_argument("--format", dest="fmt", choices=("jsonl", "csv"), default="jsonl",
+                    help="输出格式，默认 jsonl")
+
+# ====== 选号 ======
+def generate_main(argv=None):
+    """命令行随机选号：python 2balls.py generate [--count N] [--format jsonl|csv]"""
+    ap = argparse.ArgumentParser(prog="2balls.py generate", description="随机生成双色球号码（记入历史）")
+    ap.add_argument("--count", type=int, default=1, help="注数，默认 1")
+    ap.add_argument("--fresh", action="store_true", help="不生成历史和收藏里出现过的号码")
+    _format_arg(ap)
+    args = ap.parse_args(argv)
+    from .generate import generate_random_tickets
+    try:
+        res = generate_random_tickets(args.count, fresh=args.fresh)
+    except ValueError as e:   # fresh 时可用号码不足：ConditionsInfeasible
+        print(e, file=sys.stderr)
+        return 1
+    _emit(_plain(res), args.fmt)
+
+def _parse_sum_range(text):
+    a, b = text.split("-")
+    return (min(int(a), int(b)), max(int(a), int(b)))
+
+def _parse_red_ranges(text):
+    """"1-20:3,21-33:3" -> [(1, 20, 3), (21, 33, 3)]"""
+    res = []
+    for seg in text.split(","):
+        rg, k = seg.split(":")
+        a, b = rg.split("-")
+        res.append((int(a), int(b), int(k)))
+    return res
+
+def _parse_numbers(text):
+    return [int(x) for x in text.replace(",", " ").split()]
+
+def cond_main(argv=None):
+    """命令行条件选号：python 2balls.py cond --count N [--odd K] [--sum A-B] [--ranges ...] ..."""
+    ap = argparse.ArgumentParser(prog="2balls.py cond", description="按条件生成互不相同的号码（记入历史）")
+    ap.add_argument("--count", type=int, default=1, help="注数，默认 1")
+    ap.add_argument("--odd", type=int, default=None, help="奇数个数")
+    ap.add_argument("--sum", dest="sum_range", type=_parse_sum_range, default=None, help="和值范围，如 80-120")
+    ap.add_argument("--ranges", type=_parse_red_ranges, default=None, help="区间分配，如 1-20:3,21-33:3")
+    ap.add_argument("--exclude-reds", type=_parse_numbers, default=None, help="排除的红球，如 1,2,3")
+    ap.add_argument("--exclude-blues", type=_parse_numbers, default=None, help="排除的蓝球，如 16")
+    ap.add_argument("--weights", choices=("hot", "cold"), default=None, help="按开奖档案冷热加权")
+    ap.add_argument("--fresh", action="store_true", help="不生成历史和收藏里出现过的号码")
+    _format_arg(ap)
+    args = ap.parse_args(argv)
+    from .generate import generate_with_conditions
+    weights = None
+    if args.weights:
+        from .stats import hot_cold_weights
+        weights = hot_cold_weights(args.weights)
+    try:
+        res = generate_with_conditions(args.count, args.ranges, args.odd, args.sum_range,
+                                       args.exclude_reds, args.exclude_blues, weights=weights,
+                                       fresh=args.fresh)
+    except ValueError as e:   # 含 ConditionsInfeasible
+        print(e, file=sys.stderr)
+        return 1
+    _emit(_plain(res), args.fmt)
+
+def enum_main(argv=None):
+    """命令行枚举：python 2balls.py enum [--odd K] [--sum A-B] [--ranges ...] [--count-only] [--limit N]"""
+    ap = argparse.ArgumentParser(prog="2balls.py enum",
+                                 description="精确统计并列出满足条件的全部号码（不记入历史）")
+    ap.add_argument("--odd", type=int, default=None, help="奇数个数")
+    ap.add_argument("--sum", dest="sum_range", type=_parse_sum_range, default=None, help="和值范围，如 80-120")
+    ap.add_argument("--ranges", type=_parse_red_ranges, default=None, help="区间分配，如 1-20:3,21-33:3")
+    ap.add_argument("--exclude-reds", type=_parse_numbers, default=None, help="排除的红球，如 1,2,3")
+    ap.add_argument("--exclude-blues", type=_parse_numbers, default=None, help="排除的蓝球，如 16")
+    ap.add_argument("--count-only", action="store_true", help="只输出注数（JSON）")
+    ap.add_argument("--limit", type=int, default=None, help="最多输出多少注")
+    _format_arg(ap)
+    args = ap.parse_args(argv)
+    from .generate import count_with_conditions, iter_with_conditions
+    cond = {"red_ranges": args.ranges, "odd_count": args.odd, "sum_range": args.sum_range,
+            "exclude_reds": args.exclude_reds, "exclude_blues": args.exclude_blues}
+    if args.count_only:
+        print(json.dumps(count_with_conditions(**cond)))
+        return
+    masks = (m for chunk in iter_with_conditions(**cond) for m in chunk)
+    if args.limit is not None:
+        masks = itertools.islice(masks, args.limit)
+    n = _emit(_plain(map(Ticket.from_mask, masks)), args.fmt)
+    print(f"共 {n} 注", file=sys.stderr)
+
+# ====== 收藏 ======
+def fav_main(argv=None):
+    """命令行收藏：python 2balls.py fav add|remove 号码 ... / fav list"""
+    ap = argparse.ArgumentParser(prog="2balls.py fav", description="管理收藏号码")
+    sub = ap.add_subparsers(dest="action", required=True)
+    for name, text in (("add", "收藏号码"), ("remove", "取消收藏")):
+        p = sub.add_parser(name, help=text)
+        p.add_argument("tickets", nargs="*", type=_parse_ticket_arg,
+                       help="号码，如 \"01 02 03 04 05 06 | 07\"；省略时从标准输入逐行读取")
+        _format_arg(p)
+    p = sub.add_parser("list", help="列出全部收藏")
+    _format_arg(p)
+    args = ap.parse_args(argv)
+    from .records import list_favorites, save_favorite, remove_favorite
+
+    if args.action == "list":
+        _emit(_plain(list_favorites()), args.fmt)
+        return
+    tickets = args.tickets or _read_tickets(sys.stdin)
+    op = save_favorite if args.action == "add" else remove_favorite
+    # 输出每注及是否有改动（add：新收藏；remove：确实删除）
+    _emit(((t, {"changed": bool(op(t))}) for t in tickets), args.fmt, extra=("changed",))
+
+# ====== 开奖与对照 ======
+def draw_main(argv=None):
+    """命令行开奖号码：python 2balls.py draw set 号码 / draw show"""
+    ap = argparse.ArgumentParser(prog="2balls.py draw", description="设置或查看最新开奖号码")
+    sub = ap.add_subparsers(dest="action", required=True)
+    p = sub.add_parser("set", help="设置最新开奖号码")
+    p.add_argument("ticket", type=_parse_ticket_arg, help="如 \"01 02 03 04 05 06 | 07\"")
+    _format_arg(p)
+    p = sub.add_parser("show", help="查看最新开奖号码")
+    _format_arg(p)
+    args = ap.parse_args(argv)
+    from .records import update_latest_draw, load_latest_draw
+    t = update_latest_draw((args.ticket.reds, args.ticket.blue)) if args.action == "set" else load_latest_draw()
+    if t is None:
+        print("尚未设置开奖号码", file=sys.stderr)
+        return 1
+    _emit(_plain([t]), args.fmt)
+
+def compare_main(argv=None):
+    """命令行对照：python 2balls.py compare [--source favorites|history|stdin] [--draw 号码]"""
+    ap = argparse.ArgumentParser(prog="2balls.py compare", description="号码对照开奖，逐注输出命中与奖级")
+    ap.add_argument("--source", choices=("favorites", "history", "stdin"), default="favorites",
+                    help="对照哪些号码：收藏（默认）、全部历史或标准输入")
+    ap.add_argument("--draw", type=_parse_ticket_arg, default=None, help="开奖号码，默认为已设置的最新开奖")
+    ap.add_argument("--winners", action="store_true", help="只输出中奖的号码")
+    ap.add_argument("--chunk", type=int, default=1 << 16, help="每批对照注数")
+    _format_arg(ap)
+    args = ap.parse_args(argv)
+    from .records import load_latest_draw, list_favorites, list_history
+    from .compare import PRIZE_NAMES, PRIZE_PAYOUTS, _TIER_OF_CODE, compare_many
+    win = args.draw or load_latest_draw()
+    if win is None:
+        print("尚未设置开奖号码，请先运行 draw set 或使用 --draw", file=sys.stderr)
+        return 1
+    if args.source == "favorites":
+        tickets = iter(list_favorites())
+    elif args.source == "history":
+        tickets = iter(list_history(0))
+    else:
+        tickets = _read_tickets(sys.stdin)
+
+    def rows():
+        # 分批走 compare_many 的字节车道批量对照，标准输入的号码也能流式处理
+        while True:
+            part = [t for _, t in zip(range(args.chunk), tickets)]
+            if not part:
+                return
+            reds, blues = compare_many(win, part)
+            for t, r, b in zip(part, reds, blues):
+                tier = _TIER_OF_CODE[r * 2 + b]
+                if tier or not args.winners:
+                    yield t, {"red_hits": r, "blue_hit": b, "tier": tier,
+                              "prize": PRIZE_NAMES[tier], "payout": PRIZE_PAYOUTS[tier]}
+
+    _emit(rows(), args.fmt, extra=("red_hits", "blue_hit", "tier", "prize", "payout"))
+
+# ====== 批量与数据维护 ======
+def bulk_main(argv=None):
+    """命令行批量生成：python 2balls.py bulk --count N [--seed S] [--format text|jsonl|bin] [-o 文件]"""
+    ap = argparse.ArgumentParser(prog="2balls.py bulk", description="批量生成随机双色球号码")
+    ap.add_argument("--count", type=int, required=True, help="生成注数")
+    ap.add_argument("--seed", type=int, default=None, help="随机种子，指定后结果可复现")
+    ap.add_argument("--format", dest="fmt", choices=("text", "jsonl", "bin"), default="text")
+    ap.add_argument("-o", "--out", default="-", help="输出文件，默认标准输出")
+    ap.add_argument("--chunk", type=int, default=1 << 20, help="每块注数")
+    args = ap.parse_args(argv)
+    from .generate import bulk_generate
+
+    def progress(done):
+        print(f"\r已生成 {done}/{args.count}", end="", file=sys.stderr, flush=True)
+
+    if args.out == "-":
+        n, secs = bulk_generate(args.count, sys.stdout.buffer, args.fmt, args.seed, args.chunk, progress)
+        sys.stdout.flush()
+    else:
+        with open(args.out, "wb") as f:
+            n, secs = bulk_generate(args.count, f, args.fmt, args.seed, args.chunk, progress)
+    rate = n / secs if secs else float("inf")
+    print(f"\n生成 {n} 注，用时 {secs:.2f} 秒，{rate:,.0f} 注/秒", file=sys.stderr)
+
+def migrate_sqlite_main(argv=None):
+    """命令行迁移：python 2balls.py migrate-sqlite [--db 路径]"""
+    from .storage import migrate_json_to_sqlite, _SQLITE_FILE
+    ap = argparse.ArgumentParser(prog="2balls.py migrate-sqlite",
+                                 description="把 JSON 数据文件导入 SQLite 数据库")
+    ap.add_argument("--db", default=None, help=f"数据库路径（默认 {_SQLITE_FILE.name}）")
+    args = ap.parse_args(argv)
+    try:
+        counts = migrate_json_to_sqlite(db=args.db)
+    except FileExistsError as e:
+        print(f"数据库已存在：{e}")
+        return 1
+    except ValueError as e:
+        print(f"迁移失败，未生成数据库：{e}", file=sys.stderr)
+        return 1
+    print(f"已导入 历史 {counts['history']} 条，收藏 {counts['favorites']} 注，"
+          f"开奖 {counts['draws']} 期，最新开奖 {counts['latest']} 条")
+    print("JSON 文件保持不变；之后程序会自动使用 SQLite 数据库")
+
+def import_draws_main(argv=None):
+    """命令行导入开奖：python 2balls.py import-draws 文件|- [...] [--compare]"""
+    ap = argparse.ArgumentParser(prog="2balls.py import-draws", description="批量导入历届开奖号码")
+    ap.add_argument("files", nargs="+",
+                    help=".csv / .json / .jsonl 开奖文件；- 为标准输入，每行 期号 [日期] 红球×6 蓝球")
+    ap.add_argument("--compare", action="store_true", help="导入后把全部收藏对照这些开奖，逐期输出汇总")
+    args = ap.parse_args(argv)
+    from .records import parse_draws, parse_draws_text, add_draws, list_draws
+    info = sys.stderr if args.compare else sys.stdout   # --compare 时标准输出只留 jsonl 汇总
+    seen = []
+    for fn in args.files:
+        try:
+            draws, bad = parse_draws_text(sys.stdin.read()) if fn == "-" else parse_draws(fn)
+        except (OSError, ValueError) as e:
+            print(f"{fn}: 无法读取：{e}", file=sys.stderr)
+            return 1
+        print(f"{fn}: 新增 {add_draws(draws)} 期，无法解析 {bad} 行", file=info)
+        seen += draws
+    print(f"档案共 {len(list_draws())} 期", file=info)
+    if args.compare:
+        from .compare import favorites_draw_summaries
+        for d, sm in zip(seen, favorites_draw_summaries(seen)):
+            print(json.dumps({"issue": d.issue, "date": d.date, "reds": list(d.reds), "blue": d.blue, **sm},
+                             ensure_ascii=False, separators=(",", ":")))
+
+def archive_main(argv=None):
+    """命令行二进制归档：python 2balls.py archive export|import|pack|cat|info ..."""
+    ap = argparse.ArgumentParser(prog="2balls.py archive",
+                                 description="历史号码的定长二进制归档（每注 16 字节，内存映射读取）")
+    sub = ap.add_subparsers(dest="action", required=True)
+    p = sub.add_parser("export", help="把全部历史写成归档")
+    p.add_argument("-o", "--out", default=None, help="归档路径，默认程序目录下的 history.bin")
+    p = sub.add_parser("import", help="把归档里的号码按原时间戳追加到历史")
+    p.add_argument("path")
+    p = sub.add_parser("pack", help="从标准输入（jsonl 或 \"01 .. 06 | 07\" 文本行）写归档")
+    p.add_argument("path")
+    p.add_argument("--append", action="store_true", help="追加到已有归档末尾")
+    p = sub.add_parser("cat", help="逐行输出归档里的号码（jsonl 与 history.jsonl 的记录格式相同）")
+    p.add_argument("path")
+    _format_arg(p)
+    p = sub.add_parser("info", help="注数、时间范围和号码统计")
+    p.add_argument("path")
+    p.add_argument("--draw", type=_parse_ticket_arg, default=None, help="再给出全部号码对照这期开奖的奖级汇总")
+    args = ap.parse_args(argv)
+    from .archive import HistoryArchive, write_archive, export_history, import_history
+
+    try:
+        if args.action == "export":
+            from .storage import BASE
+            out = args.out or BASE / "history.bin"
+            print(f"已导出 {export_history(out)} 注到 {out}", file=sys.stderr)
+        elif args.action == "import":
+            print(f"已追加 {import_history(args.path)} 注到历史", file=sys.stderr)
+        elif args.action == "pack":
+            n = write_archive(args.path, _read_tickets(sys.stdin), append=args.append)
+            print(f"已写入 {n} 注", file=sys.stderr)
+        elif args.action == "cat":
+            with HistoryArchive(args.path) as ar:
+                _emit(_plain(ar), args.fmt)
+        else:
+            from .stats import format_stats
+            from .compare import PRIZE_NAMES
+            with HistoryArchive(args.path) as ar:
+                print(f"{args.path}：{len(ar)} 注")
+                if len(ar) and ar.ts is not None:
+                    print("时间：" + " ~ ".join(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(x))
+                                               for x in (ar.ts[0], ar.ts[-1])))
+                print(format_stats(ar.stats(), "注"))
+                if args.draw is not None:
+                    rep = ar.prize_summary(args.draw)
+                    print(f"\n对照 {args.draw.format()}：中奖 {rep['winning']} 注，奖金 {rep['payout']:,} 元，"
+                          f"投注 {rep['cost']:,} 元")
+                    for k in range(1, 7):
+                        print(f"  {PRIZE_NAMES[k]}  {rep['counts'][k]}")
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+
+def simulate_main(argv=None):
+    """命令行模拟：python 2balls.py simulate --draws 1000000 [--strategy random|conditions|favorites] ..."""
+    from .simulation import simulate, format_simulation
+    ap = argparse.ArgumentParser(prog="2balls.py simulate", description="蒙特卡洛模拟评估选号策略")
+    ap.add_argument("--draws", type=int, default=1000000, help="模拟期数")
+    ap.add_argument("--strategy", choices=("random", "conditions", "favorites"), default="random")
+    ap.add_argument("--tickets", type=int, default=5, help="每期注数（favorites 策略为全部收藏）")
+    ap.add_argument("--odd", type=int, default=None, help="条件：奇数个数")
+    ap.add_argument("--sum", dest="sum_range", type=_parse_sum_range, default=None, help="条件：和值范围，如 80-120")
+    ap.add_argument("--ranges", type=_parse_red_ranges, default=None, help="条件：区间分配，如 1-20:3,21-33:3")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--json", action="store_true", help="以 JSON 输出报告")
+    args = ap.parse_args(argv)
+    cond = {"odd_count": args.odd, "sum_range": args.sum_range, "red_ranges": args.ranges}
+    try:
+        rep = simulate(args.draws, args.strategy, args.tickets, conditions=cond,
+                       seed=args.seed, workers=args.workers)
+    except ValueError as e:
+        print(e)
+        return 1
+    print(json.dumps(rep, ensure_ascii=False) if args.json else format_simulation(rep))
+
+COMMANDS = {
+    "generate": generate_main,
+    "cond": cond_main,
+    "enum": enum_main,
+    "fav": fav_main,
+    "draw": draw_main,
+    "compare": compare_main,
+    "bulk": bulk_main,
+    "import-draws": import_draws_main,
+    "migrate-sqlite": migrate_sqlite_main,
+    "archive": archive_main,
+    "simulate": simulate_main,
+}
+
+_GLOBAL_FLAGS = ("--instrument", "--profile")
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    flags = set()
+    while argv and argv[0] in _GLOBAL_FLAGS:
+        flags.add(argv.pop(0))
+    if "--instrument" in flags:
+        instrument.enable()
+    if "--profile" in flags:
+        instrument.start_profile()
+    try:
+        return _run(argv)
+    finally:
+        _finish_diagnostics()
+
+def _run(argv):
+    if argv and argv[0] in COMMANDS:
+        try:
+            return COMMANDS[argv[0]](argv[1:])
+        except BrokenPipeError:   # 输出接 head 等提前关闭的管道
+            sys.stderr.close()
+            return 0
+    if argv and argv[0] in ("-h", "--help"):
+        print(__doc__.strip())
+        print("\n命令：" + " ".join(COMMANDS))
+        return 0
+    if argv:
+        print(f"未知命令：{argv[0]}", file=sys.stderr)
+        print("用法：python 2balls.py [--instrument] [--profile] [命令 ...]", file=sys.stderr)
+        print("命令：" + " ".join(COMMANDS), file=sys.stderr)
+        return 2
+    from .gui import main as gui_main
+    gui_main()
+
+def _finish_diagnostics():
+    """会话结束：写出统计 JSON 与 profile 结果（在程序目录下），路径打印到标准错误。"""
+    saved = []
+    try:
+        if instrument.ENABLED:
+            saved.append(instrument.dump())
+        if instrument.profiling():
+            saved.append(instrument.stop_profile())
+    except OSError as e:
+        print(f"诊断数据写入失败：{e}", file=sys.stderr)
+    for path in saved:
+        try:
+            print(f"诊断数据：{path}", file=sys.stderr)
+        except (OSError, ValueError):   # 标准错误已关闭
+            pass
@@ -0,0 +1,205 @@
+"""奖级规则与对照：单注、批量（字节车道查表）和 号码 × 历届开奖 计分。"""
+import itertools, sys, threading
+from array import array
+from collections import OrderedDict
+
+from . import instrument as _inst
+from .tickets import Ticket, RED_MASK, _popcount, ticket_masks, _POPCOUNT8, _lane
+from .records import list_draws
+from .index import _FAVORITE_INDEX
+
+# ===== 奖级 =====
+# 双色球奖级查找表 PRIZE_TIERS[红球命中数][蓝球是否命中] -> 奖级（0 为未中奖）：
+# 一等奖 6+1，二等奖 6+0，三等奖 5+1，四等奖 5+0 / 4+1，五等奖 4+0 / 3+1，六等奖 2+1 / 1+1 / 0+1。
+PRIZE_TIERS = (
+    (0, 6),
+    (0, 6),
+    (0, 6),
+    (0, 5),
+    (5, 4),
+    (4, 3),
+    (2, 1),
+)
+PRIZE_NAMES = ("未中奖", "一等奖", "二等奖", "三等奖", "四等奖", "五等奖", "六等奖")
+# 单注奖金（元）。一、二等奖为浮动奖金，这里取常见估计值，计算时可通过 payouts 参数覆盖。
+PRIZE_PAYOUTS = (0, 5000000, 150000, 3000, 200, 10, 5)
+TICKET_PRICE = 2
+
+def prize_tier(red_hits, blue_hit):
+    """返回奖级 1-6，未中奖为 0。"""
+    return PRIZE_TIERS[red_hits][blue_hit]
+
+# 批量计算时用命中码 = 红球命中数 * 2 + 蓝球是否命中（0..13）按字节查表
+_TIER_OF_CODE = bytes(PRIZE_TIERS[c >> 1][c & 1] if c < 14 else 0 for c in range(256))
+
+def compare_ticket(win: Ticket, other: Ticket):
+    red_hits = _popcount(win.to_mask() & other.to_mask() & RED_MASK)
+    blue_hit = 1 if win.blue == other.blue else 0
+    tier = PRIZE_TIERS[red_hits][blue_hit]
+    return {"red_hits": red_hits, "blue_hit": blue_hit,
+            "tier": tier, "payout": PRIZE_PAYOUTS[tier]}
+
+# 按字节查表做批量对照：掩码数组按字节拆成 5 条“车道”（第 i 条是每注的第 i 个字节），
+# 每条车道用 bytes.translate 查出本字节命中的红球数，再把各车道当作大整数相加
+# （每字节最多 6，不会进位），整批计算都在 C 层完成。
+
+@_inst.timed("compare.many")
+def compare_many(win: Ticket, tickets):
+    """批量对照。tickets 为 Ticket 序列，或 array("Q") / memoryview("Q")（如 HistoryArchive.keys）掩码数组。
+
+    返回 (red_hits, blue_hits) 两个等长 bytes，第 i 个字节是第 i 注的红球命中数 / 蓝球是否命中。
+    """
+    masks = tickets if isinstance(tickets, (array, memoryview)) else ticket_masks(tickets)
+    n = len(masks)
+    raw = masks.tobytes()   # 一次整体拷贝，之后的步长切片都走 bytes 的快速路径
+    wm = win.to_mask()
+    total = 0
+    for i in range(5):
+        lane_mask = (wm >> (8 * i)) & 0xFF
+        if i == 4:
+            lane_mask &= 1  # 第 4 字节只有最低位是红球 33
+        if not lane_mask:
+            continue
+        table = bytes(_POPCOUNT8[v & lane_mask] for v in range(256))
+        total += int.from_bytes(raw[_lane(i)::8].translate(table), "little")
+    red_hits = total.to_bytes(n, "little")
+    blue_table = bytes(1 if v >> 1 == win.blue else 0 for v in range(256))
+    blue_hits = raw[_lane(4)::8].translate(blue_table)
+    return red_hits, blue_hits
+
+def _codes(red_hits, blue_hits):
+    code = int.from_bytes(red_hits, "little") * 2 + int.from_bytes(blue_hits, "little")
+    return code.to_bytes(len(red_hits), "little")
+
+def _hit_codes(win, masks):
+    return _codes(*compare_many(win, masks))
+
+def compare_tiers(win: Ticket, tickets):
+    """批量对照并定级，返回 bytes，第 i 个字节为第 i 注的奖级（0 为未中奖）。"""
+    return _hit_codes(win, tickets).translate(_TIER_OF_CODE)
+
+def prize_summary(win: Ticket, tickets, payouts=PRIZE_PAYOUTS):
+    """一批号码对照一期开奖的汇总：各奖级注数、奖金合计、投注成本。
+
+    逐注定级和计数都在 bytes 上完成（translate / count），没有逐注的 Python 循环。
+    """
+    tiers = compare_tiers(win, tickets)
+    counts = [tiers.count(k) for k in range(7)]
+    payout = sum(c * p for c, p in zip(counts, payouts))
+    return {"tickets": len(tiers), "counts": counts, "winning": len(tiers) - counts[0],
+            "payout": payout, "cost": len(tiers) * TICKET_PRICE}
+
+_IS_TIER = [bytes(1 if v == k else 0 for v in range(256)) for k in range(7)]
+
+def _widen(lanes, width=4):
+    """把每注一字节的计数扩展成每注 width 字节（原生字节序）的大整数，便于继续累加。"""
+    buf = bytearray(width * len(lanes))
+    buf[0 if sys.byteorder == "little" else width - 1::width] = lanes
+    return int.from_bytes(buf, sys.byteorder)
+
+def iter_draw_scores(tickets, draws=None, chunk=1 << 20):
+    """逐块、逐期产出 (draw, start, tiers)：tiers[i] 为第 start+i 注在该期的奖级。
+
+    tickets 为 Ticket 序列或 array("Q") / memoryview("Q") 掩码；draws 默认为整个开奖档案。
+    每次只处理 chunk 注，内存占用与号码总数无关。
+    """
+    masks = tickets if isinstance(tickets, (array, memoryview)) else ticket_masks(tickets)
+    draws = list_draws() if draws is None else draws
+    for start in range(0, len(masks), chunk):
+        part = masks[start:start + chunk]
+        for d in draws:
+            yield d, start, _hit_codes(d, part).translate(_TIER_OF_CODE)
+
+def score_tickets(tickets, draws=None, chunk=1 << 20):
+    """计算 号码 × 开奖 全矩阵，返回 7 个 array("I")：counts[k][i] 为第 i 注中 k 等奖的期数，
+    counts[0] 为未中奖期数。各奖级在字节车道里累加，每 255 期并入 32 位车道一次。
+    """
+    masks = tickets if isinstance(tickets, (array, memoryview)) else ticket_masks(tickets)
+    draws = list_draws() if draws is None else draws
+    counts = [array("I") for _ in range(7)]
+    for start in range(0, len(masks), chunk):
+        part = masks[start:start + chunk]
+        m = len(part)
+        wide = [0] * 7
+        acc, pending = [0] * 7, 0
+        for d, _, tiers in iter_draw_scores(part, draws, chunk=max(m, 1)):
+            for k in range(1, 7):
+                if k in tiers:
+                    acc[k] += int.from_bytes(tiers.translate(_IS_TIER[k]), "little")
+            pending += 1
+            if pending == 255:
+                for k in range(1, 7):
+                    if acc[k]:
+                        wide[k] += _widen(acc[k].to_bytes(m, "little"))
+                acc, pending = [0] * 7, 0
+        for k in range(1, 7):
+            if acc[k]:
+                wide[k] += _widen(acc[k].to_bytes(m, "little"))
+        # 未中奖 = 总期数 - 各奖级之和（逐注非负，不会借位）
+        wide[0] = int.from_bytes(array("I", [len(draws)]).tobytes() * m, sys.byteorder) - sum(wide[1:])
+        for k in range(7):
+            counts[k].frombytes(wide[k].to_bytes(4 * m, sys.byteorder))
+    return counts
+
+# ===== 收藏对照缓存 =====
+# 每期开奖（按号码掩码）缓存全部收藏的命中数与各奖级注数，版本取收藏索引的 (对象, 删除次数, 注数)。
+# 收藏只会在末尾追加或按位置删除，缓存的序列始终是当前序列的前缀：重放索引的删除日志，
+# 再只对照新追加的部分即可，不必整体重算。索引重建（其他进程改过收藏、切换存储）时整体重算。
+_FAV_CMP_LOCK = threading.Lock()
+_FAV_CMP = OrderedDict()   # 开奖掩码 -> [索引, 已重放的删除次数, 红球命中 bytearray, 蓝球命中 bytearray, 各奖级注数]
+_FAV_CMP_MAX = 32          # 最多缓存的开奖期数，超出时淘汰最久未用的
+
+def _fav_entry(win, idx):
+    key = win.to_mask()
+    e = _FAV_CMP.get(key)
+    if e is None or e[0] is not idx or e[1] > idx.version:
+        e = [idx, idx.version, bytearray(), bytearray(), [0] * 7]
+        _inst.count("compare.cache_miss")
+    else:
+        _inst.count("compare.cache_hit")
+    _, ver, red, blue, counts = e
+    for pos in idx.deleted[ver:]:
+        if pos < len(red):   # 删除的是缓存之后才追加的号码时前缀不变
+            counts[PRIZE_TIERS[red[pos]][blue[pos]]] -= 1
+            del red[pos], blue[pos]
+    e[1] = idx.version
+    if len(red) < len(idx):
+        r, b = compare_many(win, idx.masks[len(red):])
+        tiers = _codes(r, b).translate(_TIER_OF_CODE)
+        for k in range(7):
+            counts[k] += tiers.count(k)
+        red += r
+        blue += b
+    _FAV_CMP[key] = e
+    _FAV_CMP.move_to_end(key)
+    while len(_FAV_CMP) > _FAV_CMP_MAX:
+        _FAV_CMP.popitem(last=False)
+    return e
+
+def _summary(counts, payouts=PRIZE_PAYOUTS):
+    n = sum(counts)
+    return {"tickets": n, "counts": list(counts), "winning": n - counts[0],
+            "payout": sum(c * p for c, p in zip(counts, payouts)), "cost": n * TICKET_PRICE}
+
+def compare_favorites(win: Ticket):
+    """全部收藏对照一期开奖，返回 (掩码, 红球命中, 蓝球命中, 汇总)。
+
+    前三项与 favorite_masks() 顺序一致（掩码为 array("Q")，命中数为 bytes），汇总同 prize_summary。
+    结果按开奖缓存，收藏增删后只对照变化的部分。
+    """
+    with _FAV_CMP_LOCK, _FAVORITE_INDEX.lock:
+        idx = _FAVORITE_INDEX.get()
+        e = _fav_entry(win, idx)
+        return array("Q", idx.masks), bytes(e[2]), bytes(e[3]), _summary(e[4])
+
+def favorites_draw_summaries(draws, chunk=1 << 20):
+    """全部收藏对照多期开奖，一遍扫描收藏（iter_draw_scores），返回与 draws 对应的汇总列表。"""
+    with _FAVORITE_INDEX.lock:
+        masks = array("Q", _FAVORITE_INDEX.get().masks)
+    draws = list(draws)
+    counts = [[0] * 7 for _ in draws]
+    # iter_draw_scores 逐块、块内按 draws 的顺序产出
+    for c, (_, _, tiers) in zip(itertools.cycle(counts), iter_draw_scores(masks, draws, chunk)):
+        for k in range(7):
+            c[k] += tiers.count(k)
+    return [_summary(c) for c in counts]
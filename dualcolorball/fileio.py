@@ -0,0 +1,95 @@
+"""数据文件的读写：带版本校验的进程内缓存、原子写入与追加写入。"""
+import json, os
+from pathlib import Path
+
+from . import instrument as _inst
+
+# ====== 进程内缓存 ======
+# 已解析的数据留在内存中，以文件的 (mtime_ns, size) 作为版本：文件被外部修改后
+# 下次访问自动重新加载；本进程自己的写入会同步更新缓存（write-through）。
+_CACHE_STATS = {}   # 名称 -> {"hits": n, "misses": n}
+
+def _count_cache(name, hit):
+    st = _CACHE_STATS.setdefault(name, {"hits": 0, "misses": 0})
+    st["hits" if hit else "misses"] += 1
+
+def cache_stats():
+    """各数据缓存的命中/未命中次数。"""
+    return {k: dict(v) for k, v in _CACHE_STATS.items()}
+
+def _file_sig(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+_JSON_CACHE = {}    # 路径 -> (文件版本, 数据)；调用方不要修改返回的对象
+
+_MISSING = object()
+
+def _load_json(path, default):
+    """读取 JSON 文件（按文件版本缓存）。文件不存在、读不出或不是合法 JSON 时返回 default；
+    不能把损坏当作空数据的调用方传入 _MISSING 自行判断。"""
+    sig = _file_sig(path)
+    hit = _JSON_CACHE.get(str(path))
+    if sig is not None and hit is not None and hit[0] == sig:
+        _count_cache("json", True)
+        return hit[1]
+    _count_cache("json", False)
+    try:
+        with _inst.timer("json.load"), open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return default
+    if _inst.ENABLED and sig is not None:
+        _inst.count("bytes_read", sig[1])
+        _inst.count("records_parsed.json", len(data) if isinstance(data, (list, dict)) else 1)
+    _JSON_CACHE[str(path)] = (sig, data)
+    return data
+
+# ====== 写入 ======
+def _fsync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+def _atomic_write(path, text, binary=False):
+    """先写同目录下的临时文件并 fsync，再 os.replace 原子替换。
+
+    text 可以是字符串或字符串的可迭代对象（binary 为真时是 bytes）。中途崩溃时原文件保持完整。
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with _inst.timer("file.write"):
+        with (open(tmp, "wb") if binary else open(tmp, "w", encoding="utf-8")) as f:
+            if isinstance(text, (str, bytes)):
+                f.write(text)
+            else:
+                f.writelines(text)
+            _fsync(f)
+            if _inst.ENABLED:
+                _inst.count("bytes_written", f.tell() if binary else f.buffer.tell())
+        os.replace(tmp, path)
+
+def _append_text(path, text, sync=True):
+    """追加写入。若上次写入中途崩溃留下了不完整的末行，先补一个换行，
+    让半行单独成为一条坏记录（读取时跳过），不会吞掉新写入的记录。"""
+    data = text.encode("utf-8")
+    with _inst.timer("file.append"), open(path, "a+b") as f:
+        if f.seek(0, os.SEEK_END) > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                data = b"\n" + data
+        f.write(data)
+        if sync:
+            _fsync(f)
+    _inst.count("bytes_written", len(data))
+
+def _save_json(path, data, compact=False):
+    """原子写入 JSON。compact 为真时不缩进，体积更小、写得更快。"""
+    if compact:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+    _atomic_write(path, text)
+    _JSON_CACHE[str(path)] = (_file_sig(path), data)
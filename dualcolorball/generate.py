@@ -0,0 +1,709 @@
+"""选号：随机、条件（精确计数与抽样）、批量流式、多进程与旋转矩阵。"""
+import random, time, os, sys, itertools, heapq
+from array import array
+from bisect import bisect_right
+
+from . import instrument as _inst
+from .tickets import Ticket, BLUE_SHIFT, _check_numbers, _lane
+from .records import _append_history
+
+@_inst.timed("generate.random")
+def generate_random_tickets(count=1, fresh=False):
+    """随机生成 count 注并记入历史。fresh=True 时只取历史和收藏里都没出现过的号码（本批内也不重复）。"""
+    if fresh:
+        from .ranking import TOTAL, seen_bitmap, unrank
+        seen = seen_bitmap()
+        ranks = _fresh_ranks(TOTAL, count, seen.__contains__, TOTAL - seen.count())
+        res = [Ticket(*unrank(r), time.time()) for r in ranks]
+        _inst.count("tickets.accepted", len(res))
+        _append_history(res)
+        return res
+    _inst.count("tickets.attempts", count)
+    _inst.count("tickets.accepted", count)
+    res = []
+    for _ in range(count):
+        reds = sorted(random.sample(range(1,34), 6))
+        blue = random.randint(1,16)
+        res.append(Ticket(tuple(reds), blue, time.time()))
+    _append_history(res)
+    return res
+
+class ConditionsInfeasible(ValueError):
+    """满足条件的号码组合少于要求的组数；total 为满足条件的组合总数。"""
+    def __init__(self, total, count):
+        super().__init__(f"满足条件的组合只有 {total} 种，不足 {count} 组")
+        self.total = total
+        self.count = count
+
+def _convolve(a, b):
+    res = {}
+    for (o1, s1), c1 in a.items():
+        for (o2, s2), c2 in b.items():
+            key = (o1 + o2, s1 + s2)
+            res[key] = res.get(key, 0) + c1 * c2
+    return res
+
+def _compositions(n, caps):
+    """把 n 拆成 len(caps) 个非负整数、第 i 个不超过 caps[i] 的全部方式。"""
+    if not caps:
+        if n == 0:
+            yield ()
+        return
+    rest = sum(caps[1:])
+    for c in range(max(0, n - rest), min(n, caps[0]) + 1):
+        for tail in _compositions(n - c, caps[1:]):
+            yield (c,) + tail
+
+def _hall_checks(sigs, ks):
+    """_assignable 用的检查表：每个区间子集 T 对应 (T 要的个数之和, 与 T 相交的区域下标)。"""
+    checks = []
+    for T in range(1, 1 << len(ks)):
+        need = sum(k for i, k in enumerate(ks) if T >> i & 1)
+        if need:
+            checks.append((need, [r for r, sig in enumerate(sigs) if any(T >> i & 1 for i in sig)]))
+    return checks
+
+def _assignable(counts, checks):
+    """各区域取 counts 个号码时，能否把它们分给所含区间，使每个区间恰好分到要求的个数。
+
+    供需总量相等（都是 6），按 Hall 条件：任取一些区间，它们要的个数之和
+    不超过与其相交的区域所取个数之和。
+    """
+    for need, near in checks:
+        if need > sum(counts[r] for r in near):
+            return False
+    return True
+
+class _GroupSampler:
+    """红球分成互不相交的若干组、每组选定个数时的精确计数与还原。
+
+    每组用 DP 统计“从该组第 i 个号码起选 j 个、奇数 o 个、和为 s”的组合数，
+    各组再按 (o, s) 卷积；据此 [0, red_total) 里的任一名次都能直接还原成唯一的一组红球。
+    """
+    def __init__(self, groups, odd_count=None, sum_range=None, table_cache=None):
+        self.groups = groups
+        cache = {} if table_cache is None else table_cache
+        self.tables = []
+        for xs, k in groups:
+            key = (tuple(xs), k)
+            if key not in cache:
+                cache[key] = self._group_table(xs, k)
+            self.tables.append(cache[key])
+        # dists[g]: 第 g 组选满 k 个时的 {(奇数个数, 和值): 组合数}
+        self.dists = [{(o, s): c for (j, o, s), c in t[0].items() if j == k}
+                      for t, (_, k) in zip(self.tables, self.groups)]
+        # suffix[g]: 第 g 组及其后各组合并后的 {(奇数个数, 和值): 组合数}
+        self.suffix = [{(0, 0): 1}]
+        for d in reversed(self.dists):
+            self.suffix.insert(0, _convolve(d, self.suffix[0]))
+        self.targets, self._cum, acc = [], [], 0
+        for (o, s), c in sorted(self.suffix[0].items()):
+            if odd_count is not None and o != odd_count:
+                continue
+            if sum_range is not None and not (sum_range[0] <= s <= sum_range[1]):
+                continue
+            self.targets.append((o, s))
+            self._cum.append(acc)
+            acc += c
+        self.red_total = acc
+        self._choice_cache = {}
+
+    @staticmethod
+    def _group_table(xs, k):
+        tables = [None] * len(xs) + [{(0, 0, 0): 1}]
+        for i in range(len(xs) - 1, -1, -1):
+            x, odd = xs[i], xs[i] % 2
+            nxt = tables[i + 1]
+            t = dict(nxt)
+            for (j, o, s), c in nxt.items():
+                if j < k:
+                    key = (j + 1, o + odd, s + x)
+                    t[key] = t.get(key, 0) + c
+            tables[i] = t
+        return tables
+
+    def _choices(self, g, o, s):
+        """第 g 组可取的 (og, sg, 后续组合数) 及累计权重，按 (g, o, s) 缓存。"""
+        key = (g, o, s)
+        hit = self._choice_cache.get(key)
+        if hit is None:
+            rest = self.suffix[g + 1]
+            choices, cum, acc = [], [], 0
+            for (og, sg), c in self.dists[g].items():
+                n_rest = rest.get((o - og, s - sg), 0)
+                if n_rest:
+                    choices.append((og, sg, n_rest))
+                    cum.append(acc)
+                    acc += c * n_rest
+            hit = self._choice_cache[key] = (choices, cum)
+        return hit
+
+    def _unrank_group(self, g, o, s, r):
+        (xs, j), tables = self.groups[g], self.tables[g]
+        picked = []
+        for i, x in enumerate(xs):
+            if j == 0:
+                break
+            skip = tables[i + 1].get((j, o, s), 0)
+            if r < skip:
+                continue
+            r -= skip
+            picked.append(x)
+            j, o, s = j - 1, o - x % 2, s - x
+        return picked
+
+    def unrank_reds(self, r):
+        """把名次 r∈[0, red_total) 还原为红球列表（未排序）。"""
+        i = bisect_right(self._cum, r) - 1
+        o, s = self.targets[i]
+        r -= self._cum[i]
+        reds = []
+        for g in range(len(self.groups)):
+            choices, cum = self._choices(g, o, s)
+            ci = bisect_right(cum, r) - 1
+            og, sg, n_rest = choices[ci]
+            gr, r = divmod(r - cum[ci], n_rest)
+            reds.extend(self._unrank_group(g, og, sg, gr))
+            o, s = o - og, s - sg
+        return reds
+
+    def _group_masks(self, g, o, s):
+        """第 g 组选满、奇数 o 个、和为 s 的全部选法（红球掩码列表）。
+
+        按 DP 计数剪枝：只走“剩余号码还能凑出剩余个数 / 奇数 / 和值”的分支，没有走不通的路。
+        """
+        (xs, k), tables = self.groups[g], self.tables[g]
+        res = []
+        if not tables[0].get((k, o, s)):
+            return res
+        stack = [(0, k, o, s, 0)]
+        while stack:
+            i, j, o, s, m = stack.pop()
+            if j == 0:
+                res.append(m)
+                continue
+            x = xs[i]
+            if tables[i + 1].get((j, o, s)):
+                stack.append((i + 1, j, o, s, m))
+            if tables[i + 1].get((j - 1, o - x % 2, s - x)):
+                stack.append((i + 1, j - 1, o - x % 2, s - x, m | 1 << (x - 1)))
+        return res
+
+    def iter_red_masks(self):
+        """分批产出满足条件的全部红球组合（掩码列表），合计 red_total 个。"""
+        cache = {}   # 后面的组会随前面各组的每种选法反复用到，缓存；第 0 组各 (o, s) 只用一次
+        def masks(g, o, s):
+            if g == 0:
+                return self._group_masks(g, o, s)
+            hit = cache.get((g, o, s))
+            if hit is None:
+                hit = cache[g, o, s] = self._group_masks(g, o, s)
+            return hit
+        last = len(self.groups) - 1
+        def walk(g, o, s, acc):
+            for og, sg, _ in self._choices(g, o, s)[0]:
+                if g == last:
+                    yield [acc | m for m in masks(g, og, sg)]
+                else:
+                    for m in masks(g, og, sg):
+                        yield from walk(g + 1, o - og, s - sg, acc | m)
+        for o, s in self.targets:
+            yield from walk(0, o, s, 0)
+
+class _ConditionSampler:
+    """条件选号的精确计数与均匀抽样。
+
+    区间可以重叠。红球先按“被哪些区间包含”分成互不相交的区域（不分区间时 1-33 为一个区域），
+    一注红球由各区域取几个决定唯一的一种“分布”；分布能按各区间要求的个数分配下去才算满足条件。
+    每种可行分布是一个 _GroupSampler，各分布的组合互不重复，计数直接相加。
+    有了这些计数，[0, total) 里的任一名次都能直接还原成唯一的一注号码 (unrank)，
+    抽样就是 random.sample(range(total), count) 后逐个还原，没有任何拒绝重试。
+    """
+    def __init__(self, red_ranges=None, odd_count=None, sum_range=None,
+                 exclude_reds=None, exclude_blues=None):
+        exclude_blues = set(exclude_blues or ())
+        self.blues = [x for x in range(1, 17) if x not in exclude_blues]
+        exclude_reds = set(exclude_reds or ())
+        ranges = list(red_ranges or [(1, 33, 6)])
+        ks = [k for _, _, k in ranges]
+        regions = {}   # 包含该号码的区间下标元组 -> 号码列表
+        for x in range(1, 34):
+            sig = tuple(i for i, (a, b, _) in enumerate(ranges) if a <= x <= b)
+            if sig and x not in exclude_reds:
+                regions.setdefault(sig, []).append(x)
+        self.reds = [x for xs in regions.values() for x in xs]
+        self.parts, self._cum, acc = [], [], 0
+        if sum(ks) == 6 and min(ks) >= 0:
+            sigs = list(regions)
+            checks, tables = _hall_checks(sigs, ks), {}
+            for counts in _compositions(6, [len(regions[sig]) for sig in sigs]):
+                if not _assignable(counts, checks):
+                    continue
+                part = _GroupSampler([(regions[sig], c) for sig, c in zip(sigs, counts) if c],
+                                     odd_count, sum_range, tables)
+                if part.red_total:
+                    self.parts.append(part)
+                    self._cum.append(acc)
+                    acc += part.red_total
+        self.red_total = acc
+        self.total = acc * len(self.blues)
+
+    def unrank(self, r):
+        """把名次 r∈[0, total) 还原为 (reds, blue)。"""
+        r, bi = divmod(r, len(self.blues))
+        i = bisect_right(self._cum, r) - 1
+        return tuple(sorted(self.parts[i].unrank_reds(r - self._cum[i]))), self.blues[bi]
+
+    def sample(self, count, rng=random):
+        """不放回地均匀抽取 count 注。"""
+        return [self.unrank(r) for r in rng.sample(range(self.total), count)]
+
+    def iter_red_masks(self):
+        """分批产出满足条件的全部红球组合（掩码列表），合计 red_total 个。"""
+        for part in self.parts:
+            yield from part.iter_red_masks()
+
+def count_with_conditions(red_ranges=None, odd_count=None, sum_range=None,
+                          exclude_reds=None, exclude_blues=None):
+    """满足条件的号码数（精确计数，不生成号码）：{"total": 注数, "reds": 红球组合数, "blues": 可选蓝球数}。"""
+    sampler = _ConditionSampler(red_ranges, odd_count, sum_range, exclude_reds, exclude_blues)
+    return {"total": sampler.total, "reds": sampler.red_total, "blues": len(sampler.blues)}
+
+def iter_with_conditions(red_ranges=None, odd_count=None, sum_range=None,
+                         exclude_reds=None, exclude_blues=None, chunk=1 << 16):
+    """按固定顺序流式产出满足条件的全部号码，每块一个 array("Q") 掩码数组；不写入历史。"""
+    sampler = _ConditionSampler(red_ranges, odd_count, sum_range, exclude_reds, exclude_blues)
+    blues = [b << BLUE_SHIFT for b in sampler.blues]
+    out = array("Q")
+    for reds in sampler.iter_red_masks():
+        out.extend([m | b for m in reds for b in blues])
+        if len(out) >= chunk:
+            yield out
+            out = array("Q")
+    if out:
+        yield out
+
+class GenerationCancelled(Exception):
+    """生成过程被调用方取消。"""
+
+def _fresh_ranks(total, count, taken, free=None, rng=random):
+    """从 [0, total) 里不放回地均匀抽 count 个 taken(r) 为假的名次。
+
+    先随机试抽；被占用的名次太多、迟迟抽不满时，名次不多（≤ 2^21）就按随机顺序逐个检查，
+    否则继续试抽直到总尝试次数用完。free 为已知的可用名次数（不知道时为 None）。
+    可用名次不足时抛出 ConditionsInfeasible。
+    """
+    if free is not None and free < count:
+        raise ConditionsInfeasible(free, count)
+    seen, ranks = set(), []
+    tries = 20 * count + 1000
+    while len(ranks) < count and tries > 0 and len(seen) < total:
+        tries -= 1
+        r = rng.randrange(total)
+        if r in seen:
+            continue
+        seen.add(r)
+        if not taken(r):
+            ranks.append(r)
+    if len(ranks) < count and total <= 1 << 21:
+        for r in rng.sample(range(total), total):
+            if len(ranks) >= count:
+                break
+            if r not in seen:
+                seen.add(r)
+                if not taken(r):
+                    ranks.append(r)
+    else:
+        tries = 200 * count + 100000
+        while len(ranks) < count and tries > 0:
+            tries -= 1
+            r = rng.randrange(total)
+            if r not in seen:
+                seen.add(r)
+                if not taken(r):
+                    ranks.append(r)
+    _inst.count("tickets.attempts", len(seen))
+    if len(ranks) < count:
+        raise ConditionsInfeasible(len(ranks), count)
+    return ranks
+
+def _weighted_ranks(sampler, count, weights, rng=random, taken=None):
+    """按权重不放回抽取 count 个名次：一注的权重为 6 个红球权重之积乘蓝球权重。
+
+    均匀抽名次后以 权重/权重上界 的概率接受；接受率太低、迟迟抽不满时，其余部分改为均匀抽取。
+    taken(r) 为真的名次（如历史里出现过的号码）不取。
+    """
+    red_w, blue_w = weights
+    reds_ok = sorted(red_w[x] for x in sampler.reds)
+    wmax = max(blue_w[b] for b in sampler.blues)
+    for w in reds_ok[-6:]:
+        wmax *= w
+    seen, ranks = set(), []
+    tries = budget = 50 * count + 10000
+    while len(ranks) < count and tries > 0:
+        tries -= 1
+        r = rng.randrange(sampler.total)
+        if r in seen:
+            continue
+        reds, blue = sampler.unrank(r)
+        w = blue_w[blue]
+        for x in reds:
+            w *= red_w[x]
+        if rng.random() * wmax < w:
+            seen.add(r)
+            if taken is None or not taken(r):
+                ranks.append(r)
+    _inst.count("tickets.attempts", budget - tries)
+    if len(ranks) < count:
+        chosen = set(ranks)
+        rest = (lambda r: r in chosen) if taken is None else (lambda r: r in chosen or taken(r))
+        try:
+            ranks += _fresh_ranks(sampler.total, count - len(ranks), rest, rng=rng)
+        except ConditionsInfeasible as e:
+            raise ConditionsInfeasible(len(ranks) + e.total, count) from None
+    return ranks
+
+@_inst.timed("generate.conditions")
+def generate_with_conditions(count=1, red_ranges=None, odd_count=None, sum_range=None,
+                             exclude_reds=None, exclude_blues=None, progress=None, cancel=None,
+                             weights=None, fresh=False):
+    """按条件生成 count 注互不相同的号码，组合不足时抛出 ConditionsInfeasible。
+
+    progress(已生成, 总数) 每生成一块回调一次；cancel 为 threading.Event 之类带 is_set()
+    的对象，置位后抛出 GenerationCancelled，已生成的部分不写入历史。
+    weights 为 (红球权重, 蓝球权重)（见 hot_cold_weights），给出时按冷热加权抽取，否则均匀抽取。
+    fresh=True 时跳过历史和收藏里出现过的号码；剩余组合不足时 ConditionsInfeasible.total 为找到的可用组合数。
+    """
+    if count <= 0:
+        return []
+    sampler = _ConditionSampler(red_ranges, odd_count, sum_range, exclude_reds, exclude_blues)
+    if sampler.total < count:
+        raise ConditionsInfeasible(sampler.total, count)
+    taken = None
+    if fresh:
+        from .ranking import rank, seen_bitmap
+        seen = seen_bitmap()
+        taken = lambda r: rank(*sampler.unrank(r)) in seen
+    if weights is not None:
+        ranks = _weighted_ranks(sampler, count, weights, taken=taken)
+    elif taken is not None:
+        ranks = _fresh_ranks(sampler.total, count, taken)
+    else:
+        ranks = random.sample(range(sampler.total), count)
+        _inst.count("tickets.attempts", count)
+    results = []
+    for start in range(0, count, 10000):
+        if cancel is not None and cancel.is_set():
+            raise GenerationCancelled()
+        for r in ranks[start:start + 10000]:
+            reds, blue = sampler.unrank(r)
+            results.append(Ticket(reds, blue, time.time()))
+        if progress:
+            progress(len(results), count)
+    _inst.count("tickets.accepted", len(results))
+    _append_history(results)
+    return results
+
+# ===== 批量生成 =====
+# 先把 C(33,6) = 1107568 种红球组合的掩码按字典序建成表，一注随机号码就是
+# “随机组合序号 + 随机蓝球”。每块先用 randbytes 一次取够随机数，再用 map/translate
+# 和大整数加法整块拼出掩码数组，避免逐注调用 random.sample / sorted / time.time。
+_RED_COMBOS = None
+
+def _red_combos():
+    global _RED_COMBOS
+    if _RED_COMBOS is None:
+        bits = [1 << i for i in range(33)]
+        _RED_COMBOS = array("Q", map(sum, itertools.combinations(bits, 6)))
+    return _RED_COMBOS
+
+def _randbytes(rng, n):
+    if hasattr(rng, "randbytes"):
+        return rng.randbytes(n)
+    return rng.getrandbits(n * 8).to_bytes(n, "little") if n else b""
+
+# 随机字节 -> 蓝球 1..16（取低 4 位，分布均匀）
+_BLUE_OF_BYTE = bytes(v % 16 + 1 for v in range(256))
+# 蓝球 -> 掩码第 4 字节中的取值（第 33 位起，即该字节左移 1 位）
+_BLUE_LANE = bytes((v << 1) & 0xFF for v in range(256))
+
+def _bulk_chunks(count, rng, chunk):
+    """按块产出 (红球组合序号列表, 蓝球 bytes)。
+
+    每注只消耗一个 64 位随机数：整数对组合数取模得红球（偏差约 6e-14，可忽略），
+    最高字节的低 4 位得蓝球。随机流按注顺序消耗，同一 seed 下结果与 count、chunk 无关。
+    """
+    n_combos = len(_red_combos())
+    left = count
+    while left > 0:
+        n = min(chunk, left)
+        left -= n
+        raw = _randbytes(rng, 8 * n)
+        idx = list(map(n_combos.__rmod__, array("Q", raw)))
+        blues = raw[_lane(7)::8].translate(_BLUE_OF_BYTE)
+        yield idx, blues
+
+def _chunk_masks(idx, blues):
+    combos = _red_combos()
+    reds = array("Q", map(combos.__getitem__, idx))
+    blue_part = bytearray(8 * len(idx))
+    blue_part[_lane(4)::8] = blues.translate(_BLUE_LANE)
+    # 红球位与蓝球位互不重叠，整块按大整数相加就是逐注按位或
+    order = sys.byteorder
+    total = int.from_bytes(reds.tobytes(), order) + int.from_bytes(blue_part, order)
+    masks = array("Q")
+    masks.frombytes(total.to_bytes(len(blue_part), order))
+    return masks
+
+def iter_bulk_tickets(count, seed=None, chunk=1 << 20):
+    """流式产出 count 注随机号码，每块是一个 array("Q") 掩码数组（见 Ticket.to_mask）。
+
+    给定 seed 时结果可复现。生成的号码不写入历史记录。
+    """
+    rng = random.Random(seed)
+    for idx, blues in _bulk_chunks(count, rng, chunk):
+        yield _chunk_masks(idx, blues)
+
+def _red_strings(fmt):
+    """红球组合序号 -> 该注输出行的前半部分。"""
+    if fmt == "text":
+        nums, sep, head, tail = [f"{r:02d}" for r in range(1, 34)], " ", "", " | "
+    else:
+        nums, sep, head, tail = [str(r) for r in range(1, 34)], ",", '{"reds":[', '],"blue":'
+    joined = map(sep.join, itertools.combinations(nums, 6))
+    return [head + x + tail for x in joined]
+
+def bulk_generate(count, out, fmt="text", seed=None, chunk=1 << 20, progress=None):
+    """批量生成 count 注随机号码写入二进制文件对象 out，返回 (注数, 秒)。
+
+    fmt: "text" 每行一注（同 Ticket.format）；"jsonl" 每行一个 {"reds", "blue"}；
+    "bin" 为原生字节序的 uint64 掩码。progress(已生成注数) 每块回调一次。
+    """
+    if fmt not in ("text", "jsonl", "bin"):
+        raise ValueError(f"未知输出格式: {fmt}")
+    t0 = time.perf_counter()
+    rng = random.Random(seed)
+    heads = None if fmt == "bin" else _red_strings(fmt)
+    if fmt == "text":
+        tails = [f"{b:02d}\n" for b in range(17)]
+    else:
+        tails = [f"{b}}}\n" for b in range(17)]
+    done = 0
+    for idx, blues in _bulk_chunks(count, rng, chunk):
+        if heads is None:
+            out.write(_chunk_masks(idx, blues).tobytes())
+        else:
+            lines = map(str.__add__, map(heads.__getitem__, idx), map(tails.__getitem__, blues))
+            out.write("".join(lines).encode("ascii"))
+        done += len(idx)
+        if progress:
+            progress(done)
+    return done, time.perf_counter() - t0
+
+# ===== 多进程生成 =====
+def _derive_seed(master, i):
+    """由主种子派生第 i 个子种子，各子种子之间相互独立。"""
+    import hashlib
+    digest = hashlib.sha256(f"{master}/{i}".encode("ascii")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+def _parallel_worker(job):
+    conditions, n, seed = job
+    if conditions is None:
+        out = array("Q")
+        for masks in iter_bulk_tickets(n, seed):
+            out.extend(masks)
+        return out
+    sampler = _ConditionSampler(**conditions)
+    masks = array("Q")
+    for reds, blue in sampler.sample(n, random.Random(seed)):
+        masks.append(Ticket(reds, blue).to_mask())
+    return masks
+
+def generate_parallel(count, workers=None, seed=None, conditions=None, append=True):
+    """多进程生成 count 注互不相同的号码。
+
+    conditions 为 generate_with_conditions 的条件参数字典（red_ranges、odd_count 等），
+    为 None 时纯随机。count 按进程均分，第 i 个进程使用由 seed 派生的独立子种子；
+    结果按进程序号合并、按号码去重，重复造成的缺口由父进程用派生种子补齐。
+    同一 seed 与 workers 下结果完全相同。
+    """
+    if count <= 0:
+        return []
+    if conditions is not None:
+        total = _ConditionSampler(**conditions).total
+        if total < count:
+            raise ConditionsInfeasible(total, count)
+    workers = max(1, min(workers or os.cpu_count() or 1, count))
+    if seed is None:
+        seed = random.getrandbits(64)
+    base, extra = divmod(count, workers)
+    jobs = [(conditions, base + (i < extra), _derive_seed(seed, i)) for i in range(workers)]
+    if workers == 1:
+        parts = [_parallel_worker(jobs[0])]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers) as ex:
+            parts = list(ex.map(_parallel_worker, jobs))
+    seen = set()
+    merged = array("Q")
+    for part in parts:
+        for m in part:
+            if m not in seen:
+                seen.add(m)
+                merged.append(m)
+    rnd = workers
+    while len(merged) < count:
+        for m in _parallel_worker((conditions, count - len(merged), _derive_seed(seed, rnd))):
+            if m not in seen:
+                seen.add(m)
+                merged.append(m)
+        rnd += 1
+    now = time.time()
+    tickets = [Ticket.from_mask(m, now) for m in merged[:count]]
+    if append:
+        _append_history(tickets)
+    return tickets
+
+# ===== 旋转矩阵（覆盖设计） =====
+# 从 v 个红球的号码池里选若干注（每注 6 个），使池中任意 t 个号码都至少同时出现在某一注里。
+# 先把池内全部 6 元组合及其包含的 t 元子集编号建成表（按 (v, t) 缓存），
+# 贪心（惰性优先队列）每次取新覆盖最多的一注，再在时间预算内做局部搜索，尝试用更少的注数达到全覆盖。
+_WHEEL_TABLES = {}
+
+def _wheel_tables(v, t):
+    """(blocks, cover, block_index, tsets)：blocks[i] 为池下标的 6 元组合，cover[i] 为其包含的 t 元子集编号。"""
+    key = (v, t)
+    hit = _WHEEL_TABLES.get(key)
+    if hit is None:
+        tsets = list(itertools.combinations(range(v), t))
+        tindex = {s: i for i, s in enumerate(tsets)}.__getitem__
+        blocks = list(itertools.combinations(range(v), 6))
+        cover = [tuple(map(tindex, itertools.combinations(b, t))) for b in blocks]
+        block_index = {b: i for i, b in enumerate(blocks)}
+        hit = _WHEEL_TABLES[key] = (blocks, cover, block_index, tsets)
+    return hit
+
+def _wheel_greedy(cover, n_t, max_tickets, rng):
+    uncovered = bytearray(b"\x01") * n_t
+    heap = [(-len(c), rng.random(), i) for i, c in enumerate(cover)]
+    heapq.heapify(heap)
+    chosen, remaining = [], n_t
+    while heap and remaining and (max_tickets is None or len(chosen) < max_tickets):
+        _, tie, i = heapq.heappop(heap)
+        gain = sum(map(uncovered.__getitem__, cover[i]))
+        if not gain:
+            continue
+        if heap and gain < -heap[0][0]:
+            heapq.heappush(heap, (-gain, tie, i))   # 分数已过期，放回去重新排队
+            continue
+        for x in cover[i]:
+            uncovered[x] = 0
+        remaining -= gain
+        chosen.append(i)
+    return chosen
+
+def _wheel_delta(counts, old, new):
+    """把覆盖 old 的一注换成覆盖 new 的一注后，未覆盖子集数的变化。"""
+    for x in old:
+        counts[x] -= 1
+    delta = sum(1 for x in old if not counts[x]) - sum(1 for x in new if not counts[x])
+    for x in old:
+        counts[x] += 1
+    return delta
+
+def _wheel_improve(chosen, v, t, deadline, rng):
+    """局部搜索（覆盖设计常用的模拟退火）：去掉一注，随机取一个未覆盖的 t 元子集 T，
+    在“已含 T 中 t-1 个号码”的各注里把一个非 T 号码换成 T 缺的那个，取最好的一步；
+    未覆盖数不增加就接受，增加时按温度以一定概率接受。重新达到全覆盖则再去掉一注，直到超时。"""
+    blocks, cover, block_index, tsets = _wheel_tables(v, t)
+    best = list(chosen)
+    sol = list(chosen)
+    counts = [0] * len(tsets)
+    for i in sol:
+        for x in cover[i]:
+            counts[x] += 1
+    while len(sol) > 1 and time.perf_counter() < deadline:
+        # 去掉独占覆盖最少的一注
+        drop = min(range(len(sol)), key=lambda p: sum(counts[x] == 1 for x in cover[sol[p]]))
+        for x in cover[sol.pop(drop)]:
+            counts[x] -= 1
+        missing = {x for x, c in enumerate(counts) if not c}
+        temp = 0.5
+        while missing and time.perf_counter() < deadline:
+            T = set(tsets[rng.choice(tuple(missing))])
+            moves, best_delta = [], None
+            for p, bi in enumerate(sol):
+                inside = [x for x in blocks[bi] if x in T]
+                if len(inside) != t - 1:
+                    continue
+                add = (T - set(inside)).pop()
+                for x in blocks[bi]:
+                    if x in T:
+                        continue
+                    new = block_index[tuple(sorted([y for y in blocks[bi] if y != x] + [add]))]
+                    delta = _wheel_delta(counts, cover[bi], cover[new])
+                    if best_delta is None or delta < best_delta:
+                        moves, best_delta = [(p, new)], delta
+                    elif delta == best_delta:
+                        moves.append((p, new))
+            if not moves:
+                continue
+            if best_delta > 0 and rng.random() >= 2.718281828 ** (-best_delta / temp):
+                continue
+            p, new = rng.choice(moves)
+            for x in cover[sol[p]]:
+                counts[x] -= 1
+                if not counts[x]:
+                    missing.add(x)
+            for x in cover[new]:
+                counts[x] += 1
+                missing.discard(x)
+            sol[p] = new
+            temp = max(0.05, temp * 0.9995)
+        if missing:
+            break
+        best = list(sol)
+    return best
+
+def wheel_tickets(pool, t=4, blues=None, max_tickets=None, seconds=1.0, seed=None, append=True):
+    """旋转矩阵：返回 (号码列表, 覆盖报告)。
+
+    pool 为 6-20 个红球（更大也可以，但组合表增长很快）；t 为保证覆盖的号码个数（2-6），
+    即开奖红球中只要有 t 个落在池里，就至少有一注同时含这 t 个号码。
+    max_tickets 限定注数时只做贪心，尽量覆盖更多子集；否则先贪心达到全覆盖，
+    再用 seconds 秒做局部搜索减少注数。blues 为蓝球列表，按注轮流使用，默认随机。
+    报告含 tickets / covered / total / coverage，以及 curve：前 i 注累计覆盖的子集数。
+    """
+    pool = sorted(set(int(x) for x in pool))
+    _check_numbers(pool, 33, "红球")
+    v = len(pool)
+    if v < 6:
+        raise ValueError("号码池至少需要 6 个红球")
+    if not 2 <= t <= 6:
+        raise ValueError("保证的号码个数应在 2-6 之间")
+    if blues:
+        _check_numbers(blues, 16, "蓝球")
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    blocks, cover, _, tsets = _wheel_tables(v, t)
+    chosen = _wheel_greedy(cover, len(tsets), max_tickets, rng)
+    if max_tickets is None and seconds > 0:
+        chosen = _wheel_improve(chosen, v, t, start + seconds, rng)
+    covered, curve, seen = 0, [], bytearray(len(tsets))
+    for i in chosen:
+        for x in cover[i]:
+            if not seen[x]:
+                seen[x] = 1
+                covered += 1
+        curve.append(covered)
+    now = time.time()
+    blues = list(blues or ())
+    tickets = [Ticket(tuple(pool[x] for x in blocks[i]),
+                      blues[n % len(blues)] if blues else rng.randint(1, 16), now)
+               for n, i in enumerate(chosen)]
+    if append:
+        _append_history(tickets)
+    report = {"pool": pool, "t": t, "tickets": len(tickets), "covered": covered, "total": len(tsets),
+              "coverage": covered / len(tsets), "curve": curve, "seconds": time.perf_counter() - start}
+    return tickets, report
@@ -0,0 +1,1009 @@
+"""Tkinter 图形界面（Windows 11 风格）。只有打开界面时才导入 tkinter。"""
+import tkinter as tk
+from tkinter import messagebox, ttk
+import time, sys, queue, threading
+from concurrent.futures import ThreadPoolExecutor
+import tkinter.font as tkfont   # 新增导入
+
+from . import instrument
+from .tickets import Ticket
+from .generate import (ConditionsInfeasible, GenerationCancelled, generate_random_tickets,
+                       generate_with_conditions, count_with_conditions, iter_with_conditions, wheel_tickets)
+from .records import (list_history, remove_history_at, save_favorite, remove_favorite, list_favorites,
+                      load_latest_draw, update_latest_draw, add_draw, add_draws, list_draws, parse_draws_text)
+from .compare import PRIZE_NAMES, PRIZE_TIERS, compare_favorites, favorites_draw_summaries
+from .stats import history_stats, draw_stats, hot_cold_weights, format_stats
+
+# ====== Windows 11 like palette ======
+WIN_BG            = "#F3F3F3"
+WIN_PANEL         = "#FFFFFF"
+WIN_PANEL_ALT     = "#F7F7F7"
+WIN_BORDER        = "#D9D9D9"
+WIN_ACCENT        = "#2563EB"
+WIN_ACCENT_HOVER  = "#1E55C7"
+WIN_ACCENT_PRESSED= "#174394"
+WIN_TEXT          = "#1F1F1F"
+WIN_TEXT_SECOND   = "#5A5A5A"
+WIN_HIGHLIGHT_BG  = "#E0EEFF"
+WIN_SCROLL_BG     = "#E6E6E6"
+WIN_SCROLL_THUMB  = "#C9C9C9"
+WIN_SCROLL_THUMB_H= "#B5B5B5"
+
+# 条件窗口“列出全部”最多显示的注数，更多时请用命令行导出
+_ENUM_SHOW_LIMIT = 200000
+
+# ===== DPI =====
+def enable_dpi_awareness():
+    if sys.platform.startswith("win"):
+        try:
+            from ctypes import windll
+            windll.shcore.SetProcessDpiAwareness(1)
+        except:
+            try:
+                windll.user32.SetProcessDPIAware()
+            except:
+                pass
+
+# ===== Win11 Style (TTK) =====
+def apply_win11_style(root):
+    style = ttk.Style(root)
+    try:
+        style.theme_use("clam")
+    except:
+        pass
+    style.configure(".", font=("Segoe UI", 10))
+    style.configure("TButton",
+                    background=WIN_PANEL_ALT,
+                    foreground=WIN_TEXT,
+                    padding=(14,6),
+                    borderwidth=0,
+                    focusthickness=0)
+    style.map("TButton",
+              background=[("active", "#EDEDED"), ("pressed", "#E0E0E0")])
+    style.configure("Accent.TButton",
+                    background=WIN_ACCENT,
+                    foreground="#FFFFFF")
+    style.map("Accent.TButton",
+              background=[("active", WIN_ACCENT_HOVER),
+                          ("pressed", WIN_ACCENT_PRESSED)])
+    style.configure("TEntry",
+                    fieldbackground=WIN_PANEL_ALT,
+                    bordercolor=WIN_BORDER,
+                    lightcolor=WIN_ACCENT,
+                    darkcolor=WIN_BORDER,
+                    padding=4)
+    # 滚动条
+    style.element_create("Plain.Horizontal.Scrollbar.trough", "from", "clam")
+    style.element_create("Plain.Vertical.Scrollbar.trough", "from", "clam")
+    style.configure("Vertical.TScrollbar",
+                    background=WIN_SCROLL_BG,
+                    troughcolor=WIN_SCROLL_BG,
+                    bordercolor=WIN_SCROLL_BG,
+                    lightcolor=WIN_SCROLL_BG,
+                    darkcolor=WIN_SCROLL_BG,
+                    arrowsize=14)
+    style.map("Vertical.TScrollbar",
+              background=[("active", WIN_SCROLL_THUMB_H)],
+              troughcolor=[("active", WIN_SCROLL_BG)])
+    # 去掉 focus 虚线
+    root.option_add("*TButton.highlightThickness", 0)
+    root.option_add("*TButton.takeFocus", 0)
+
+# ===== 圆角按钮 (Canvas) =====
+class Win11Button(tk.Canvas):
+    def __init__(self, master, text, command, accent=False):
+        super().__init__(master, bd=0, highlightthickness=0,
+                         bg=master["bg"])
+        self.command = command
+        self.accent = accent
+        self._radius = 6
+        self._w_pad = 8
+        self._h_pad = 4
+        self._text = text
+        if accent:
+            self.colors = {
+                "normal": WIN_ACCENT,
+                "hover": WIN_ACCENT_HOVER,
+                "press": WIN_ACCENT_PRESSED,
+                "fg": "#FFFFFF"
+            }
+        else:
+            self.colors = {
+                "normal": "#FFFFFF",
+                "hover": "#F2F2F2",
+                "press": "#E5E5E5",
+                "fg": WIN_TEXT
+            }
+        self._state = "normal"
+        self._draw()
+        self.bind("<Enter>", self._on_enter)
+        self.bind("<Leave>", self._on_leave)
+        self.bind("<ButtonPress-1>", self._on_press)
+        self.bind("<ButtonRelease-1>", self._on_release)
+
+    def _draw_round_rect(self, x1,y1,x2,y2,r, **kw):
+        self.create_arc(x1, y1, x1+2*r, y1+2*r, start=90, extent=90, style="pieslice", **kw)
+        self.create_arc(x2-2*r, y1, x2, y1+2*r, start=0, extent=90, style="pieslice", **kw)
+        self.create_arc(x2-2*r, y2-2*r, x2, y2, start=270, extent=90, style="pieslice", **kw)
+        self.create_arc(x1, y2-2*r, x1+2*r, y2, start=180, extent=90, style="pieslice", **kw)
+        self.create_rectangle(x1+r, y1, x2-r, y2, **kw)
+        self.create_rectangle(x1, y1+r, x2, y2-r, **kw)
+
+    def _draw(self):
+        self.delete("all")
+        txt_font = ("Segoe UI", 10)
+        # 使用 tkfont 而不是 tk.font
+        tw = tkfont.Font(font=txt_font).measure(self._text)
+        w = tw + self._w_pad*2
+        h = 28
+        self.config(width=w, height=h)
+        color = self.colors[self._state if self._state in ("hover","press") else "normal"]
+        self._draw_round_rect(0,0,w,h,self._radius, fill=color, outline=color)
+        self.create_text(w/2, h/2, text=self._text, fill=self.colors["fg"], font=txt_font)
+
+    def set_text(self, text):
+        self._text = text
+        self._draw()
+
+    def _on_enter(self, _):
+        self._state = "hover"
+        self._draw()
+    def _on_leave(self, _):
+        self._state = "normal"
+        self._draw()
+    def _on_press(self, _):
+        self._state = "press"
+        self._draw()
+    def _on_release(self, _):
+        inside = True
+        self._state = "hover"
+        self._draw()
+        if inside and self.command:
+            self.command()
+
+def styled_entry(parent, width=None):
+    e = tk.Entry(parent,
+                 bg=WIN_PANEL_ALT,
+                 fg=WIN_TEXT,
+                 insertbackground=WIN_TEXT,
+                 relief="flat",
+                 highlightthickness=1,
+                 highlightbackground=WIN_BORDER,
+                 highlightcolor=WIN_ACCENT,
+                 font=("Consolas", 11))
+    if width:
+        e.config(width=width)
+    return e
+
+class VirtualList:
+    """只把可见行放进 tk.Listbox 的虚拟列表。
+
+    数据保存在 items 中，由 render(item) 生成每行文字；滚动条、滚轮和方向键都改为
+    移动数据窗口，每次只重绘可见的几十行，十万条数据也不会卡住界面。
+    选中行按数据下标记录（selected_index），删除等操作据此直接找到对应记录。
+    """
+    def __init__(self, listbox, scrollbar):
+        self.lb = listbox
+        self.sb = scrollbar
+        self.items = []
+        self.render = str
+        self.top = 0
+        self.selected = None
+        self._line = None
+        listbox.config(exportselection=False, yscrollcommand="")
+        scrollbar.config(command=self.yview)
+        listbox.bind("<Configure>", lambda e: self._redraw())
+        listbox.bind("<<ListboxSelect>>", self._on_select)
+        listbox.bind("<MouseWheel>", self._on_wheel)
+        listbox.bind("<Button-4>", self._on_wheel)
+        listbox.bind("<Button-5>", self._on_wheel)
+        for key, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page"),
+                          ("<Home>", "home"), ("<End>", "end")):
+            listbox.bind(key, lambda e, step=step: self._on_key(step))
+
+    def __len__(self):
+        return len(self.items)
+
+    def _rows(self):
+        """当前能完整显示的行数。"""
+        h = self.lb.winfo_height()
+        if h <= 1:   # 尚未布局
+            return int(self.lb.cget("height"))
+        if self._line is None:
+            # 与 Tk 的计算一致：行高 = linespace + 1 + 2 * selectborderwidth
+            fm = tkfont.Font(font=self.lb.cget("font")).metrics("linespace")
+            self._line = fm + 1 + 2 * int(self.lb.cget("selectborderwidth"))
+        inset = int(self.lb.cget("highlightthickness")) + int(self.lb.cget("borderwidth"))
+        return max(1, (h - 2 * inset) // self._line)
+
+    def set_items(self, items, render=str):
+        instrument.count("ui.rows_set", len(items))
+        self.items = items
+        self.render = render
+        self.top = 0
+        self.selected = None
+        self._redraw()
+
+    def _redraw(self):
+        n, rows = len(self.items), self._rows()
+        self.top = max(0, min(self.top, n - rows))
+        end = min(n, self.top + rows + 1)   # 多画一行，填满底部的半行空间
+        self.lb.delete(0, tk.END)
+        if end > self.top:
+            with instrument.timer("ui.redraw"):
+                self.lb.insert(tk.END, *[self.render(self.items[i]) for i in range(self.top, end)])
+            instrument.count("ui.rows_inserted", end - self.top)
+        if self.selected is not None and self.top <= self.selected < end:
+            self.lb.selection_set(self.selected - self.top)
+        if n:
+            self.sb.set(self.top / n, min(1.0, (self.top + rows) / n))
+        else:
+            self.sb.set(0.0, 1.0)
+
+    def yview(self, *args):
+        """滚动条回调：("moveto", 比例) 或 ("scroll", 数量, "units"|"pages")。"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.items))
+        elif args[0] == "scroll":
+            step = self._rows() if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self._redraw()
+
+    def see(self, i):
+        rows = self._rows()
+        if i < self.top:
+            self.top = i
+        elif i >= self.top + rows:
+            self.top = i - rows + 1
+        self._redraw()
+
+    def _on_wheel(self, event):
+        up = getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0
+        self.yview("scroll", -3 if up else 3, "units")
+        return "break"
+
+    def _on_select(self, event):
+        sel = self.lb.curselection()
+        if sel:
+            self.selected = self.top + sel[0]
+
+    def _on_key(self, step):
+        n = len(self.items)
+        if not n:
+            return "break"
+        cur = self.selected if self.selected is not None else self.top
+        if step == "home":
+            cur = 0
+        elif step == "end":
+            cur = n - 1
+        elif step in ("page", "-page"):
+            cur += self._rows() * (1 if step == "page" else -1)
+        else:
+            cur += step
+        self.selected = max(0, min(n - 1, cur))
+        self.see(self.selected)
+        return "break"
+
+    def selected_index(self):
+        """选中行对应的数据下标，未选中返回 None。"""
+        return self.selected
+
+    def selected_item(self):
+        return None if self.selected is None else self.items[self.selected]
+
+    def remove(self, i):
+        """从数据中移除第 i 项并重绘。"""
+        del self.items[i]
+        if self.selected is not None:
+            if self.selected == i:
+                self.selected = None
+            elif self.selected > i:
+                self.selected -= 1
+        self._redraw()
+
+class _Task:
+    """后台任务的句柄：work(task) 可通过 task.progress 报告进度、检查 task.cancel。"""
+    def __init__(self, progress_q):
+        self.cancel = threading.Event()
+        self._q = progress_q
+
+    def progress(self, msg):
+        self._q.put(msg)   # 队列线程安全，由主线程轮询后显示
+
+class App:
+    def __init__(self, root):
+        # 调试：确认实际加载的文件与行号
+        print("[DEBUG] App.__init__ in file:", __file__)
+        print("[DEBUG] Before setting self.root, has attr root?", hasattr(self, "root"))
+        self.root = root  # 确保最早赋值
+        root.title("双色球号码生成 - JUDXLAB")
+        # 使用改进后的 _center（即使 self.root 未成功赋值也能 fallback）
+        root.geometry(self._center(820, 600))
+        root.configure(bg=WIN_BG)
+        root.update_idletasks()
+
+        apply_win11_style(root)
+        # 数据读写与生成都在这一个后台线程上串行执行，Tk 只在主线程操作
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._tasks = []
+        self._progress_q = queue.Queue()
+        self._polling = False
+        root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._build_ui()
+        self.current_mode = "history"  # history | favorites | compare | generated
+        self._compare = None   # 对照视图的 (开奖号码, 收藏掩码, 红球命中, 蓝球命中)
+        self.refresh_history()
+
+    def _center(self, w, h):
+        """
+        计算窗口居中位置。
+        若异常（比如 root 尚未挂到实例）则回退使用 tk._default_root。
+        """
+        r = getattr(self, "root", None)
+        if r is None:
+            from tkinter import _default_root
+            r = _default_root
+            print("[DEBUG] _center: self.root 不存在，使用 _default_root =", r)
+        if r is None:
+            # 仍拿不到，返回基础几何
+            return f"{w}x{h}+100+100"
+        try:
+            sw = r.winfo_screenwidth()
+            sh = r.winfo_screenheight()
+        except Exception as e:
+            print("[DEBUG] _center: 获取屏幕尺寸失败:", e)
+            return f"{w}x{h}+120+120"
+        x = (sw - w) // 2
+        y = (sh - h) // 2 - 20
+        return f"{w}x{h}+{x}+{y}"
+
+    def _panel(self, parent, **kw):
+        frame = tk.Frame(parent, bg=kw.get("bg", WIN_PANEL), bd=0, highlightthickness=1,
+                         highlightbackground=WIN_BORDER)
+        return frame
+
+    def _build_ui(self):
+        toolbar = self._panel(self.root)
+        toolbar.pack(fill="x", padx=18, pady=(16,10))
+        toolbar.configure(pady=8)
+
+        def add_btn(text, cmd, accent=False):
+            b = Win11Button(toolbar, text, cmd, accent=accent)
+            b.pack(side="left", padx=4)
+
+        def add_sep():
+            tk.Frame(toolbar, width=14, bg=toolbar["bg"]).pack(side="left")
+
+        # 生成组
+        add_btn("随机生成", self.gen_random, accent=True)
+        add_btn("条件生成", self.open_cond_win)
+        add_btn("旋转矩阵", self.open_wheel_win)
+        add_sep()
+        # 收藏相关
+        add_btn("收藏选中", self.collect_selected)
+        add_btn("查看收藏", self.show_favorites)
+        add_sep()
+        # 开奖/对照
+        add_btn("更新开奖号码", self.update_draw)
+        add_btn("批量开奖", self.open_bulk_draws)
+        add_btn("对照收藏", self.compare_favs)
+        add_sep()
+        add_btn("号码统计", self.show_stats)
+        add_btn("诊断", self.show_diagnostics)
+
+        main = self._panel(self.root)
+        main.pack(fill="both", expand=True, padx=18, pady=4)
+
+        list_frame = tk.Frame(main, bg=WIN_PANEL)
+        list_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.listbox = tk.Listbox(
+            list_frame,
+            height=18,
+            font=("Consolas", 13),
+            bg=WIN_PANEL_ALT,
+            fg=WIN_TEXT,
+            selectbackground=WIN_HIGHLIGHT_BG,
+            selectforeground=WIN_TEXT,
+            bd=0,
+            relief="flat",
+            activestyle="none",
+            highlightthickness=1,
+            highlightbackground=WIN_BORDER
+        )
+        self.listbox.pack(side="left", fill="both", expand=True)
+        # 绑定删除快捷键
+        self.listbox.bind("<Delete>", self._on_delete_key)
+        self.listbox.bind("<BackSpace>", self._on_delete_key)
+
+        # 自定义滚动条包一层使色块更自然
+        sb_style = ttk.Style()
+        sb = ttk.Scrollbar(list_frame, orient="vertical")
+        sb.pack(side="right", fill="y", padx=(4,0))
+        # 列表内容由 VirtualList 按数据驱动，只渲染可见行
+        self.view = VirtualList(self.listbox, sb)
+
+        status_panel = tk.Frame(self.root, bg=WIN_BG)
+        status_panel.pack(fill="x", padx=18, pady=(4,14))
+        self.status = tk.StringVar()
+        status_lbl = tk.Label(status_panel, textvariable=self.status,
+                              anchor="w", bg=WIN_PANEL, fg=WIN_TEXT_SECOND,
+                              bd=0, padx=12, pady=6,
+                              font=("Segoe UI", 9),
+                              highlightthickness=1,
+                              highlightbackground=WIN_BORDER)
+        status_lbl.pack(side="left", fill="x", expand=True)
+        self._status_lbl = status_lbl
+        self.cancel_btn = Win11Button(status_panel, "取消", self.cancel_tasks)
+
+    def set_status(self, msg):
+        self.status.set(msg)
+
+    # ----- 后台任务 -----
+    def run_task(self, work, done=None, busy=None, on_error=None, cancellable=False):
+        """在后台线程执行 work(task)，完成后在主线程调用 done(结果)。
+
+        work 抛出的异常交给 on_error(exc)，返回真值表示已处理，否则弹窗提示。
+        cancellable 为真时状态栏显示“取消”按钮。
+        """
+        task = _Task(self._progress_q)
+        if busy:
+            self.set_status(busy)
+        fut = self._executor.submit(instrument.profiled(work), task)
+        self._tasks.append((fut, task, done, on_error, cancellable))
+        if cancellable:
+            self.cancel_btn.pack(side="right", padx=(6, 0), before=self._status_lbl)
+        if not self._polling:
+            self._polling = True
+            self.root.after(50, self._poll_tasks)
+        return task
+
+    def cancel_tasks(self):
+        for _, task, _, _, cancellable in self._tasks:
+            if cancellable:
+                task.cancel.set()
+
+    def _poll_tasks(self):
+        msg = None
+        while True:
+            try:
+                msg = self._progress_q.get_nowait()
+            except queue.Empty:
+                break
+        if msg is not None:
+            self.set_status(msg)
+        pending = []
+        for entry in self._tasks:
+            fut, task, done, on_error, _ = entry
+            if not fut.done():
+                pending.append(entry)
+                continue
+            exc = fut.exception()
+            if isinstance(exc, GenerationCancelled):
+                self.set_status("已取消")
+            elif exc is not None:
+                if not (on_error and on_error(exc)):
+                    messagebox.showerror("错误", str(exc))
+            elif done:
+                done(fut.result())
+        self._tasks = pending
+        if not any(e[4] for e in pending):
+            self.cancel_btn.pack_forget()
+        if pending:
+            self.root.after(50, self._poll_tasks)
+        else:
+            self._polling = False
+
+    def _on_close(self):
+        for _, task, _, _, _ in self._tasks:
+            task.cancel.set()
+        self._executor.shutdown(wait=False)
+        self.root.destroy()
+
+    def refresh_history(self):
+        def done(tickets):
+            self.view.set_items(tickets, Ticket.format)
+            self.set_status("显示最近 50 条历史")
+            self.current_mode = "history"
+        self.run_task(lambda task: list_history(50), done, "正在读取历史…")
+
+    def gen_random(self):
+        def done(tickets):
+            self.view.set_items(tickets, Ticket.format)
+            self.set_status("生成 5 组随机号码 (按 Delete 删除选中)")
+            self.current_mode = "generated"
+        self.run_task(lambda task: generate_random_tickets(5), done, "正在生成…")
+
+    def open_cond_win(self):
+        win = tk.Toplevel(self.root)
+        win.title("条件生成")
+        win.configure(bg=WIN_BG)
+        win.geometry("+%d+%d" % (self.root.winfo_rootx()+60, self.root.winfo_rooty()+80))
+
+        entries = {}
+        def add_row(label, key, placeholder=""):
+            row = tk.Frame(win, bg=WIN_BG)
+            row.pack(fill="x", pady=6, padx=16)
+            tk.Label(row, text=label, width=14, anchor="w",
+                     bg=WIN_BG, fg=WIN_TEXT, font=("Segoe UI",10)).pack(side="left")
+            e = styled_entry(row)
+            e.pack(side="left", fill="x", expand=True)
+            if placeholder:
+                e.insert(0, placeholder)
+            entries[key] = e
+
+        add_row("组数", "count", "5")
+        add_row("奇数个数", "odd", "")
+        add_row("和值范围", "sum_range", "80-120")
+        add_row("排除红球", "ex_reds", "1 2")
+        add_row("排除蓝球", "ex_blues", "3 6")
+        add_row("区间分配", "ranges", "1-20:3,21-33:3")
+        row = tk.Frame(win, bg=WIN_BG)
+        row.pack(fill="x", pady=6, padx=16)
+        tk.Label(row, text="冷热加权", width=14, anchor="w",
+                 bg=WIN_BG, fg=WIN_TEXT, font=("Segoe UI",10)).pack(side="left")
+        weight_box = ttk.Combobox(row, values=("不加权", "热号优先", "冷号优先"), state="readonly")
+        weight_box.current(0)
+        weight_box.pack(side="left", fill="x", expand=True)
+        entries["weight"] = weight_box
+        row = tk.Frame(win, bg=WIN_BG)
+        row.pack(fill="x", pady=6, padx=16)
+        tk.Label(row, text="历史去重", width=14, anchor="w",
+                 bg=WIN_BG, fg=WIN_TEXT, font=("Segoe UI",10)).pack(side="left")
+        fresh_box = ttk.Combobox(row, values=("允许重复", "不与历史及收藏重复"), state="readonly")
+        fresh_box.current(0)
+        fresh_box.pack(side="left", fill="x", expand=True)
+        entries["fresh"] = fresh_box
+
+        # 满足条件的注数：输入变化后稍等片刻重新精确计数（毫秒级，直接在界面线程算）
+        count_lbl = tk.Label(win, text="", anchor="w", bg=WIN_BG, fg=WIN_TEXT_SECOND, font=("Segoe UI",10))
+        count_lbl.pack(fill="x", padx=16)
+        pending = [None]
+        def recount():
+            pending[0] = None
+            if not win.winfo_exists():
+                return
+            _, cond = self._cond_from_entries(entries)
+            try:
+                c = count_with_conditions(**cond)
+            except Exception:
+                count_lbl.config(text="条件有误")
+                return
+            count_lbl.config(text=f"满足条件：红球 {c['reds']:,} 种 × 蓝球 {c['blues']} 个 = {c['total']:,} 注")
+        def schedule(_event=None):
+            if pending[0] is not None:
+                win.after_cancel(pending[0])
+            pending[0] = win.after(200, recount)
+        for w in entries.values():
+            w.bind("<KeyRelease>", schedule, add="+")
+        recount()
+
+        btn_bar = tk.Frame(win, bg=WIN_BG)
+        btn_bar.pack(pady=10)
+        Win11Button(btn_bar, "生成", lambda: self._do_cond(entries, win), accent=True).pack(side="left", padx=4)
+        Win11Button(btn_bar, "列出全部", lambda: self._list_cond(entries, win)).pack(side="left", padx=4)
+        Win11Button(btn_bar, "取消", win.destroy).pack(side="left", padx=4)
+
+    @staticmethod
+    def _cond_from_entries(entries):
+        """读条件窗口的输入，返回 (组数, generate_with_conditions 的条件参数)。"""
+        def get_int(v, default=None):
+            v = v.strip()
+            return int(v) if v.isdigit() else default
+        try:
+            count = get_int(entries["count"].get(), 1)
+        except:
+            count = 1
+        odd_txt = entries["odd"].get().strip()
+        odd = get_int(odd_txt, None)
+        sum_rng = None
+        sr = entries["sum_range"].get().strip()
+        if "-" in sr:
+            try:
+                a,b = map(int, sr.split("-"))
+                sum_rng = (min(a,b), max(a,b))
+            except:
+                pass
+        ex_reds = {int(x) for x in entries["ex_reds"].get().split() if x.isdigit()}
+        ex_blues = {int(x) for x in entries["ex_blues"].get().split() if x.isdigit()}
+        rr_txt = entries["ranges"].get().strip()
+        red_ranges = None
+        if rr_txt:
+            try:
+                red_ranges=[]
+                for seg in rr_txt.split(","):
+                    rg,k = seg.split(":")
+                    a,b = rg.split("-")
+                    red_ranges.append((int(a), int(b), int(k)))
+                if sum(x[2] for x in red_ranges)!=6:
+                    red_ranges=None
+            except:
+                red_ranges=None
+        return count, {"red_ranges": red_ranges, "odd_count": odd, "sum_range": sum_rng,
+                       "exclude_reds": ex_reds, "exclude_blues": ex_blues}
+
+    def _list_cond(self, entries, win):
+        """列出满足条件的全部号码（不写入历史）；太多时提示改用命令行 enum 导出。"""
+        _, cond = self._cond_from_entries(entries)
+        total = count_with_conditions(**cond)["total"]
+        if total > _ENUM_SHOW_LIMIT:
+            messagebox.showinfo("组合太多", f"满足条件的号码有 {total:,} 注，超过 {_ENUM_SHOW_LIMIT:,} 注不在列表中显示，"
+                                "可用命令行 python 2balls.py enum 导出", parent=win)
+            return
+        def work(task):
+            res = []
+            for masks in iter_with_conditions(**cond):
+                if task.cancel.is_set():
+                    raise GenerationCancelled()
+                res.extend(map(Ticket.from_mask, masks))
+                task.progress(f"正在列出 {len(res)}/{total}…")
+            return res
+        def done(tickets):
+            self.view.set_items(tickets, Ticket.format)
+            self.set_status(f"满足条件的号码共 {len(tickets)} 注（未写入历史）")
+            self.current_mode = "generated"
+            if win.winfo_exists():
+                win.destroy()
+        self.run_task(work, done, "正在列出…", cancellable=True)
+
+    def _do_cond(self, entries, win):
+        count, cond = self._cond_from_entries(entries)
+        mode = {"热号优先": "hot", "冷号优先": "cold"}.get(entries["weight"].get())
+        fresh = entries["fresh"].get() == "不与历史及收藏重复"
+        def work(task):
+            weights = None
+            if mode:
+                # 优先按开奖档案统计冷热，没有档案时退回历史号码
+                weights = hot_cold_weights(mode) or hot_cold_weights(mode, "history")
+            return generate_with_conditions(
+                count=count,
+                progress=lambda n, total: task.progress(f"条件生成中 {n}/{total}…"),
+                cancel=task.cancel,
+                weights=weights,
+                fresh=fresh,
+                **cond
+            )
+        def done(tickets):
+            self.view.set_items(tickets, Ticket.format)
+            self.set_status(f"条件生成 {len(tickets)} 组")
+            if win.winfo_exists():
+                win.destroy()
+            self.current_mode = "generated"
+        def on_error(e):
+            if not isinstance(e, ConditionsInfeasible):
+                return False
+            self.set_status("条件过紧")
+            parent = win if win.winfo_exists() else self.root
+            extra = "（已除去历史和收藏里出现过的号码）" if fresh else ""
+            messagebox.showwarning("条件过紧", f"满足条件的组合只有 {e.total} 种{extra}，无法生成 {e.count} 组", parent=parent)
+            return True
+        self.run_task(work, done, "条件生成中…", on_error, cancellable=True)
+
+    def open_wheel_win(self):
+        win = tk.Toplevel(self.root)
+        win.title("旋转矩阵")
+        win.configure(bg=WIN_BG)
+        win.geometry("+%d+%d" % (self.root.winfo_rootx()+60, self.root.winfo_rooty()+80))
+        entries = {}
+        for label, key, placeholder in (("红球池(6-20个)", "pool", "1 3 5 8 12 15 17 21 24 28 30 33"),
+                                        ("保证几个号码", "t", "4"),
+                                        ("蓝球(可多个)", "blues", ""),
+                                        ("最多注数(可选)", "max", "")):
+            row = tk.Frame(win, bg=WIN_BG)
+            row.pack(fill="x", pady=6, padx=16)
+            tk.Label(row, text=label, width=14, anchor="w",
+                     bg=WIN_BG, fg=WIN_TEXT, font=("Segoe UI",10)).pack(side="left")
+            e = styled_entry(row, width=36)
+            e.pack(side="left", fill="x", expand=True)
+            e.insert(0, placeholder)
+            entries[key] = e
+        def do_wheel():
+            pool = [int(x) for x in entries["pool"].get().replace(",", " ").split() if x.isdigit()]
+            t_txt = entries["t"].get().strip()
+            t = int(t_txt) if t_txt.isdigit() else 4
+            blues = [int(x) for x in entries["blues"].get().replace(",", " ").split() if x.isdigit()]
+            max_txt = entries["max"].get().strip()
+            max_tickets = int(max_txt) if max_txt.isdigit() and int(max_txt) > 0 else None
+            def done(res):
+                tickets, report = res
+                self.view.set_items(tickets, Ticket.format)
+                self.set_status(f"旋转矩阵 {report['tickets']} 注，覆盖 {report['covered']}/{report['total']} "
+                                f"个{report['t']}码组合（{report['coverage']:.1%}）")
+                self.current_mode = "generated"
+                if win.winfo_exists():
+                    win.destroy()
+            def on_error(e):
+                if not isinstance(e, ValueError):
+                    return False
+                messagebox.showerror("错误", str(e), parent=win if win.winfo_exists() else self.root)
+                return True
+            self.run_task(lambda task: wheel_tickets(pool, t, blues, max_tickets), done,
+                          "正在计算旋转矩阵…", on_error)
+        btn_bar = tk.Frame(win, bg=WIN_BG)
+        btn_bar.pack(pady=10)
+        Win11Button(btn_bar, "生成", do_wheel, accent=True).pack(side="left", padx=4)
+        Win11Button(btn_bar, "取消", win.destroy).pack(side="left", padx=4)
+
+    def collect_selected(self):
+        item = self.view.selected_item()
+        if item is None:
+            messagebox.showinfo("提示","先选择一行")
+            return
+        t = self._row_ticket(item)
+        if t is None:
+            messagebox.showerror("错误","该行不是号码")
+            return
+        t = Ticket(t.reds, t.blue, time.time())
+        def done(added):
+            if not added:
+                self.set_status("该号码已在收藏中")
+                return
+            self.set_status("已收藏")
+            messagebox.showinfo("提示","收藏成功")
+        self.run_task(lambda task: save_favorite(t), done)
+
+    def show_favorites(self):
+        def done(favs):
+            self.view.set_items(favs, Ticket.format)
+            self.set_status(f"收藏 {len(favs)} 条 (按 Delete 删除选中)")
+            self.current_mode = "favorites"
+        self.run_task(lambda task: list_favorites(), done, "正在读取收藏…")
+
+    def update_draw(self):
+        win = tk.Toplevel(self.root)
+        win.title("更新开奖号码")
+        win.configure(bg=WIN_BG)
+        def lab(txt):
+            return tk.Label(win, text=txt, bg=WIN_BG, fg=WIN_TEXT, font=("Segoe UI",10))
+        lab("红球(6个空格分隔)").pack(pady=(12,4))
+        red_entry = styled_entry(win, width=40)
+        red_entry.pack(padx=16)
+        lab("蓝球").pack(pady=(12,4))
+        blue_entry = styled_entry(win, width=10)
+        blue_entry.pack(padx=16)
+        lab("期号(可选，填写后存入开奖档案)").pack(pady=(12,4))
+        issue_entry = styled_entry(win, width=20)
+        issue_entry.pack(padx=16)
+        lab("开奖日期(可选，如 2025-08-12)").pack(pady=(12,4))
+        date_entry = styled_entry(win, width=20)
+        date_entry.pack(padx=16)
+        btn_bar = tk.Frame(win, bg=WIN_BG)
+        btn_bar.pack(pady=14)
+        def do_update():
+            reds = red_entry.get().split()
+            blue = blue_entry.get().strip()
+            issue = issue_entry.get().strip()
+            if len(reds)!=6 or not all(r.isdigit() for r in reds) or not blue.isdigit():
+                messagebox.showerror("错误","格式不正确")
+                return
+            if issue and not issue.isdigit():
+                messagebox.showerror("错误","期号应为数字")
+                return
+            date = date_entry.get().strip()
+            def work(task):
+                t = update_latest_draw((list(map(int, reds)), int(blue)))
+                if t and issue:
+                    add_draw(issue, t.reds, t.blue, date)
+                return t
+            def done(t):
+                if t:
+                    self.set_status("已更新开奖号码")
+                    messagebox.showinfo("成功", t.format())
+                    if win.winfo_exists():
+                        win.destroy()
+            self.run_task(work, done)
+        Win11Button(btn_bar, "保存", do_update, accent=True).pack(side="left", padx=4)
+        Win11Button(btn_bar, "取消", win.destroy).pack(side="left", padx=4)
+
+    def open_bulk_draws(self):
+        """粘贴多期开奖：存入开奖档案，并把全部收藏对照这些开奖（一遍扫描收藏）。"""
+        win = tk.Toplevel(self.root)
+        win.title("批量开奖")
+        win.configure(bg=WIN_BG)
+        tk.Label(win, text="每行一期：期号 [日期] 红球×6 蓝球，如 2025090 2025-08-12 01 05 12 19 23 30 08",
+                 bg=WIN_BG, fg=WIN_TEXT, font=("Segoe UI", 10)).pack(padx=16, pady=(12, 4), anchor="w")
+        box = tk.Text(win, font=("Consolas", 11), bg=WIN_PANEL, fg=WIN_TEXT, bd=0, width=64, height=16,
+                      highlightthickness=1, highlightbackground=WIN_BORDER, highlightcolor=WIN_ACCENT)
+        box.pack(fill="both", expand=True, padx=16)
+        btn_bar = tk.Frame(win, bg=WIN_BG)
+        btn_bar.pack(pady=14)
+
+        def do_import():
+            text = box.get("1.0", tk.END)
+            def work(task):
+                draws, bad = parse_draws_text(text)
+                if not draws:
+                    return None, bad
+                added = add_draws(draws)
+                # 粘贴的开奖里含档案中最新一期时，同时设为最新开奖
+                newest = list_draws()[-1]
+                if any(d.issue == newest.issue for d in draws):
+                    update_latest_draw((newest.reds, newest.blue))
+                draws.sort(key=lambda d: (len(d.issue), d.issue), reverse=True)
+                return (draws, favorites_draw_summaries(draws), added), bad
+            def done(res):
+                data, bad = res
+                if data is None:
+                    messagebox.showerror("错误", f"没有可识别的开奖（无法解析 {bad} 行）", parent=win)
+                    return
+                draws, summaries, added = data
+                rows = [f"共 {len(draws)} 期，收藏 {summaries[0]['tickets']} 注"]
+                for d, sm in zip(draws, summaries):
+                    best = next((k for k in range(1, 7) if sm["counts"][k]), 0)
+                    tag = f"  最高{PRIZE_NAMES[best]}" if best else ""
+                    rows.append(f"{d.issue} {d.date or '':<10} {d.format()}  ->  中奖 {sm['winning']} 注"
+                                f"  奖金 {sm['payout']} 元{tag}")
+                self.view.set_items(rows)
+                self.current_mode = "draws"
+                total = sum(sm["payout"] for sm in summaries)
+                self.set_status(f"新增 {added} 期（无法解析 {bad} 行），收藏对照奖金合计 {total} 元")
+                if win.winfo_exists():
+                    win.destroy()
+            self.run_task(work, done, "正在导入并对照…")
+
+        Win11Button(btn_bar, "导入并对照", do_import, accent=True).pack(side="left", padx=4)
+        Win11Button(btn_bar, "取消", win.destroy).pack(side="left", padx=4)
+
+    def compare_favs(self):
+        def work(task):
+            win_ticket = load_latest_draw()
+            if not win_ticket:
+                return None
+            # 按开奖缓存，删除 / 新增收藏后只对照变化的部分
+            masks, red_hits, blue_hits, summary = compare_favorites(win_ticket)
+            return (win_ticket, masks, red_hits, blue_hits), summary
+        def done(res):
+            if res is None:
+                self.set_status("暂无最新开奖号码")
+                messagebox.showinfo("提示","暂无最新开奖号码")
+                return
+            self._compare, summary = res
+            # 第 0 行是开奖号码，第 i 行是第 i-1 注收藏；号码只在画到可见行时才还原
+            self.view.set_items(range(len(self._compare[1]) + 1), self._render_compare_row)
+            self.set_status(f"对照完成：中奖 {summary['winning']} 注，奖金合计 {summary['payout']} 元")
+            self.current_mode = "compare"
+        self.run_task(work, done, "正在对照…")
+
+    def show_stats(self):
+        def work(task):
+            return format_stats(draw_stats(), "期"), format_stats(history_stats(), "注")
+        def done(res):
+            win = tk.Toplevel(self.root)
+            win.title("号码统计")
+            win.configure(bg=WIN_BG)
+            nb = ttk.Notebook(win)
+            nb.pack(fill="both", expand=True, padx=12, pady=12)
+            for title, text in zip(("开奖档案", "历史号码"), res):
+                box = tk.Text(nb, font=("Consolas", 11), bg=WIN_PANEL_ALT, fg=WIN_TEXT,
+                              bd=0, width=70, height=34, highlightthickness=0)
+                box.insert("1.0", text)
+                box.configure(state="disabled")
+                nb.add(box, text=title)
+            self.set_status("统计完成")
+        self.run_task(work, done, "正在统计…")
+
+    def show_diagnostics(self):
+        """运行统计：计数器、计时直方图与缓存命中；可开关统计、重置、导出 JSON、开始/停止 profile。"""
+        win = tk.Toplevel(self.root)
+        win.title("诊断")
+        win.configure(bg=WIN_BG)
+        box = tk.Text(win, font=("Consolas", 11), bg=WIN_PANEL_ALT, fg=WIN_TEXT,
+                      bd=0, width=100, height=32, highlightthickness=0)
+        box.pack(fill="both", expand=True, padx=12, pady=(12, 6))
+        btn_bar = tk.Frame(win, bg=WIN_BG)
+        btn_bar.pack(pady=(0, 12))
+
+        def refresh():
+            box.configure(state="normal")
+            box.delete("1.0", tk.END)
+            text = instrument.format_snapshot()
+            if not instrument.ENABLED:
+                text += "\n\n（统计未开启：点“开启统计”，或设置环境变量 DCB_INSTRUMENT=1 / 命令行 --instrument）"
+            box.insert("1.0", text)
+            box.configure(state="disabled")
+            toggle.set_text("关闭统计" if instrument.ENABLED else "开启统计")
+            prof.set_text("停止 profile" if instrument.profiling() else "开始 profile")
+
+        def do_toggle():
+            instrument.enable(not instrument.ENABLED)
+            refresh()
+
+        def do_reset():
+            instrument.reset()
+            refresh()
+
+        def do_dump():
+            try:
+                path = instrument.dump()
+            except OSError as e:
+                messagebox.showerror("导出失败", str(e), parent=win)
+                return
+            self.set_status(f"已导出 {path}")
+
+        def do_profile():
+            if instrument.profiling():
+                path = instrument.stop_profile()
+                self.set_status(f"profile 已保存到 {path}")
+            else:
+                instrument.start_profile()
+                self.set_status("profile 记录中…")
+            refresh()
+
+        Win11Button(btn_bar, "刷新", refresh, accent=True).pack(side="left", padx=4)
+        toggle = Win11Button(btn_bar, "开启统计", do_toggle)
+        toggle.pack(side="left", padx=4)
+        Win11Button(btn_bar, "重置", do_reset).pack(side="left", padx=4)
+        Win11Button(btn_bar, "导出 JSON", do_dump).pack(side="left", padx=4)
+        prof = Win11Button(btn_bar, "开始 profile", do_profile)
+        prof.pack(side="left", padx=4)
+        refresh()
+
+    def _render_compare_row(self, i):
+        win_ticket, masks, red_hits, blue_hits = self._compare
+        if i == 0:
+            return "最新: " + win_ticket.format()
+        rh, bh = red_hits[i - 1], blue_hits[i - 1]
+        tier = PRIZE_TIERS[rh][bh]
+        tag = f"  {PRIZE_NAMES[tier]}" if tier else ""
+        return f"{Ticket.from_mask(masks[i - 1]).format()}  ->  红:{rh}  蓝:{bh}{tag}"
+
+    def _row_ticket(self, item):
+        """列表行对应的号码；对照视图的表头行返回 None。"""
+        if isinstance(item, Ticket):
+            return item
+        if self.current_mode == "compare" and item:
+            return Ticket.from_mask(self._compare[1][item - 1])
+        return None
+
+    def delete_selected(self):
+        idx = self.view.selected_index()
+        if idx is None:
+            messagebox.showinfo("提示", "先选择一行")
+            return
+        t = self._row_ticket(self.view.items[idx])
+        if t is None:
+            messagebox.showinfo("提示", "该行不可删除")
+            return
+        ticket_fmt = t.format()
+        mode = self.current_mode
+        if mode == "generated":
+            # generated 视图只是临时显示，直接从列表移除
+            self.view.remove(idx)
+            self.set_status("已从临时列表移除")
+            return
+
+        def work(task):
+            if mode in ("favorites", "compare"):
+                return remove_favorite(t)
+            # 历史视图第 idx 行就是倒数第 idx 条记录
+            return remove_history_at(idx, t)
+        def done(removed):
+            if not removed:
+                self.set_status("未找到匹配记录 (可能已删除)")
+                return
+            if mode == "compare":
+                self.compare_favs()
+            elif mode == "favorites":
+                if self.current_mode == "favorites" and idx < len(self.view) and self.view.items[idx] is t:
+                    self.view.remove(idx)
+            else:
+                self.refresh_history()
+            self.set_status("已删除: " + ticket_fmt)
+        self.run_task(work, done)
+
+    def _on_delete_key(self, event):
+        if self.current_mode in ("favorites", "history", "compare", "generated"):
+            self.delete_selected()
+
+def main():
+    enable_dpi_awareness()
+    root = tk.Tk()
+    try:
+        root.tk.call("tk", "scaling", 1.15)
+    except:
+        pass
+    App(root)
+    root.minsize(760, 540)
+    root.mainloop()
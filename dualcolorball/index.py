@@ -0,0 +1,276 @@
+"""按号码的倒排索引（位图），支持含全部 / 含任一 / 至少 k 个相同的查询。"""
+import itertools, json, sys, threading, zlib
+from array import array
+
+from .fileio import _count_cache, _atomic_write
+from .tickets import Ticket, ticket_masks, _lane, _check_numbers
+from .storage import get_storage, current_storage, on_storage_close
+
+# ===== 号码倒排索引 =====
+# 每个红球、蓝球各一个位图（Python 大整数，第 i 位为 1 表示第 i 注含该号码），
+# “含全部 / 含任一”是位图的与 / 或，“至少 k 个红球相同”用位切片加法器逐位相加后比较，
+# 都是整块的大整数运算，千万注也只要毫秒级。历史索引连同掩码压缩后存为 .idx 文件，
+# 下次启动时版本相符就直接载入。
+_INDEX_TABLES = None
+
+def _index_tables():
+    """_BIT_AT[b][k]：把字节的第 b 位移到第 k 位；_BLUE_AT[v][k]：蓝球车道（blue<<1 | 红33）等于 v 时置第 k 位。"""
+    global _INDEX_TABLES
+    if _INDEX_TABLES is None:
+        bit_at = [[bytes(((x >> b) & 1) << k for x in range(256)) for k in range(8)] for b in range(8)]
+        blue_at = [[bytes((x >> 1 == v) << k for x in range(256)) for k in range(8)] for v in range(17)]
+        _INDEX_TABLES = (bit_at, blue_at)
+    return _INDEX_TABLES
+
+class TicketIndex:
+    """一组号码（按存储顺序编号）的倒排索引。reds[r] / blues[v] 为含该号码的注的位图。"""
+    def __init__(self, masks=()):
+        self.masks = array("Q")
+        self.reds = [0] * 34    # reds[0] 不用
+        self.blues = [0] * 17
+        self.version = 0        # 每删除一次加一，追加不变
+        self.deleted = []       # 删除日志：第 v 次删除的位置，供按位置对齐的缓存重放
+        self.extend(masks)
+
+    def __len__(self):
+        return len(self.masks)
+
+    def extend(self, masks):
+        """在末尾追加一批掩码。每个 8 注一组的第 k 注取自 raw[8k+lane::64]，查表后各占一位，拼成位图。"""
+        masks = masks if isinstance(masks, array) else array("Q", masks)
+        if not masks:
+            return
+        bit_at, blue_at = _index_tables()
+        n0 = len(self.masks)
+        raw = masks.tobytes() + bytes(-len(masks) % 8 * 8)   # 补零注凑满 8 的倍数，零注不含任何号码
+        for j in range(5):
+            subs = [raw[8 * k + _lane(j)::64] for k in range(8)]
+            for b in range(8 if j < 4 else 1):
+                bm = sum(int.from_bytes(s.translate(bit_at[b][k]), "little") for k, s in enumerate(subs))
+                self.reds[8 * j + b + 1] |= bm << n0
+        for v in range(1, 17):
+            bm = sum(int.from_bytes(s.translate(blue_at[v][k]), "little") for k, s in enumerate(subs))
+            self.blues[v] |= bm << n0
+        self.masks.extend(masks)
+
+    def delete(self, pos):
+        """删除第 pos 注，之后的编号依次前移。"""
+        low = (1 << pos) - 1
+        for bms in (self.reds, self.blues):
+            for i, b in enumerate(bms):
+                if b:
+                    bms[i] = (b & low) | ((b >> (pos + 1)) << pos)
+        del self.masks[pos]
+        self.deleted.append(pos)
+        self.version += 1
+
+    def _all(self):
+        return (1 << len(self.masks)) - 1
+
+    def contains_all(self, reds=(), blue=None):
+        _check_numbers(reds, 33, "红球")
+        bm = self._all()
+        for r in reds:
+            bm &= self.reds[r]
+        if blue is not None:
+            _check_numbers((blue,), 16, "蓝球")
+            bm &= self.blues[blue]
+        return bm
+
+    def contains_any(self, reds=(), blues=()):
+        _check_numbers(reds, 33, "红球")
+        _check_numbers(blues, 16, "蓝球")
+        bm = 0
+        for r in reds:
+            bm |= self.reds[r]
+        for v in blues:
+            bm |= self.blues[v]
+        return bm
+
+    def at_least(self, reds, k):
+        """与 reds 至少有 k 个红球相同的注。planes[p] 为各注命中数的第 p 位。"""
+        reds = set(reds)
+        _check_numbers(reds, 33, "红球")
+        if k <= 0:
+            return self._all()
+        planes = []
+        for r in reds:
+            carry, p = self.reds[r], 0
+            while carry:
+                if p == len(planes):
+                    planes.append(carry)
+                    break
+                planes[p], carry = planes[p] ^ carry, planes[p] & carry
+                p += 1
+        if k >= 1 << len(planes):
+            return 0
+        # 从高位到低位比较 命中数 与 k
+        gt, eq = 0, self._all()
+        for p in range(len(planes) - 1, -1, -1):
+            if (k >> p) & 1:
+                eq &= planes[p]
+            else:
+                gt |= eq & planes[p]
+                eq &= ~planes[p]
+        return gt | eq
+
+    def positions(self, bm, limit=None, reverse=False):
+        """位图中置位的编号，默认升序；reverse 为真时从大到小。"""
+        if limit is not None and limit <= 256:
+            res = []
+            while bm and len(res) < limit:
+                i = bm.bit_length() - 1 if reverse else (bm & -bm).bit_length() - 1
+                res.append(i)
+                bm ^= 1 << i
+            return res
+        n = len(self.masks)
+        raw = bm.to_bytes((n + 7) // 8, "little")
+        bits = bytearray(len(raw) * 8)
+        bit_at = _index_tables()[0]
+        for k in range(8):
+            bits[k::8] = raw.translate(bit_at[k][0])
+        res = list(itertools.compress(range(n), bits))
+        if reverse:
+            res.reverse()
+        return res[:limit] if limit else res
+
+    def dumps(self, sig):
+        blobs = [zlib.compress(self.masks.tobytes(), 1)]
+        size = (len(self.masks) + 7) // 8
+        blobs += [zlib.compress(b.to_bytes(size, "little"), 1) for b in self.reds[1:] + self.blues[1:]]
+        head = {"v": 1, "sig": sig, "n": len(self.masks), "order": sys.byteorder,
+                "sizes": [len(b) for b in blobs]}
+        return json.dumps(head).encode() + b"\n" + b"".join(blobs)
+
+    @classmethod
+    def loads(cls, data, sig):
+        """data 为 dumps 的结果；版本与 sig 不符或文件损坏时返回 None。"""
+        try:
+            nl = data.index(b"\n")
+            head = json.loads(data[:nl])
+            if head.get("v") != 1 or head.get("sig") != sig or len(head["sizes"]) != 50:
+                return None
+            pos, parts = nl + 1, []
+            for size in head["sizes"]:
+                parts.append(zlib.decompress(data[pos:pos + size]))
+                pos += size
+            idx = cls()
+            idx.masks.frombytes(parts[0])
+            if head["order"] != sys.byteorder:
+                idx.masks.byteswap()
+            if len(idx.masks) != head["n"]:
+                return None
+            bms = [int.from_bytes(p, "little") for p in parts[1:]]
+            idx.reds[1:], idx.blues[1:] = bms[:33], bms[33:]
+            return idx
+        except:
+            return None
+
+class _IndexedSource:
+    """历史或收藏的索引：首次查询时建立（历史先尝试载入 .idx），之后随本进程的
+    追加 / 删除增量维护；数据被其他进程改过（版本不符）时重建。"""
+    def __init__(self, name, persist):
+        self.name = name
+        self.persist = persist
+        self.index = None
+        self.storage = None
+        self.sig = None
+        self.dirty = False     # 本进程改过数据，版本变化是自己造成的
+        self.unsaved = False   # 与磁盘上的 .idx 不一致
+        self.lock = threading.RLock()
+
+    def _sig(self, st):
+        sig = st.history_sig() if self.name == "history" else st.favorite_sig()
+        return list(sig) if sig is not None else None
+
+    def _load_masks(self, st):
+        return st.history_masks() if self.name == "history" else st.favorite_masks()
+
+    def get(self):
+        st = get_storage()
+        with self.lock:
+            sig = self._sig(st)
+            if self.index is not None and self.storage is st and (self.dirty or sig == self.sig):
+                _count_cache("index." + self.name, True)
+                self.sig, self.dirty = sig, False
+                return self.index
+            _count_cache("index." + self.name, False)
+            idx = None
+            if self.persist:
+                try:
+                    idx = TicketIndex.loads(st.index_path(self.name).read_bytes(), sig)
+                except OSError:
+                    pass
+            self.unsaved = idx is None
+            if idx is None:
+                idx = TicketIndex(self._load_masks(st))
+            self.index, self.storage, self.sig, self.dirty = idx, st, sig, False
+            self.save()
+            return idx
+
+    def _live(self):
+        return self.index is not None and self.storage is current_storage()
+
+    def on_append(self, tickets):
+        with self.lock:
+            if self._live():
+                self.index.extend(ticket_masks(tickets))
+                self.dirty = self.unsaved = True
+
+    def on_delete(self, pos=None, mask=None, from_end=False):
+        with self.lock:
+            if not self._live():
+                return
+            if mask is not None:
+                try:
+                    pos = self.index.masks.index(mask)
+                except ValueError:
+                    self.index = None
+                    return
+            elif from_end:
+                pos = len(self.index) - 1 - pos
+            self.index.delete(pos)
+            self.dirty = self.unsaved = True
+
+    def save(self):
+        """把索引写入 .idx（只对历史）；数据已被其他进程改过时不写，下次重建。"""
+        with self.lock:
+            if not (self.persist and self.unsaved and self.index is not None):
+                return
+            sig = self._sig(self.storage)
+            if sig is None or (not self.dirty and sig != self.sig):
+                return
+            try:
+                _atomic_write(self.storage.index_path(self.name), self.index.dumps(sig), binary=True)
+            except OSError:
+                return
+            self.sig, self.dirty, self.unsaved = sig, False, False
+
+_HISTORY_INDEX = _IndexedSource("history", persist=True)
+_FAVORITE_INDEX = _IndexedSource("favorites", persist=False)
+on_storage_close(_HISTORY_INDEX.save)
+
+def ticket_index(source="history"):
+    """"history" 或 "favorites" 的 TicketIndex，只读使用。"""
+    return (_HISTORY_INDEX if source == "history" else _FAVORITE_INDEX).get()
+
+def _indexed_query(source, query, limit):
+    idx = ticket_index(source)
+    pos = idx.positions(query(idx), limit, reverse=source == "history")
+    masks = idx.masks
+    return [Ticket.from_mask(masks[i]) for i in pos]
+
+# 以下查询返回的 Ticket 只有号码（ts 为 0）；历史按新的在前，收藏按收藏顺序。
+def tickets_with_all(reds, blue=None, source="history", limit=None):
+    """含全部 reds 红球（且蓝球为 blue）的号码。"""
+    return _indexed_query(source, lambda idx: idx.contains_all(reds, blue), limit)
+
+def tickets_with_any(reds=(), blues=(), source="history", limit=None):
+    """含 reds 中任一红球或 blues 中任一蓝球的号码。"""
+    return _indexed_query(source, lambda idx: idx.contains_any(reds, blues), limit)
+
+def tickets_overlapping(reds, k, source="history", limit=None):
+    """与 reds（可以直接传 Ticket）至少有 k 个红球相同的号码。"""
+    if isinstance(reds, Ticket):
+        reds = reds.reds
+    return _indexed_query(source, lambda idx: idx.at_least(reds, k), limit)
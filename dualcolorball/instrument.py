@@ -0,0 +1,230 @@
+"""可选的运行统计：热点路径的计时直方图、计数器，以及整段会话的 cProfile。
+
+默认关闭，关闭时各埋点只多一次全局开关判断。开启方式：
+    环境变量 DCB_INSTRUMENT=1，或 python 2balls.py --instrument <命令> ...
+    环境变量 DCB_PROFILE=1，或 --profile：用 cProfile 记录整个会话，结束时在
+    程序目录（BASE）写出 profile-<时间>.prof 及同名的 .txt 摘要（按累计耗时排序）。
+界面里的“诊断”窗口可查看、重置、导出统计；库调用用 snapshot() / dump(path)。
+
+计数器（count）：bytes_read / bytes_written、records_parsed.<数据>、
+tickets.attempts / tickets.accepted（试抽与采用的号码数）、ui.rows_inserted 等。
+计时（timer / timed）按耗时的 2 的幂（微秒）分桶，给出次数、总计、最值和近似分位数。
+"""
+import atexit, functools, os, threading, time
+from pathlib import Path
+
+ENABLED = bool(os.environ.get("DCB_INSTRUMENT"))
+
+_LOCK = threading.Lock()
+_COUNTERS = {}   # 名称 -> 累计值
+_TIMERS = {}     # 名称 -> [次数, 总秒数, 最小, 最大, 分桶计数列表]
+_STARTED = time.time()
+
+def enable(on=True):
+    """打开或关闭统计；已记录的数据保留。"""
+    global ENABLED
+    ENABLED = bool(on)
+
+def reset():
+    global _STARTED
+    with _LOCK:
+        _COUNTERS.clear()
+        _TIMERS.clear()
+        _STARTED = time.time()
+
+def count(name, n=1):
+    if not ENABLED:
+        return
+    with _LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + n
+
+def observe(name, seconds):
+    """记录一次耗时。第 i 个桶是 [2^(i-1), 2^i) 微秒，第 0 个桶不足 1 微秒。"""
+    b = int(seconds * 1e6).bit_length()
+    with _LOCK:
+        st = _TIMERS.get(name)
+        if st is None:
+            st = _TIMERS[name] = [0, 0.0, seconds, seconds, []]
+        st[0] += 1
+        st[1] += seconds
+        st[2] = min(st[2], seconds)
+        st[3] = max(st[3], seconds)
+        if len(st[4]) <= b:
+            st[4].extend([0] * (b + 1 - len(st[4])))
+        st[4][b] += 1
+
+class _Timer:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_TIMER = _NoTimer()
+
+def timer(name):
+    """with timer("名称"): ... 关闭时返回共用的空上下文。"""
+    return _Timer(name) if ENABLED else _NO_TIMER
+
+def timed(name):
+    """函数计时装饰器；关闭时直接调用原函数。"""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - t0)
+        return wrapper
+    return deco
+
+def _percentile(buckets, n, q):
+    """分桶的近似分位数：取所在桶的上界（秒）。"""
+    k = q * n
+    acc = 0
+    for i, c in enumerate(buckets):
+        acc += c
+        if acc >= k:
+            return (1 << i) / 1e6
+    return (1 << len(buckets)) / 1e6
+
+def snapshot():
+    """当前统计的 dict（可直接 json.dumps）：计数器、计时、数据缓存命中情况。"""
+    from .fileio import cache_stats
+    with _LOCK:
+        counters = dict(sorted(_COUNTERS.items()))
+        timers = {}
+        for name, (n, total, lo, hi, buckets) in sorted(_TIMERS.items()):
+            timers[name] = {
+                "count": n, "total_ms": round(total * 1e3, 3), "mean_ms": round(total / n * 1e3, 3),
+                "min_ms": round(lo * 1e3, 3), "max_ms": round(hi * 1e3, 3),
+                "p50_ms": round(min(_percentile(buckets, n, 0.5), hi) * 1e3, 3),
+                "p90_ms": round(min(_percentile(buckets, n, 0.9), hi) * 1e3, 3),
+                "p99_ms": round(min(_percentile(buckets, n, 0.99), hi) * 1e3, 3),
+                "buckets_us": {str(1 << i if i else 0): c for i, c in enumerate(buckets) if c},
+            }
+    return {"enabled": ENABLED, "since": _STARTED, "seconds": round(time.time() - _STARTED, 3),
+            "counters": counters, "timers": timers, "cache": cache_stats()}
+
+def format_snapshot(snap=None):
+    """snapshot() 的文字版，供界面和命令行显示。"""
+    snap = snap or snapshot()
+    lines = [f"统计：{'开启' if snap['enabled'] else '关闭'}　已记录 {snap['seconds']:.1f} 秒", "", "计数器："]
+    for name, v in snap["counters"].items():
+        lines.append(f"  {name:<28}{v:>14,}")
+    if not snap["counters"]:
+        lines.append("  （无）")
+    lines += ["", "计时（毫秒）：",
+              f"  {'':<28}{'count':>6}{'total':>12}{'mean':>11}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>11}"]
+    for name, t in snap["timers"].items():
+        lines.append(f"  {name:<28}{t['count']:>6}{t['total_ms']:>12.1f}{t['mean_ms']:>11.3f}"
+                     f"{t['p50_ms']:>9.3f}{t['p90_ms']:>9.3f}{t['p99_ms']:>9.3f}{t['max_ms']:>11.3f}")
+    if not snap["timers"]:
+        lines.append("  （无）")
+    lines += ["", "数据缓存（命中/未命中）："]
+    for name, st in snap["cache"].items():
+        lines.append(f"  {name:<28}{st['hits']:>8}/{st['misses']}")
+    return "\n".join(lines)
+
+def _stamp():
+    return time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+
+def dump(path=None):
+    """把 snapshot() 写成 JSON，默认写到程序目录下的 diagnostics-<时间>.json，返回路径。"""
+    from .fileio import _save_json
+    if path is None:
+        from .storage import BASE
+        path = BASE / f"diagnostics-{_stamp()}.json"
+    _save_json(path, snapshot())
+    return Path(path)
+
+# ====== cProfile ======
+# 主线程用一个 Profile 记录整段会话；界面的后台任务在各自线程里运行，
+# 经 profiled() 包装后各用一个 Profile，结束时合并进同一份结果。
+_PROFILE = None      # 主线程的 cProfile.Profile
+_THREAD_PROFILES = []
+
+def profiling():
+    return _PROFILE is not None
+
+def start_profile():
+    global _PROFILE
+    if _PROFILE is not None:
+        return
+    import cProfile
+    _THREAD_PROFILES.clear()
+    _PROFILE = cProfile.Profile()
+    _PROFILE.enable()
+
+def profiled(fn):
+    """包装在工作线程里运行的函数，会话正在 profile 时把它的耗时也记进去。"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _PROFILE is None:
+            return fn(*args, **kwargs)
+        import cProfile
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:   # Python 3.12 起同一时刻只允许一个 profiler，只记主线程
+            return fn(*args, **kwargs)
+        with _LOCK:
+            _THREAD_PROFILES.append(prof)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            prof.disable()
+    return wrapper
+
+def stop_profile(base=None):
+    """停止 profile，在 base（默认 BASE）下写出 profile-<时间>.prof 与 .txt 摘要，返回 .prof 路径。"""
+    global _PROFILE
+    prof, _PROFILE = _PROFILE, None
+    if prof is None:
+        return None
+    prof.disable()
+    import io, pstats
+    if base is None:
+        from .storage import BASE as base
+    path = Path(base) / f"profile-{_stamp()}.prof"
+    stats = pstats.Stats(prof)
+    with _LOCK:
+        extra, _THREAD_PROFILES[:] = list(_THREAD_PROFILES), []
+    for p in extra:
+        try:
+            stats.add(p)
+        except (TypeError, ValueError):   # 线程还没跑完或从未运行
+            continue
+    stats.dump_stats(str(path))
+    buf = io.StringIO()
+    pstats.Stats(str(path), stream=buf).sort_stats("cumulative").print_stats(60)
+    path.with_suffix(".txt").write_text(buf.getvalue(), encoding="utf-8")
+    return path
+
+def _stop_at_exit():
+    if _PROFILE is not None:
+        stop_profile()
+
+atexit.register(_stop_at_exit)
+
+if os.environ.get("DCB_PROFILE"):
+    start_profile()
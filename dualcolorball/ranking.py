@@ -0,0 +1,200 @@
+"""全部 C(33,6)×16 = 17721088 注号码的组合数编号，以及按编号的占用位图。
+
+编号 = 红球编号 × 16 + (蓝球 - 1)。红球编号用组合数系统（colex 序）：
+6 个红球从小到大为 a1<…<a6（从 0 数起）时，编号为 C(a1,1)+C(a2,2)+…+C(a6,6)，
+编号的先后与红球掩码（Ticket.to_mask() 的低 33 位）的数值大小一致。
+编号和还原都只需 6 步。
+
+TicketBitmap 每注一位，共约 2.2 MB。seen_bitmap() 给出“历史或收藏里出现过”的号码，
+判断某注是否出现过只需测一位；generate_* 的 fresh=True 借此保证不与历史重复。
+"""
+import json, threading, zlib
+from bisect import bisect_right
+from math import comb
+
+from .tickets import Ticket, BLUE_SHIFT, RED_MASK
+from .fileio import _atomic_write
+from .storage import on_storage_close
+from .index import _HISTORY_INDEX, ticket_index
+
+RED_TOTAL = comb(33, 6)   # 1107568
+TOTAL = RED_TOTAL * 16    # 17721088
+
+# _C[i][a] = C(a, i)，a = 0..32；每一列单调不减，还原时二分查找
+_C = [[comb(a, i) for a in range(33)] for i in range(7)]
+
+def rank_mask(mask):
+    """掩码 -> 编号。"""
+    r, i, m = 0, 1, mask & RED_MASK
+    while m:
+        low = m & -m
+        r += _C[i][low.bit_length() - 1]
+        i += 1
+        m ^= low
+    return r * 16 + (mask >> BLUE_SHIFT) - 1
+
+def unrank_mask(r):
+    """编号 -> 掩码。"""
+    x, blue = divmod(r, 16)
+    m = 0
+    for i in range(6, 0, -1):
+        a = bisect_right(_C[i], x) - 1
+        x -= _C[i][a]
+        m |= 1 << a
+    return m | ((blue + 1) << BLUE_SHIFT)
+
+def rank(reds, blue):
+    """(红球, 蓝球) -> 编号 ∈ [0, TOTAL)。红球须是 6 个不同的 1..33，顺序不限。"""
+    r = 0
+    for i, x in enumerate(sorted(reds), 1):
+        r += _C[i][x - 1]
+    return r * 16 + blue - 1
+
+def unrank(r):
+    """编号 -> (从小到大的红球元组, 蓝球)。"""
+    if not 0 <= r < TOTAL:
+        raise ValueError(f"编号超出范围：{r}")
+    x, blue = divmod(r, 16)
+    reds = []
+    for i in range(6, 0, -1):
+        a = bisect_right(_C[i], x) - 1
+        x -= _C[i][a]
+        reds.append(a + 1)
+    return tuple(reversed(reds)), blue + 1
+
+def ticket_rank(t: Ticket):
+    return rank(t.reds, t.blue)
+
+def ticket_from_rank(r, ts=0.0):
+    reds, blue = unrank(r)
+    return Ticket(reds, blue, ts)
+
+class TicketBitmap:
+    """全部号码的占用位图：第 r 位表示编号为 r 的号码。"""
+    __slots__ = ("bits", "n")   # n：已登记的注数（含重复），供增量维护核对
+
+    def __init__(self, data=None):
+        self.bits = bytearray(data) if data is not None else bytearray((TOTAL + 7) // 8)
+        self.n = 0
+
+    def add(self, r):
+        self.bits[r >> 3] |= 1 << (r & 7)
+
+    def add_masks(self, masks):
+        bits = self.bits
+        for r in map(rank_mask, masks):
+            bits[r >> 3] |= 1 << (r & 7)
+        self.n += len(masks)
+
+    def __contains__(self, r):
+        return bool(self.bits[r >> 3] >> (r & 7) & 1)
+
+    def __or__(self, other):
+        return TicketBitmap((int.from_bytes(self.bits, "little") | int.from_bytes(other.bits, "little"))
+                            .to_bytes(len(self.bits), "little"))
+
+    def has(self, ticket):
+        return rank(ticket.reds, ticket.blue) in self
+
+    def count(self):
+        """已占用的号码数。"""
+        return bin(int.from_bytes(self.bits, "little")).count("1")
+
+    def dumps(self, sig):
+        head = {"sig": sig, "n": self.n}
+        return (json.dumps(head) + "\n").encode("ascii") + zlib.compress(bytes(self.bits), 1)
+
+    @classmethod
+    def loads(cls, data, sig):
+        """读回 dumps 的结果；版本不符或数据损坏时返回 None。"""
+        try:
+            nl = data.index(b"\n")
+            head = json.loads(data[:nl])
+            if head["sig"] != sig:
+                return None
+            bits = zlib.decompress(data[nl + 1:])
+            if len(bits) != (TOTAL + 7) // 8:
+                return None
+            bm = cls(bits)
+            bm.n = head["n"]
+            return bm
+        except:
+            return None
+
+# ====== 历史与收藏的占用位图 ======
+# 历史部分按 (索引对象, 索引版本) 缓存，新追加的号码增量登记，删除过记录时重建；
+# 与历史索引一起保存为 seen.idx（SQLite 时为 <库名>.seen.idx），下次启动直接载入。
+# 收藏通常不多，变化时整体重建。
+_SEEN_LOCK = threading.Lock()
+_seen_history = None     # (索引对象, 索引版本, TicketBitmap)
+_seen_favorites = None   # (索引对象, 索引版本, 注数, TicketBitmap)
+_seen_merged = None      # (历史位图, 历史注数, 收藏位图, 合并结果)
+_seen_saved = None       # 上次保存时的 (历史位图, 注数, 版本)
+
+def _history_bitmap():
+    global _seen_history
+    idx = ticket_index("history")
+    cur = _seen_history
+    if cur is None or cur[0] is not idx or cur[1] != idx.version or cur[2].n > len(idx):
+        bm = None
+        src = _HISTORY_INDEX
+        if src.index is idx and not src.unsaved and src.storage is not None:
+            try:
+                bm = TicketBitmap.loads(src.storage.index_path("seen").read_bytes(), src.sig)
+            except OSError:
+                pass
+            if bm is not None and bm.n > len(idx):
+                bm = None
+        if bm is None:
+            bm = TicketBitmap()
+        cur = (idx, idx.version, bm)
+    if cur[2].n < len(idx):
+        cur[2].add_masks(idx.masks[cur[2].n:])
+    _seen_history = cur
+    return cur[2]
+
+def _favorite_bitmap():
+    global _seen_favorites
+    idx = ticket_index("favorites")
+    cur = _seen_favorites
+    if cur is None or cur[0] is not idx or cur[1] != idx.version or cur[2] != len(idx):
+        bm = TicketBitmap()
+        bm.add_masks(idx.masks)
+        cur = (idx, idx.version, len(idx), bm)
+    _seen_favorites = cur
+    return cur[3]
+
+def seen_bitmap():
+    """历史或收藏里出现过的号码的占用位图（只读使用）。"""
+    global _seen_merged
+    with _SEEN_LOCK:
+        h, f = _history_bitmap(), _favorite_bitmap()
+        cur = _seen_merged
+        if cur is None or cur[0] is not h or cur[1] != h.n or cur[2] is not f:
+            cur = (h, h.n, f, h | f)
+        _seen_merged = cur
+        return cur[3]
+
+def is_seen(ticket):
+    """这注号码是否在历史或收藏里出现过。"""
+    return seen_bitmap().has(ticket)
+
+def _save_seen():
+    """随历史索引一起保存位图；索引没有落盘或数据已变时不写。"""
+    global _seen_saved
+    with _SEEN_LOCK:
+        cur, src = _seen_history, _HISTORY_INDEX
+        if cur is None or src.index is not cur[0] or src.unsaved or src.sig is None:
+            return
+        if cur[1] != cur[0].version or cur[2].n != len(cur[0]):
+            return
+        key = (cur[2], cur[2].n, src.sig)
+        if _seen_saved == key:
+            return
+        try:
+            _atomic_write(src.storage.index_path("seen"), cur[2].dumps(src.sig), binary=True)
+        except OSError:
+            return
+        _seen_saved = key
+
+on_storage_close(_save_seen)   # 注册在历史索引之后，保存时索引已经落盘
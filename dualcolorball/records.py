@@ -0,0 +1,190 @@
+"""历史、收藏、最新开奖与开奖档案的读写接口，统一经由当前存储后端。"""
+import csv, json, time
+from pathlib import Path
+
+from . import instrument as _inst
+from .tickets import Ticket, Draw, _valid_numbers, _norm_date
+from .storage import get_storage
+from .index import _HISTORY_INDEX, _FAVORITE_INDEX
+
+def list_history(limit=50):
+    """最近的 limit 条历史（新的在前）；limit 为 0 / None 时返回全部。"""
+    return get_storage().history_tail(limit)
+
+def query_history(reds=(), blue=None, since=None, until=None, limit=None):
+    """查找包含全部 reds 红球（且蓝球为 blue）的历史记录，新的在前。
+
+    since / until 为时间戳闭区间，None 表示不限。SQLite 后端走索引，
+    JSON 后端从文件末尾顺序扫描。
+    """
+    return get_storage().history_query(tuple(reds), blue, since, until, limit)
+
+def set_write_coalescing(window):
+    """把 window 秒内的历史追加合并成一次落盘；0 表示每次追加立即落盘。"""
+    get_storage().set_write_coalescing(window)
+
+def flush_history():
+    get_storage().flush()
+
+@_inst.timed("history.append")
+def _append_history(tickets):
+    get_storage().history_append(tickets)
+    _HISTORY_INDEX.on_append(tickets)
+
+def remove_history_at(pos, ticket=None):
+    """删除倒数第 pos 条历史（0 为最新，与 list_history 的顺序一致）。
+
+    给出 ticket 时先核对号码，不一致（数据已被改动）则不删除并返回 False。
+    """
+    if not get_storage().history_remove_at(pos, ticket):
+        return False
+    _HISTORY_INDEX.on_delete(pos, from_end=True)
+    return True
+
+def save_favorite(ticket: Ticket):
+    """收藏号码，已收藏过则返回 False。"""
+    if not get_storage().favorite_add(ticket):
+        return False
+    _FAVORITE_INDEX.on_append([ticket])
+    return True
+
+def remove_favorite(ticket: Ticket):
+    if not get_storage().favorite_remove(ticket):
+        return False
+    _FAVORITE_INDEX.on_delete(mask=ticket.to_mask())
+    return True
+
+def is_favorite(ticket: Ticket):
+    return get_storage().favorite_contains(ticket)
+
+def list_favorites():
+    return get_storage().favorite_list()
+
+def favorite_masks():
+    """全部收藏的 array("Q") 掩码，可直接交给 compare_many 等批量函数；不要修改返回的数组。"""
+    return get_storage().favorite_masks()
+
+def update_latest_draw(pair):
+    reds, blue = pair
+    reds = sorted(reds)
+    if len(reds) != 6:
+        return None
+    t = Ticket(tuple(reds), blue, time.time())
+    get_storage().latest_set(t)
+    return t
+
+def load_latest_draw():
+    return get_storage().latest_get()
+
+def add_draw(issue, reds, blue, date=""):
+    """记录一期开奖，号码不合法时返回 None。"""
+    reds = [int(r) for r in reds]
+    if not _valid_numbers(reds, int(blue)):
+        return None
+    d = Draw(issue, reds, int(blue), _norm_date(date) if date else "")
+    get_storage().draws_add([d])
+    return d
+
+def add_draws(draws):
+    """记录多期开奖（Draw 序列），已有且相同的期号跳过，返回新写入的期数。"""
+    return get_storage().draws_add(list(draws))
+
+def get_draw(issue):
+    return get_storage().draw_get(issue)
+
+def get_draw_on(date):
+    return get_storage().draw_on(_norm_date(date))
+
+def list_draws(start=None, end=None):
+    return get_storage().draws_list(start, end)
+
+def _draw_from_fields(fields):
+    """解析一行：期号[,日期],红球×6,蓝球；号码也可以在同一字段里用空格或 + 分隔。"""
+    fields = [f.strip() for f in fields if f and f.strip()]
+    if not fields or not fields[0].isdigit():
+        return None   # 表头或空行
+    issue, rest = fields[0], fields[1:]
+    date = ""
+    if rest and ("-" in rest[0] or "/" in rest[0] or "." in rest[0]):
+        date = _norm_date(rest.pop(0))
+    nums = " ".join(rest).replace("+", " ").replace("|", " ").split()
+    if len(nums) != 7 or not all(x.isdigit() for x in nums):
+        return None
+    reds, blue = [int(x) for x in nums[:6]], int(nums[6])
+    if not _valid_numbers(reds, blue):
+        return None
+    return Draw(issue, reds, blue, date)
+
+def _draw_from_dict(d):
+    try:
+        reds, blue = [int(x) for x in d["reds"]], int(d["blue"])
+        if not _valid_numbers(reds, blue):
+            return None
+        return Draw(d["issue"], reds, blue, _norm_date(str(d.get("date") or "")) if d.get("date") else "")
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def parse_draws(path):
+    """读取开奖文件（.json 数组、.jsonl 或 CSV），返回 (开奖列表, 无法解析的行数)。
+
+    .jsonl 里不是合法 JSON 的行、.json 顶层不是数组时都计入无法解析；
+    文件读不出或 .json 整体不是合法 JSON 时抛出 OSError / ValueError。
+    """
+    path = Path(path)
+    draws, bad = [], 0
+    if path.suffix.lower() in (".json", ".jsonl"):
+        with open(path, "r", encoding="utf-8-sig") as f:
+            if path.suffix.lower() == ".json":
+                items = json.load(f)
+                if not isinstance(items, list):
+                    items, bad = [], 1
+            else:
+                items = []
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        items.append(json.loads(line))
+                    except ValueError:
+                        bad += 1
+        for item in items:
+            d = _draw_from_dict(item) if isinstance(item, dict) else None
+            if d is None:
+                bad += 1
+            else:
+                draws.append(d)
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.reader(f):
+                if not any(x.strip() for x in row):
+                    continue
+                d = _draw_from_fields(row)
+                if d is None:
+                    if row[0].strip().isdigit():
+                        bad += 1
+                    continue
+                draws.append(d)
+    return draws, bad
+
+def parse_draws_text(text):
+    """解析粘贴的多期开奖，每行 期号[ 日期] 红球×6 蓝球（逗号、制表符、空格、+、| 分隔均可）。
+
+    返回 (开奖列表, 无法解析的行数)；空行和不以期号开头的行（如表头）不计。
+    """
+    draws, bad = [], 0
+    for line in text.splitlines():
+        fields = line.replace(",", " ").replace("\t", " ").replace("，", " ").split()
+        if not fields:
+            continue
+        d = _draw_from_fields(fields)
+        if d is None:
+            if fields[0].isdigit():
+                bad += 1
+            continue
+        draws.append(d)
+    return draws, bad
+
+def import_draws(path):
+    """批量导入开奖文件，返回 (新写入期数, 无法解析的行数)。"""
+    draws, bad = parse_draws(path)
+    return get_storage().draws_add(draws), bad
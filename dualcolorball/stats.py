@@ -0,0 +1,205 @@
+"""号码统计：出现次数、遗漏、同现、和值与奇偶分布，以及冷热权重。"""
+import threading
+from array import array
+
+from .tickets import Ticket, _popcount, _lane
+from .index import TicketIndex, ticket_index
+from .records import list_draws
+
+# ===== 号码统计 =====
+# 各号出现次数、遗漏、红球两两同现、和值 / 奇数个数分布。计数器随数据追加增量更新，
+# 查询是 O(1) / O(33²)；大批量（首次建立）时直接用倒排索引的位图和字节车道整块计算。
+_SUM_LANE = [bytes(sum(8 * j + b + 1 for b in range(8 if j < 4 else 1) if (x >> b) & 1) for x in range(256))
+             for j in range(5)]
+_ODD_LANE = [bytes(sum(1 for b in range(8 if j < 4 else 1) if (x >> b) & 1 and (8 * j + b) % 2 == 0)
+                   for x in range(256)) for j in range(5)]
+
+class NumberStats:
+    """一串号码（按时间先后编号 0..n-1）的统计。
+
+    red_count[r] / blue_count[v]：出现次数；red_last / blue_last：最近一次出现的编号（-1 为从未出现）；
+    pairs[a][b]：红球 a、b 同时出现的次数；sum_dist[s]：红球和值为 s 的注数；odd_dist[o]：含 o 个奇数红球的注数。
+    """
+    def __init__(self):
+        self.n = 0
+        self.red_count = [0] * 34
+        self.blue_count = [0] * 17
+        self.red_last = [-1] * 34
+        self.blue_last = [-1] * 17
+        self.pairs = [[0] * 34 for _ in range(34)]
+        self.sum_dist = [0] * 184
+        self.odd_dist = [0] * 7
+
+    @classmethod
+    def from_index(cls, idx):
+        st = cls()
+        st.n = len(idx)
+        for r in range(1, 34):
+            bm = idx.reds[r]
+            st.red_count[r] = _popcount(bm)
+            st.red_last[r] = bm.bit_length() - 1
+            for b in range(r + 1, 34):
+                st.pairs[r][b] = st.pairs[b][r] = _popcount(bm & idx.reds[b])
+        for v in range(1, 17):
+            st.blue_count[v] = _popcount(idx.blues[v])
+            st.blue_last[v] = idx.blues[v].bit_length() - 1
+        if st.n:
+            raw = idx.masks.tobytes()
+            lanes = [raw[_lane(j)::8] for j in range(5)]
+            # 和值 ≤ 183、奇数个数 ≤ 6，各车道查表后按字节相加不会进位
+            sums = sum(int.from_bytes(l.translate(t), "little") for l, t in zip(lanes, _SUM_LANE)).to_bytes(st.n, "little")
+            odds = sum(int.from_bytes(l.translate(t), "little") for l, t in zip(lanes, _ODD_LANE)).to_bytes(st.n, "little")
+            st.sum_dist = [sums.count(s) if s >= 21 else 0 for s in range(184)]
+            st.odd_dist = [odds.count(o) for o in range(7)]
+        return st
+
+    def add(self, masks):
+        """在末尾追加一批号码（掩码或 Ticket）。"""
+        if not isinstance(masks, array):
+            masks = array("Q", (m.to_mask() if isinstance(m, Ticket) else m for m in masks))
+        if len(masks) > 4096:
+            self._merge(NumberStats.from_index(TicketIndex(masks)))
+            return
+        for m in masks:
+            t = Ticket.from_mask(m)
+            i = self.n
+            self.n += 1
+            s = odd = 0
+            for a in t.reds:
+                self.red_count[a] += 1
+                self.red_last[a] = i
+                row = self.pairs[a]
+                for b in t.reds:
+                    if b != a:
+                        row[b] += 1
+                s += a
+                odd += a & 1
+            self.sum_dist[s] += 1
+            self.odd_dist[odd] += 1
+            self.blue_count[t.blue] += 1
+            self.blue_last[t.blue] = i
+
+    def _merge(self, other):
+        for mine, theirs in ((self.red_last, other.red_last), (self.blue_last, other.blue_last)):
+            for x, last in enumerate(theirs):
+                if last >= 0:
+                    mine[x] = self.n + last
+        for mine, theirs in ((self.red_count, other.red_count), (self.blue_count, other.blue_count),
+                             (self.sum_dist, other.sum_dist), (self.odd_dist, other.odd_dist)):
+            for x, c in enumerate(theirs):
+                mine[x] += c
+        for a in range(1, 34):
+            row, orow = self.pairs[a], other.pairs[a]
+            for b in range(1, 34):
+                row[b] += orow[b]
+        self.n += other.n
+
+    def red_gaps(self):
+        """各红球的遗漏：最近一次出现之后又过了多少注 / 期（从未出现为 n）。下标 0 不用。"""
+        return [0] + [self.n - 1 - self.red_last[r] for r in range(1, 34)]
+
+    def blue_gaps(self):
+        return [0] + [self.n - 1 - self.blue_last[v] for v in range(1, 17)]
+
+    def hot(self, k=6):
+        """出现次数最多的 k 个红球。"""
+        return sorted(range(1, 34), key=lambda r: (-self.red_count[r], r))[:k]
+
+    def cold(self, k=6):
+        """遗漏最久的 k 个红球。"""
+        gaps = self.red_gaps()
+        return sorted(range(1, 34), key=lambda r: (-gaps[r], r))[:k]
+
+    def top_pairs(self, k=10):
+        """同现次数最多的 k 对红球 [(a, b, 次数)]。"""
+        pairs = [(a, b, self.pairs[a][b]) for a in range(1, 34) for b in range(a + 1, 34)]
+        pairs.sort(key=lambda p: (-p[2], p[0], p[1]))
+        return pairs[:k]
+
+    def weights(self, mode="hot", strength=0.5):
+        """按出现次数给号码加权，返回 (红球权重[34], 蓝球权重[17])，可传给 generate_with_conditions(weights=...)。
+
+        mode 为 "hot" 时次数越多权重越大，"cold" 相反；权重落在 [1-strength, 1]。
+        """
+        strength = min(max(strength, 0.0), 0.99)
+        def scale(counts):
+            lo, hi = min(counts[1:]), max(counts[1:])
+            span = hi - lo or 1
+            res = [0.0]
+            for c in counts[1:]:
+                x = (c - lo) / span
+                res.append(1 - strength * ((1 - x) if mode == "hot" else x))
+            return res
+        return scale(self.red_count), scale(self.blue_count)
+
+    def summary(self):
+        """可直接 json.dumps 的统计摘要。"""
+        return {"n": self.n,
+                "red_count": self.red_count[1:], "blue_count": self.blue_count[1:],
+                "red_gap": self.red_gaps()[1:], "blue_gap": self.blue_gaps()[1:],
+                "top_pairs": self.top_pairs(),
+                "sum_dist": {s: c for s, c in enumerate(self.sum_dist) if c},
+                "odd_dist": self.odd_dist}
+
+_STATS_LOCK = threading.Lock()
+_history_stats = None   # (索引对象, 索引版本, NumberStats)
+_draw_stats = None      # (已统计的开奖掩码, NumberStats)
+
+def history_stats():
+    """历史号码的统计（只读使用）。只对上次之后新追加的号码做增量计算，删除过记录时重建。"""
+    global _history_stats
+    idx = ticket_index("history")
+    with _STATS_LOCK:
+        cur = _history_stats
+        if cur is None or cur[0] is not idx or cur[1] != idx.version or cur[2].n > len(idx):
+            cur = (idx, idx.version, NumberStats.from_index(idx))
+        elif cur[2].n < len(idx):
+            cur[2].add(idx.masks[cur[2].n:])
+        _history_stats = cur
+        return cur[2]
+
+def draw_stats():
+    """开奖档案（按期号先后）的统计，遗漏即“已有多少期未开出”。新增的期号直接追加，更正旧期时重建。"""
+    global _draw_stats
+    masks = array("Q", (d.to_mask() for d in list_draws()))
+    with _STATS_LOCK:
+        cur = _draw_stats
+        if cur is None or len(cur[0]) > len(masks) or masks[:len(cur[0])] != cur[0]:
+            st = NumberStats()
+            st.add(masks)
+            cur = (masks, st)
+        elif len(cur[0]) < len(masks):
+            cur[1].add(masks[len(cur[0]):])
+            cur = (masks, cur[1])
+        _draw_stats = cur
+        return cur[1]
+
+def hot_cold_weights(mode="hot", source="draws", strength=0.5):
+    """由开奖档案（source="draws"）或历史号码（"history"）的统计得到冷热权重；没有数据时返回 None。"""
+    st = draw_stats() if source == "draws" else history_stats()
+    if not st.n:
+        return None
+    return st.weights(mode, strength)
+
+def format_stats(st, unit="期"):
+    """把统计整理成多行文本，供界面显示。"""
+    lines = [f"共 {st.n} {unit}", "", "红球  次数  遗漏      红球  次数  遗漏      红球  次数  遗漏"]
+    gaps = st.red_gaps()
+    for i in range(1, 12):
+        lines.append("      ".join(f"{r:02d}  {st.red_count[r]:>6} {gaps[r]:>5}" for r in (i, i + 11, i + 22)))
+    lines += ["", "蓝球  次数  遗漏      蓝球  次数  遗漏"]
+    bgaps = st.blue_gaps()
+    for v in range(1, 9):
+        lines.append("      ".join(f"{x:02d}  {st.blue_count[x]:>6} {bgaps[x]:>5}" for x in (v, v + 8)))
+    lines += ["", "热号: " + " ".join(f"{r:02d}" for r in st.hot()),
+              "冷号: " + " ".join(f"{r:02d}" for r in st.cold()),
+              "常见同现: " + "  ".join(f"{a:02d}-{b:02d}({c})" for a, b, c in st.top_pairs(6)), ""]
+    total = st.n or 1
+    lines.append("和值分布:")
+    for lo in range(21, 184, 20):
+        c = sum(st.sum_dist[lo:lo + 20])
+        lines.append(f"  {lo:>3}-{min(lo + 19, 183):<3} {c:>8} {c * 100 / total:6.1f}%")
+    lines.append("奇数个数分布:")
+    for o, c in enumerate(st.odd_dist):
+        lines.append(f"  {o} 奇 {6 - o} 偶 {c:>8} {c * 100 / total:6.1f}%")
+    return "\n".join(lines)
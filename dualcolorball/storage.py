@@ -0,0 +1,851 @@
+"""存储后端：JSON 文件（默认）与 SQLite，以及两者之间的迁移。"""
+import json, os, threading, atexit, itertools
+from array import array
+from pathlib import Path
+
+from . import instrument as _inst
+from .fileio import (_count_cache, _file_sig, _load_json, _MISSING, _atomic_write,
+                     _append_text, _save_json)
+from .tickets import (Ticket, Draw, BLUE_SHIFT, _dict_from_ticket, _ticket_from_dict, _json_line,
+                      _issue_key)
+
+# 数据文件所在目录：包的上一级，即 2balls.py 所在的程序目录
+BASE = Path(os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+def _migrate_to_jsonl(legacy, path):
+    """一次性把旧的 JSON 数组文件转成 JSON Lines。旧文件原样保留、不再读写（仓库里附带的示例数据
+    因此不会被改动）；之后以 JSON Lines 文件为准，删掉它会重新从旧文件导入。"""
+    if path.exists() or not legacy.exists():
+        return
+    data = _load_json(legacy, _MISSING)
+    if data is _MISSING:
+        return   # 旧文件损坏时原样保留，不当作空列表迁移
+    _atomic_write(path, (_json_line(x) for x in data))
+
+def _iter_lines_reverse(f, block=65536):
+    """从文件末尾向前逐行产出 (行起始偏移, 行内容 bytes)，不读入整个文件。"""
+    pos = f.seek(0, os.SEEK_END)
+    rest = b""
+    while pos > 0:
+        step = min(block, pos)
+        pos -= step
+        f.seek(pos)
+        if _inst.ENABLED:
+            _inst.count("bytes_read", step)
+        lines = (f.read(step) + rest).split(b"\n")
+        starts = []
+        o = pos
+        for ln in lines:
+            starts.append(o)
+            o += len(ln) + 1
+        # lines[0] 可能只是半行，留到下一块拼接
+        for i in range(len(lines) - 1, 0, -1):
+            yield starts[i], lines[i]
+        rest = lines[0]
+    if rest:
+        yield 0, rest
+
+def _iter_history_reverse(f, block=65536):
+    n = 0
+    try:
+        for off, line in _iter_lines_reverse(f, block):
+            if not line.strip():
+                continue
+            try:
+                t = _ticket_from_dict(json.loads(line))
+            except:
+                continue  # 跳过损坏的行
+            n += 1
+            yield off, line, t
+    finally:
+        _inst.count("records_parsed.history", n)
+
+def _file_chunks(f, cut, resume, block=1 << 20):
+    """逐块产出文件内容，跳过 [cut, resume) 这一段。"""
+    f.seek(0)
+    left = cut
+    while left > 0:
+        data = f.read(min(block, left))
+        if not data:
+            return
+        left -= len(data)
+        yield data
+    f.seek(resume)
+    yield from iter(lambda: f.read(block), b"")
+
+class _HistoryWriter:
+    """历史追加写入。
+
+    默认每次追加立即写入并 fsync。开启合并模式（window > 0）后，window 秒内的
+    多次追加先放在内存里，到期合并成一次写入和一次 fsync；读取历史前和进程退出时
+    会先把缓冲落盘。
+    """
+    def __init__(self, path):
+        self.path = path
+        self.window = 0.0
+        self._buf = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def append(self, text):
+        with self._lock:
+            if self.window <= 0:
+                _append_text(self.path, text)
+                return
+            self._buf.append(text)
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._buf:
+                text, self._buf = "".join(self._buf), []
+                _append_text(self.path, text)
+
+class _FavoriteStore:
+    """收藏号码。
+
+    内存里是按号码 key（Ticket.to_mask()）建的有序字典，首次使用时加载，
+    之后增删查都是 O(1)；文件被外部修改（版本变化）时重新加载。磁盘上是只追加的
+    操作日志：收藏追加一条记录，删除追加 {"del": key}；失效行多于有效收藏时整理重写一次。
+    """
+    def __init__(self, path, legacy=None):
+        self.path = path
+        self.legacy = legacy
+        self._items = None   # key -> Ticket，保持收藏顺序
+        self._dead = 0       # 日志里已失效的行数
+        self._sig = None     # 加载/写入后文件的版本
+        self._masks = None   # 掩码数组缓存，收藏变化时作废
+
+    def _load(self):
+        if self._items is not None and _file_sig(self.path) == self._sig:
+            _count_cache("favorites", True)
+            return self._items
+        _count_cache("favorites", False)
+        if self.legacy is not None:
+            _migrate_to_jsonl(self.legacy, self.path)
+        items, dead = {}, 0
+        try:
+            with _inst.timer("favorites.load"), open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        d = json.loads(line)
+                    except:
+                        dead += 1
+                        continue
+                    if "del" in d:
+                        dead += 2 if items.pop(d["del"], None) is not None else 1
+                        continue
+                    t = _ticket_from_dict(d)
+                    if t.to_mask() in items:
+                        dead += 1
+                        continue
+                    items[t.to_mask()] = t
+        except OSError:
+            pass
+        self._items, self._dead = items, dead
+        self._sig = _file_sig(self.path)
+        self._masks = None
+        if _inst.ENABLED and self._sig is not None:
+            _inst.count("bytes_read", self._sig[1])
+            _inst.count("records_parsed.favorites", len(items) + dead)
+        return items
+
+    def _append(self, d):
+        _append_text(self.path, _json_line(d))
+        self._sig = _file_sig(self.path)
+        self._masks = None
+
+    def _maybe_compact(self):
+        if self._dead < 1000 or self._dead < len(self._items):
+            return
+        _atomic_write(self.path, (_json_line(_dict_from_ticket(t)) for t in self._items.values()))
+        self._dead = 0
+        self._sig = _file_sig(self.path)
+
+    def __contains__(self, ticket):
+        return ticket.to_mask() in self._load()
+
+    def __len__(self):
+        return len(self._load())
+
+    def add(self, ticket):
+        items = self._load()
+        key = ticket.to_mask()
+        if key in items:
+            return False
+        self._append(_dict_from_ticket(ticket))
+        items[key] = ticket
+        return True
+
+    def remove(self, ticket):
+        items = self._load()
+        key = ticket.to_mask()
+        if key not in items:
+            return False
+        self._append({"del": key})
+        del items[key]
+        self._dead += 2
+        self._maybe_compact()
+        return True
+
+    def tickets(self):
+        return list(self._load().values())
+
+    def masks(self):
+        """全部收藏的掩码数组（与 tickets() 顺序一致），缓存到收藏变化为止。"""
+        items = self._load()
+        if self._masks is None:
+            self._masks = array("Q", items)
+        return self._masks
+
+class _DrawArchive:
+    """历届开奖档案。
+
+    磁盘上是只追加的 draws.jsonl（同一期号以最后一行为准，便于更正），
+    内存中按期号、开奖日期建索引，首次使用时加载，文件被外部修改时重新加载。
+    """
+    def __init__(self, path):
+        self.path = path
+        self._by_issue = None
+        self._by_date = {}
+        self._sorted = None
+        self._sig = None
+
+    def _load(self):
+        if self._by_issue is not None and _file_sig(self.path) == self._sig:
+            _count_cache("draws", True)
+            return self._by_issue
+        _count_cache("draws", False)
+        by_issue = {}
+        try:
+            with _inst.timer("draws.load"), open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        d = json.loads(line)
+                        by_issue[str(d["issue"])] = Draw(d["issue"], d["reds"], d["blue"], d.get("date", ""))
+                    except:
+                        continue
+        except OSError:
+            pass
+        self._by_issue = by_issue
+        self._by_date = {d.date: d for d in by_issue.values() if d.date}
+        self._sorted = None
+        self._sig = _file_sig(self.path)
+        if _inst.ENABLED and self._sig is not None:
+            _inst.count("bytes_read", self._sig[1])
+            _inst.count("records_parsed.draws", len(by_issue))
+        return by_issue
+
+    def add_many(self, draws):
+        """加入多期开奖，已有且内容相同的期号跳过，返回新写入的期数。"""
+        by_issue = self._load()
+        lines = []
+        for d in draws:
+            if by_issue.get(d.issue) == d:
+                continue
+            by_issue[d.issue] = d
+            if d.date:
+                self._by_date[d.date] = d
+            lines.append(_json_line({"issue": d.issue, "date": d.date,
+                                     "reds": list(d.reds), "blue": d.blue}))
+        if lines:
+            _append_text(self.path, "".join(lines))
+            self._sorted = None
+            self._sig = _file_sig(self.path)
+        return len(lines)
+
+    def get(self, issue):
+        return self._load().get(str(issue))
+
+    def on_date(self, date):
+        self._load()
+        return self._by_date.get(date)
+
+    def draws(self, start=None, end=None):
+        """按期号升序返回 [start, end] 区间内的开奖（期号闭区间，None 表示不限）。"""
+        by_issue = self._load()
+        if self._sorted is None:
+            self._sorted = sorted(by_issue.values(), key=lambda d: _issue_key(d.issue))
+        res = self._sorted
+        if start is not None:
+            res = [d for d in res if _issue_key(d.issue) >= _issue_key(str(start))]
+        if end is not None:
+            res = [d for d in res if _issue_key(d.issue) <= _issue_key(str(end))]
+        return list(res)
+
+# ===== 存储后端 =====
+# 历史、收藏、最新开奖和开奖档案都经由 get_storage() 返回的后端读写：
+#   JsonStorage   默认，程序目录下的 JSON Lines / JSON 文件；
+#   SqliteStorage 标准库 sqlite3，单个数据库文件，号码 key、蓝球、时间戳均有索引。
+# 环境变量 DCB_STORAGE=json|sqlite 可强制指定；未指定时，程序目录下已有
+# dualcolorball.db（由 migrate-sqlite 生成）就用 SQLite，否则用 JSON 文件。
+_SQLITE_FILE = BASE / "dualcolorball.db"
+
+class JsonStorage:
+    """JSON 文件后端：history.jsonl / favorites.jsonl / draws.jsonl 只追加，latest_draw.json 原子替换。"""
+    name = "json"
+
+    def __init__(self, base=BASE):
+        base = Path(base)
+        self.base = base
+        self.history_path = base / "history.jsonl"     # 每行一条记录，只追加
+        self.legacy_history_path = base / "history.json"
+        self.latest_path = base / "latest_draw.json"
+        self.favorites = _FavoriteStore(base / "favorites.jsonl", base / "favorites.json")
+        self.archive = _DrawArchive(base / "draws.jsonl")
+        self.writer = _HistoryWriter(self.history_path)
+        self._history_cache = None   # (文件版本, limit, 结果)
+
+    def _migrate(self):
+        _migrate_to_jsonl(self.legacy_history_path, self.history_path)
+
+    # --- 历史 ---
+    def history_append(self, tickets):
+        self._migrate()
+        lines = "".join(_json_line(_dict_from_ticket(t)) for t in tickets)
+        if lines:
+            self.writer.append(lines)
+
+    def history_tail(self, limit=50):
+        """只从文件末尾读取需要的部分。"""
+        self._migrate()
+        self.writer.flush()
+        sig = _file_sig(self.history_path)
+        cache = self._history_cache
+        if sig is not None and cache is not None and cache[:2] == (sig, limit):
+            _count_cache("history", True)
+            return list(cache[2])
+        _count_cache("history", False)
+        res = []
+        # 一条记录约 65 字节，首块按 limit 估算，通常一次 read 即可
+        block = min(max(limit * 96, 4096), 1 << 20) if limit else 1 << 20
+        try:
+            with _inst.timer("history.tail"), open(self.history_path, "rb") as f:
+                for _, _, t in _iter_history_reverse(f, block):
+                    res.append(t)
+                    if limit and len(res) >= limit:
+                        break
+        except OSError:
+            pass
+        self._history_cache = (sig, limit, res)
+        return list(res)
+
+    def history_query(self, reds=(), blue=None, since=None, until=None, limit=None):
+        self._migrate()
+        self.writer.flush()
+        need = Ticket(reds, 0).to_mask() if reds else 0
+        res = []
+        try:
+            with _inst.timer("history.query"), open(self.history_path, "rb") as f:
+                for _, _, t in _iter_history_reverse(f, 1 << 20):
+                    if (t.to_mask() & need) != need or (blue is not None and t.blue != blue):
+                        continue
+                    if (since is not None and t.ts < since) or (until is not None and t.ts > until):
+                        continue
+                    res.append(t)
+                    if limit and len(res) >= limit:
+                        break
+        except OSError:
+            pass
+        return res
+
+    def iter_history(self):
+        """从旧到新逐条产出全部历史。"""
+        self._migrate()
+        self.writer.flush()
+        try:
+            f = open(self.history_path, "r", encoding="utf-8")
+        except OSError:
+            return
+        n = 0
+        try:
+            with f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        t = _ticket_from_dict(json.loads(line))
+                    except:
+                        continue
+                    n += 1
+                    yield t
+                if _inst.ENABLED:
+                    _inst.count("bytes_read", f.buffer.tell())
+        finally:
+            _inst.count("records_parsed.history", n)
+
+    def history_sig(self):
+        """历史数据的版本，变化说明有别的进程改过。"""
+        self._migrate()
+        self.writer.flush()
+        return _file_sig(self.history_path)
+
+    def history_masks(self):
+        """全部历史（从旧到新）的 array("Q") 掩码。"""
+        return array("Q", (t.to_mask() for t in self.iter_history()))
+
+    def history_remove_at(self, pos, ticket=None):
+        """去掉被删的一行后写临时文件再原子替换，中途崩溃时原文件保持完整。"""
+        self._migrate()
+        self.writer.flush()
+        with self.writer._lock:   # 替换期间不让追加写进旧文件
+            try:
+                f = open(self.history_path, "rb")
+            except OSError:
+                return False
+            with f:
+                for i, (off, line, t) in enumerate(_iter_history_reverse(f)):
+                    if i < pos:
+                        continue
+                    if ticket is not None and t.to_mask() != ticket.to_mask():
+                        return False
+                    _atomic_write(self.history_path, _file_chunks(f, off, off + len(line) + 1), binary=True)
+                    return True
+        return False
+
+    def set_write_coalescing(self, window):
+        self.writer.flush()
+        self.writer.window = max(0.0, float(window))
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.flush()
+
+    # --- 收藏 ---
+    def favorite_add(self, ticket):
+        return self.favorites.add(ticket)
+
+    def favorite_remove(self, ticket):
+        return self.favorites.remove(ticket)
+
+    def favorite_contains(self, ticket):
+        return ticket in self.favorites
+
+    def favorite_list(self):
+        return self.favorites.tickets()
+
+    def favorite_masks(self):
+        return self.favorites.masks()
+
+    def favorite_sig(self):
+        self.favorites._load()
+        return self.favorites._sig
+
+    def index_path(self, name):
+        return self.base / f"{name}.idx"
+
+    # --- 最新开奖 ---
+    def latest_set(self, ticket):
+        _save_json(self.latest_path, _dict_from_ticket(ticket))
+
+    def latest_get(self):
+        data = _load_json(self.latest_path, _MISSING)
+        if not isinstance(data, dict) or not data:   # 没有或已损坏：视为尚未录入最新开奖
+            return None
+        return _ticket_from_dict(data)
+
+    # --- 开奖档案 ---
+    def draws_add(self, draws):
+        return self.archive.add_many(draws)
+
+    def draw_get(self, issue):
+        return self.archive.get(issue)
+
+    def draw_on(self, date):
+        return self.archive.on_date(date)
+
+    def draws_list(self, start=None, end=None):
+        return self.archive.draws(start, end)
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id   INTEGER PRIMARY KEY,
+    key  INTEGER NOT NULL,      -- Ticket.to_mask()
+    blue INTEGER NOT NULL,
+    ts   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_key  ON history(key);
+CREATE INDEX IF NOT EXISTS history_blue ON history(blue);
+CREATE INDEX IF NOT EXISTS history_ts   ON history(ts);
+CREATE TABLE IF NOT EXISTS favorites (
+    id   INTEGER PRIMARY KEY,   -- 收藏顺序
+    key  INTEGER NOT NULL UNIQUE,
+    blue INTEGER NOT NULL,
+    ts   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS favorites_blue ON favorites(blue);
+CREATE INDEX IF NOT EXISTS favorites_ts   ON favorites(ts);
+CREATE TABLE IF NOT EXISTS draws (
+    issue TEXT PRIMARY KEY,
+    date  TEXT NOT NULL,
+    key   INTEGER NOT NULL,
+    blue  INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS draws_date ON draws(date);
+CREATE INDEX IF NOT EXISTS draws_key  ON draws(key);
+CREATE TABLE IF NOT EXISTS latest (
+    id  INTEGER PRIMARY KEY CHECK (id = 0),
+    key INTEGER NOT NULL,
+    ts  REAL NOT NULL
+);
+"""
+
+class SqliteStorage:
+    """SQLite 后端。
+
+    号码以 Ticket.to_mask() 整数作 key 存储，"含红球 07 且蓝球 12" 这类查询是
+    key & mask = mask 加上蓝球索引，整注精确查找走 key 索引。批量写入在一个事务里完成。
+    连接在首次使用时打开，可跨线程使用（内部加锁）。
+    """
+    name = "sqlite"
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else _SQLITE_FILE
+        self._conn = None
+        self._lock = threading.RLock()
+        self._fav_masks = None   # (data_version, 掩码数组)
+
+    def _db(self):
+        if self._conn is None:
+            import sqlite3
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SQLITE_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _rows_to_tickets(self, rows):
+        _inst.count("records_parsed.sqlite", len(rows))
+        return [Ticket.from_mask(k, ts) for k, ts in rows]
+
+    # --- 历史 ---
+    def history_append(self, tickets, batch=10000):
+        rows = ((t.to_mask(), t.blue, t.ts) for t in tickets)
+        with self._lock:
+            conn = self._db()
+            with conn:
+                while True:
+                    part = list(itertools.islice(rows, batch))
+                    if not part:
+                        break
+                    conn.executemany("INSERT INTO history (key, blue, ts) VALUES (?, ?, ?)", part)
+
+    @_inst.timed("history.tail")
+    def history_tail(self, limit=50):
+        with self._lock:
+            rows = self._db().execute("SELECT key, ts FROM history ORDER BY id DESC LIMIT ?",
+                                      (limit or -1,)).fetchall()
+        return self._rows_to_tickets(rows)
+
+    def history_query(self, reds=(), blue=None, since=None, until=None, limit=None):
+        where, args = [], []
+        if len(reds) == 6 and blue is not None:
+            where.append("key = ?")
+            args.append(Ticket(reds, blue).to_mask())
+        else:
+            if reds:
+                need = Ticket(reds, 0).to_mask()
+                where.append("(key & ?) = ?")
+                args += [need, need]
+            if blue is not None:
+                where.append("blue = ?")
+                args.append(blue)
+        if since is not None:
+            where.append("ts >= ?")
+            args.append(since)
+        if until is not None:
+            where.append("ts <= ?")
+            args.append(until)
+        sql = "SELECT key, ts FROM history"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        args.append(limit or -1)
+        with self._lock:
+            rows = self._db().execute(sql, args).fetchall()
+        return self._rows_to_tickets(rows)
+
+    def iter_history(self, batch=10000):
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._db().execute("SELECT id, key, ts FROM history WHERE id > ? ORDER BY id LIMIT ?",
+                                          (last, batch)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            for _, k, ts in rows:
+                yield Ticket.from_mask(k, ts)
+
+    def _sig(self, table):
+        with self._lock:
+            return tuple(self._db().execute(f"SELECT count(*), coalesce(max(id), 0) FROM {table}").fetchone())
+
+    def history_sig(self):
+        return self._sig("history")
+
+    def history_masks(self):
+        with self._lock:
+            return array("Q", (k for k, in self._db().execute("SELECT key FROM history ORDER BY id")))
+
+    def history_remove_at(self, pos, ticket=None):
+        with self._lock:
+            conn = self._db()
+            with conn:
+                row = conn.execute("SELECT id, key FROM history ORDER BY id DESC LIMIT 1 OFFSET ?",
+                                   (pos,)).fetchone()
+                if row is None or (ticket is not None and row[1] != ticket.to_mask()):
+                    return False
+                conn.execute("DELETE FROM history WHERE id = ?", (row[0],))
+        return True
+
+    def set_write_coalescing(self, window):
+        pass   # 每次追加本来就是一个事务
+
+    def flush(self):
+        pass
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- 收藏 ---
+    def favorite_add(self, ticket):
+        with self._lock:
+            conn = self._db()
+            with conn:
+                cur = conn.execute("INSERT OR IGNORE INTO favorites (key, blue, ts) VALUES (?, ?, ?)",
+                                   (ticket.to_mask(), ticket.blue, ticket.ts))
+            if cur.rowcount:
+                self._fav_masks = None
+            return cur.rowcount > 0
+
+    def favorite_remove(self, ticket):
+        with self._lock:
+            conn = self._db()
+            with conn:
+                cur = conn.execute("DELETE FROM favorites WHERE key = ?", (ticket.to_mask(),))
+            if cur.rowcount:
+                self._fav_masks = None
+            return cur.rowcount > 0
+
+    def favorite_contains(self, ticket):
+        with self._lock:
+            return self._db().execute("SELECT 1 FROM favorites WHERE key = ?",
+                                      (ticket.to_mask(),)).fetchone() is not None
+
+    def favorite_list(self):
+        with self._lock:
+            rows = self._db().execute("SELECT key, ts FROM favorites ORDER BY id").fetchall()
+        return self._rows_to_tickets(rows)
+
+    def favorite_masks(self):
+        """缓存到本进程修改收藏或其他连接提交写入（PRAGMA data_version 变化）为止。"""
+        with self._lock:
+            conn = self._db()
+            ver = conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._fav_masks is not None and self._fav_masks[0] == ver:
+                _count_cache("favorites", True)
+                return self._fav_masks[1]
+            _count_cache("favorites", False)
+            masks = array("Q", (k for k, in conn.execute("SELECT key FROM favorites ORDER BY id")))
+            self._fav_masks = (ver, masks)
+            return masks
+
+    def favorite_sig(self):
+        return self._sig("favorites")
+
+    def index_path(self, name):
+        return self.path.with_name(f"{self.path.stem}.{name}.idx")
+
+    # --- 最新开奖 ---
+    def latest_set(self, ticket):
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO latest (id, key, ts) VALUES (0, ?, ?)",
+                             (ticket.to_mask(), ticket.ts))
+
+    def latest_get(self):
+        with self._lock:
+            row = self._db().execute("SELECT key, ts FROM latest WHERE id = 0").fetchone()
+        return Ticket.from_mask(*row) if row else None
+
+    # --- 开奖档案 ---
+    def _draw(self, row):
+        issue, date, key = row
+        return Draw(issue, Ticket.from_mask(key).reds, key >> BLUE_SHIFT, date)
+
+    def draws_add(self, draws):
+        n = 0
+        with self._lock:
+            conn = self._db()
+            with conn:
+                for d in draws:
+                    row = conn.execute("SELECT issue, date, key FROM draws WHERE issue = ?",
+                                       (d.issue,)).fetchone()
+                    if row is not None and self._draw(row) == d:
+                        continue
+                    conn.execute("INSERT OR REPLACE INTO draws (issue, date, key, blue) VALUES (?, ?, ?, ?)",
+                                 (d.issue, d.date, d.to_mask(), d.blue))
+                    n += 1
+        return n
+
+    def draw_get(self, issue):
+        with self._lock:
+            row = self._db().execute("SELECT issue, date, key FROM draws WHERE issue = ?",
+                                     (str(issue),)).fetchone()
+        return self._draw(row) if row else None
+
+    def draw_on(self, date):
+        if not date:
+            return None
+        with self._lock:
+            row = self._db().execute("SELECT issue, date, key FROM draws WHERE date = ? "
+                                     "ORDER BY length(issue) DESC, issue DESC LIMIT 1",
+                                     (date,)).fetchone()
+        return self._draw(row) if row else None
+
+    def draws_list(self, start=None, end=None):
+        with self._lock:
+            rows = self._db().execute("SELECT issue, date, key FROM draws "
+                                      "ORDER BY length(issue), issue").fetchall()
+        res = [self._draw(r) for r in rows]
+        if start is not None:
+            res = [d for d in res if _issue_key(d.issue) >= _issue_key(str(start))]
+        if end is not None:
+            res = [d for d in res if _issue_key(d.issue) <= _issue_key(str(end))]
+        return res
+
+_STORAGE = None
+_STORAGE_LOCK = threading.Lock()
+_CLOSE_HOOKS = []   # 切换或关闭后端前调用（如保存索引文件）
+
+def on_storage_close(fn):
+    """注册一个在切换 / 关闭存储后端前调用的无参函数。"""
+    _CLOSE_HOOKS.append(fn)
+    return fn
+
+def _run_close_hooks():
+    for fn in _CLOSE_HOOKS:
+        try:
+            fn()
+        except Exception:
+            pass
+
+def current_storage():
+    """当前已启用的存储后端；尚未选择时返回 None（不会触发选择）。"""
+    return _STORAGE
+
+def get_storage():
+    """当前使用的存储后端（首次调用时按 DCB_STORAGE / 数据库文件是否存在选择）。"""
+    global _STORAGE
+    with _STORAGE_LOCK:
+        if _STORAGE is None:
+            kind = os.environ.get("DCB_STORAGE", "").strip().lower()
+            if not kind:
+                kind = "sqlite" if _SQLITE_FILE.exists() else "json"
+            _STORAGE = SqliteStorage() if kind == "sqlite" else JsonStorage()
+        return _STORAGE
+
+def use_storage(storage):
+    """切换存储后端：传入 "json" / "sqlite" 或后端实例，返回新的后端。"""
+    global _STORAGE
+    if isinstance(storage, str):
+        storage = SqliteStorage() if storage == "sqlite" else JsonStorage()
+    _run_close_hooks()
+    with _STORAGE_LOCK:
+        old, _STORAGE = _STORAGE, storage
+    if old is not None and old is not storage:
+        old.close()
+    return storage
+
+def _close_storage():
+    if _STORAGE is not None:
+        _run_close_hooks()
+        _STORAGE.close()
+
+atexit.register(_close_storage)
+
+def _legacy_tickets(path):
+    """读取旧格式（整个 JSON 数组）的号码文件，不做迁移。
+
+    文件读不出、不是合法 JSON 或顶层不是数组时抛出 ValueError，不当作空列表，
+    免得迁移出一个丢了数据的数据库；数组里个别无效的记录跳过。
+    """
+    data = _load_json(path, _MISSING)
+    if data is _MISSING or not isinstance(data, list):
+        raise ValueError(f"无法读取旧数据文件：{path}")
+    res = []
+    for d in data:
+        try:
+            res.append(_ticket_from_dict(d))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return res
+
+def migrate_json_to_sqlite(base=BASE, db=None, batch=10000):
+    """把 base 目录下的 JSON 数据整体导入新的 SQLite 数据库，返回各类记录数。
+
+    先写到临时文件，全部完成后再改名为 db，中途失败不会留下半个数据库；
+    db 已存在时抛出 FileExistsError。原 JSON 文件保持不变：还没转成 JSON Lines 的
+    旧 history.json / favorites.json 直接读取，不生成 .jsonl 文件；它们损坏时抛出
+    ValueError，不生成数据库。
+    """
+    db = Path(db) if db else _SQLITE_FILE
+    if db.exists():
+        raise FileExistsError(str(db))
+    src = JsonStorage(base)
+    src.favorites.legacy = None
+    history, favs = src.iter_history(), None
+    if not src.history_path.exists() and src.legacy_history_path.exists():
+        history = iter(_legacy_tickets(src.legacy_history_path))
+    if not src.favorites.path.exists() and src.base.joinpath("favorites.json").exists():
+        favs = {}
+        for t in _legacy_tickets(src.base / "favorites.json"):
+            favs.setdefault(t.to_mask(), t)   # 与迁移时一样，重复的收藏只留第一条
+        favs = list(favs.values())
+    tmp = db.with_name(db.name + ".tmp")
+    for p in (tmp, tmp.with_name(tmp.name + "-wal"), tmp.with_name(tmp.name + "-shm")):
+        if p.exists():
+            p.unlink()
+    dst = SqliteStorage(tmp)
+    counts = {"history": 0, "favorites": 0, "draws": 0, "latest": 0}
+    try:
+        while True:
+            part = list(itertools.islice(history, batch))
+            if not part:
+                break
+            dst.history_append(part, batch)
+            counts["history"] += len(part)
+        if favs is None:
+            favs = src.favorite_list()
+        with dst._lock:
+            conn = dst._db()
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO favorites (key, blue, ts) VALUES (?, ?, ?)",
+                                 ((t.to_mask(), t.blue, t.ts) for t in favs))
+        counts["favorites"] = len(favs)
+        counts["draws"] = dst.draws_add(src.draws_list())
+        latest = src.latest_get()
+        if latest is not None:
+            dst.latest_set(latest)
+            counts["latest"] = 1
+    finally:
+        dst.close()
+    os.replace(tmp, db)
+    return counts
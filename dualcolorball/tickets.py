@@ -0,0 +1,120 @@
+"""号码模型：Ticket / Draw 及其 uint64 位掩码编码。"""
+import json, sys
+from array import array
+
+# ====== 位掩码编码 ======
+# 红球 r 占第 r-1 位（共 33 位），蓝球数值放在第 33 位起的高位：
+#   mask = sum(1 << (r-1) for r in reds) | (blue << BLUE_SHIFT)
+# 一注号码对应一个 uint64，可以整批放进 array("Q")。
+BLUE_SHIFT = 33
+RED_MASK = (1 << BLUE_SHIFT) - 1
+_popcount = getattr(int, "bit_count", None) or (lambda x: bin(x).count("1"))
+
+class Ticket:
+    __slots__ = ("reds", "blue", "ts")
+
+    def __init__(self, reds, blue, ts=0.0):
+        self.reds = tuple(reds)
+        self.blue = blue
+        self.ts = ts
+
+    def __repr__(self):
+        return f"Ticket(reds={self.reds!r}, blue={self.blue!r}, ts={self.ts!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Ticket):
+            return NotImplemented
+        return (self.reds, self.blue, self.ts) == (other.reds, other.blue, other.ts)
+
+    __hash__ = None
+
+    def format(self):
+        red_str = " ".join(f"{r:02d}" for r in self.reds)
+        return f"{red_str} | {self.blue:02d}"
+
+    def to_mask(self):
+        m = 0
+        for r in self.reds:
+            m |= 1 << (r - 1)
+        return m | (self.blue << BLUE_SHIFT)
+
+    @classmethod
+    def from_mask(cls, mask, ts=0.0):
+        reds = []
+        m = mask & RED_MASK
+        while m:
+            low = m & -m
+            reds.append(low.bit_length())
+            m ^= low
+        return cls(reds, mask >> BLUE_SHIFT, ts)
+
+def ticket_masks(tickets):
+    """把一批 Ticket 转成 array("Q") 掩码数组。"""
+    return array("Q", [t.to_mask() for t in tickets])
+
+def _dict_from_ticket(t: Ticket):
+    return {"reds": list(t.reds), "blue": t.blue, "ts": t.ts}
+
+def _ticket_from_dict(d):
+    return Ticket(tuple(d["reds"]), d["blue"], d.get("ts", 0.0))
+
+def _json_line(d):
+    return json.dumps(d, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+_POPCOUNT8 = bytes(bin(v).count("1") for v in range(256))
+
+def _lane(i):
+    return i if sys.byteorder == "little" else 7 - i
+
+def parse_ticket(line):
+    """把列表中的一行（Ticket.format() 输出，可带对照后缀）解析回 Ticket，失败返回 None。"""
+    line = line.split("->", 1)[0]
+    if "|" not in line:
+        return None
+    red_part, blue_part = line.split("|", 1)
+    try:
+        reds = tuple(int(x) for x in red_part.split())
+        blue = int(blue_part)
+    except ValueError:
+        return None
+    if len(reds) != 6:
+        return None
+    return Ticket(reds, blue)
+
+class Draw(Ticket):
+    """一期开奖。issue 为期号（如 "2025001"），date 为 "YYYY-MM-DD"，未知时为空串。"""
+    __slots__ = ("issue", "date")
+
+    def __init__(self, issue, reds, blue, date="", ts=0.0):
+        super().__init__(sorted(reds), blue, ts)
+        self.issue = str(issue)
+        self.date = date
+
+    def __repr__(self):
+        return f"Draw(issue={self.issue!r}, reds={self.reds!r}, blue={self.blue!r}, date={self.date!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Draw):
+            return NotImplemented
+        return (self.issue, self.reds, self.blue, self.date) == (other.issue, other.reds, other.blue, other.date)
+
+    __hash__ = None
+
+def _valid_numbers(reds, blue):
+    return (len(reds) == 6 and len(set(reds)) == 6 and all(1 <= r <= 33 for r in reds)
+            and 1 <= blue <= 16)
+
+def _issue_key(issue):
+    return (len(issue), issue)
+
+def _norm_date(text):
+    parts = text.replace("/", "-").replace(".", "-").split("-")
+    if len(parts) != 3 or not all(p.isdigit() for p in parts):
+        return text
+    y, m, d = parts
+    return f"{int(y):04d}-{int(m):02d}-{int(d):02d}"
+
+def _check_numbers(nums, hi, what):
+    for x in nums:
+        if not 1 <= x <= hi:
+            raise ValueError(f"{what}号码超出范围：{x}")
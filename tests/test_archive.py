@@ -0,0 +1,68 @@
+"""二进制历史归档：写入后读回、追加、中断后的截断，以及与内存对照结果一致。"""
+import os, random, tempfile, unittest
+from pathlib import Path
+
+from dualcolorball.archive import HistoryArchive, ts_path, write_archive
+from dualcolorball.compare import prize_summary
+from dualcolorball.tickets import Ticket
+
+def random_tickets(n, seed, ts=0.0):
+    rng = random.Random(seed)
+    return [Ticket(tuple(sorted(rng.sample(range(1, 34), 6))), rng.randint(1, 16), ts + i)
+            for i in range(n)]
+
+def as_tuples(tickets):
+    return [(t.reds, t.blue, t.ts) for t in tickets]
+
+class ArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "history.bin"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_write_read(self):
+        tickets = random_tickets(5000, 1, 1.7e9)
+        self.assertEqual(write_archive(self.path, iter(tickets), chunk=777), len(tickets))
+        with HistoryArchive(self.path) as ar:
+            self.assertEqual(len(ar), len(tickets))
+            self.assertEqual(as_tuples(ar), as_tuples(tickets))
+            self.assertEqual(as_tuples([ar[0], ar[len(ar) - 1]]), as_tuples([tickets[0], tickets[-1]]))
+            self.assertEqual(list(ar.masks(100, 200)), [t.to_mask() for t in tickets[100:200]])
+            self.assertEqual([len(k) for _, k in ar.chunks(2048)], [2048, 2048, 904])
+            win = tickets[3]
+            self.assertEqual(ar.prize_summary(win, chunk=999), prize_summary(win, tickets))
+
+    def test_append_and_torn_tail(self):
+        first, second = random_tickets(300, 2), random_tickets(200, 3, 1000.0)
+        write_archive(self.path, first)
+        with open(ts_path(self.path), "ab") as f:
+            f.write(b"\x01\x02\x03")   # 上次追加中断留下的半条时间戳
+        write_archive(self.path, second, append=True)
+        with HistoryArchive(self.path) as ar:
+            self.assertEqual(as_tuples(ar), as_tuples(first + second))
+        # 两列长度不一致时按短的读取
+        with open(self.path, "ab") as f:
+            f.write(bytes(8 * 3))
+        with HistoryArchive(self.path) as ar:
+            self.assertEqual(len(ar), 500)
+
+    def test_missing_ts_and_bad_magic(self):
+        tickets = random_tickets(10, 4)
+        write_archive(self.path, tickets)
+        os.remove(ts_path(self.path))
+        with HistoryArchive(self.path) as ar:
+            self.assertEqual([(t.reds, t.blue) for t in ar], [(t.reds, t.blue) for t in tickets])
+            self.assertIsNone(ar.ts)
+        self.path.write_bytes(b"NOTMAGIC" + bytes(24))
+        with self.assertRaises(ValueError):
+            HistoryArchive(self.path)
+
+    def test_empty(self):
+        write_archive(self.path, [])
+        with HistoryArchive(self.path) as ar:
+            self.assertEqual((len(ar), list(ar)), (0, []))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""批量对照（compare_many / compare_tiers / prize_summary / score_tickets）与逐注 compare_ticket 对照。"""
+import random, unittest
+from array import array
+
+from dualcolorball.compare import (PRIZE_PAYOUTS, TICKET_PRICE, compare_many, compare_ticket, compare_tiers,
+                                   prize_summary, score_tickets)
+from dualcolorball.tickets import Draw, Ticket, ticket_masks
+
+def random_tickets(n, seed):
+    rng = random.Random(seed)
+    return [Ticket(tuple(sorted(rng.sample(range(1, 34), 6))), rng.randint(1, 16)) for _ in range(n)]
+
+class CompareTest(unittest.TestCase):
+    def setUp(self):
+        self.tickets = random_tickets(3000, 1)
+        # 含红球 33、蓝球 16 以及与某注完全相同的开奖，覆盖最高字节与一等奖
+        self.wins = random_tickets(20, 2) + [Ticket((28, 29, 30, 31, 32, 33), 16), self.tickets[7]]
+
+    def test_compare_many_matches_compare_ticket(self):
+        masks = ticket_masks(self.tickets)
+        for win in self.wins:
+            expect = [compare_ticket(win, t) for t in self.tickets]
+            for arg in (self.tickets, masks, memoryview(masks)):
+                red, blue = compare_many(win, arg)
+                self.assertEqual(list(red), [e["red_hits"] for e in expect])
+                self.assertEqual(list(blue), [e["blue_hit"] for e in expect])
+            self.assertEqual(list(compare_tiers(win, masks)), [e["tier"] for e in expect])
+
+    def test_prize_summary(self):
+        for win in self.wins:
+            expect = [compare_ticket(win, t) for t in self.tickets]
+            counts = [sum(e["tier"] == k for e in expect) for k in range(7)]
+            self.assertEqual(prize_summary(win, self.tickets), {
+                "tickets": len(self.tickets), "counts": counts, "winning": len(self.tickets) - counts[0],
+                "payout": sum(e["payout"] for e in expect), "cost": len(self.tickets) * TICKET_PRICE})
+
+    def test_score_tickets(self):
+        tickets = self.tickets[:300]
+        draws = [Draw(str(i), w.reds, w.blue) for i, w in enumerate(random_tickets(600, 3) + [tickets[0]])]
+        counts = score_tickets(tickets, draws, chunk=128)   # 超过 255 期、跨块，走车道合并的路径
+        for i, t in enumerate(tickets):
+            expect = [0] * 7
+            for d in draws:
+                expect[compare_ticket(d, t)["tier"]] += 1
+            self.assertEqual([counts[k][i] for k in range(7)], expect)
+
+    def test_empty(self):
+        self.assertEqual(compare_many(self.wins[0], array("Q")), (b"", b""))
+        self.assertEqual(prize_summary(self.wins[0], [])["counts"], [0] * 7)
+        self.assertEqual(PRIZE_PAYOUTS[0], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""条件选号的精确计数、全部列出与还原，与 itertools.combinations 暴力枚举对照。"""
+import itertools, unittest
+
+from dualcolorball.generate import _ConditionSampler, count_with_conditions, iter_with_conditions
+from dualcolorball.tickets import Ticket
+
+def brute_reds(red_ranges, odd_count=None, sum_range=None, exclude_reds=()):
+    """逐个检查全部 6 元红球组合：能否拆成各区间要求的个数。"""
+    def fits(reds, ranges):
+        if not ranges:
+            return not reds
+        (a, b, k), rest = ranges[0], ranges[1:]
+        for part in itertools.combinations(reds, k):
+            if all(a <= x <= b for x in part) and fits([x for x in reds if x not in part], rest):
+                return True
+        return False
+    pool = [x for x in range(1, 34) if x not in exclude_reds and any(a <= x <= b for a, b, _ in red_ranges)]
+    res = set()
+    for reds in itertools.combinations(pool, 6):
+        if odd_count is not None and sum(x % 2 for x in reds) != odd_count:
+            continue
+        if sum_range is not None and not sum_range[0] <= sum(reds) <= sum_range[1]:
+            continue
+        if fits(list(reds), list(red_ranges)):
+            res.add(reds)
+    return res
+
+class ConditionTest(unittest.TestCase):
+    def check(self, red_ranges, odd_count=None, sum_range=None, exclude_reds=(), exclude_blues=()):
+        expect = brute_reds(red_ranges, odd_count, sum_range, exclude_reds)
+        args = (red_ranges, odd_count, sum_range, exclude_reds, exclude_blues)
+        n_blues = 16 - len(set(exclude_blues))
+        self.assertEqual(count_with_conditions(*args),
+                         {"total": len(expect) * n_blues, "reds": len(expect), "blues": n_blues})
+        listed = [Ticket.from_mask(m) for masks in iter_with_conditions(*args) for m in masks]
+        self.assertEqual(len(listed), len(expect) * n_blues)
+        self.assertEqual({t.reds for t in listed}, expect)
+        sampler = _ConditionSampler(*args)
+        unranked = {sampler.unrank(r) for r in range(sampler.total)}
+        self.assertEqual(len(unranked), sampler.total)
+        self.assertEqual({reds for reds, _ in unranked}, expect)
+
+    def test_overlapping_ranges(self):
+        self.check([(1, 12, 3), (8, 20, 3)], odd_count=3, exclude_blues=range(5, 17))
+        self.check([(1, 14, 2), (10, 22, 2), (5, 18, 2)], sum_range=(60, 75), exclude_blues=range(3, 17))
+
+    def test_overlapping_ranges_with_exclusions(self):
+        self.check([(1, 16, 4), (12, 26, 2)], odd_count=2, sum_range=(50, 60),
+                   exclude_reds=(3, 13, 14), exclude_blues=range(2, 17))
+
+    def test_disjoint_ranges(self):
+        self.check([(1, 11, 2), (12, 22, 2), (23, 33, 2)], odd_count=3, sum_range=(100, 104),
+                   exclude_blues=range(2, 17))
+
+    def test_whole_range_overlap(self):
+        # 完全重叠的两个区间与不分区间相同
+        self.assertEqual(count_with_conditions([(1, 33, 3), (1, 33, 3)]), count_with_conditions())
+        self.assertEqual(count_with_conditions([(1, 20, 3), (15, 33, 3)])["total"], 11712800)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""TicketIndex 的位图查询与逐注扫描对照，含删除后的编号前移与按存储查询。"""
+import random, tempfile, unittest
+
+from dualcolorball.index import TicketIndex, tickets_overlapping, tickets_with_all, tickets_with_any
+from dualcolorball.records import _append_history, remove_history_at
+from dualcolorball.storage import JsonStorage, current_storage, use_storage
+from dualcolorball.tickets import Ticket
+
+def random_tickets(n, seed):
+    rng = random.Random(seed)
+    return [Ticket(tuple(sorted(rng.sample(range(1, 34), 6))), rng.randint(1, 16)) for _ in range(n)]
+
+def overlap(t, reds):
+    return len(set(t.reds) & set(reds))
+
+class TicketIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tickets = random_tickets(1003, 1)   # 不是 8 的倍数，覆盖补零注
+        self.idx = TicketIndex([t.to_mask() for t in self.tickets[:500]])
+        self.idx.extend([t.to_mask() for t in self.tickets[500:]])
+
+    def check(self, idx, tickets):
+        rng = random.Random(2)
+        for _ in range(20):
+            reds = rng.sample(range(1, 34), rng.randint(1, 8))
+            for k in range(0, 5):
+                self.assertEqual(idx.positions(idx.at_least(reds, k)),
+                                 [i for i, t in enumerate(tickets) if overlap(t, reds) >= k])
+            need, blue = reds[:3], rng.randint(1, 16)
+            self.assertEqual(idx.positions(idx.contains_all(need, blue)),
+                             [i for i, t in enumerate(tickets) if set(need) <= set(t.reds) and t.blue == blue])
+            self.assertEqual(idx.positions(idx.contains_any(reds[:2], [blue]), reverse=True),
+                             [i for i, t in reversed(list(enumerate(tickets)))
+                              if set(reds[:2]) & set(t.reds) or t.blue == blue])
+
+    def test_queries_match_scan(self):
+        self.check(self.idx, self.tickets)
+
+    def test_queries_after_delete(self):
+        tickets = list(self.tickets)
+        for pos in (0, 500, -1, 137):
+            pos %= len(tickets)
+            self.idx.delete(pos)
+            del tickets[pos]
+        self.assertEqual(list(self.idx.masks), [t.to_mask() for t in tickets])
+        self.check(self.idx, tickets)
+
+    def test_dumps_loads(self):
+        back = TicketIndex.loads(self.idx.dumps([1, 2]), [1, 2])
+        self.assertEqual(back.masks, self.idx.masks)
+        self.assertEqual((back.reds, back.blues), (self.idx.reds, self.idx.blues))
+        self.assertIsNone(TicketIndex.loads(self.idx.dumps([1, 2]), [1, 3]))
+
+class StorageQueryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.old = current_storage()
+        use_storage(JsonStorage(self.tmp.name))
+
+    def tearDown(self):
+        use_storage(self.old if self.old is not None else JsonStorage(self.tmp.name))
+        self.tmp.cleanup()
+
+    def test_history_queries_match_scan(self):
+        tickets = random_tickets(400, 3)
+        _append_history(tickets[:300])
+        tickets_with_all([1])   # 先建好索引，之后的追加与删除走增量维护
+        _append_history(tickets[300:])
+        remove_history_at(10, tickets[-11])
+        del tickets[-11]
+        newest_first = tickets[::-1]
+        for reds, k in (((1, 2, 3, 4, 5, 6), 2), (tickets[5].reds, 6), ((7, 14, 21, 28), 1)):
+            self.assertEqual(tickets_overlapping(reds, k), [t for t in newest_first if overlap(t, reds) >= k])
+        self.assertEqual(tickets_with_any((), (9,), limit=5), [t for t in newest_first if t.blue == 9][:5])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""号码编号 rank / unrank 的往返与顺序，以及 TicketBitmap。"""
+import itertools, random, unittest
+
+from dualcolorball.ranking import (RED_TOTAL, TOTAL, TicketBitmap, rank, rank_mask, unrank, unrank_mask)
+from dualcolorball.tickets import Ticket, RED_MASK
+
+class RankTest(unittest.TestCase):
+    def test_round_trip(self):
+        rng = random.Random(1)
+        for r in [0, 1, 15, 16, TOTAL - 1] + [rng.randrange(TOTAL) for _ in range(5000)]:
+            reds, blue = unrank(r)
+            self.assertEqual(len(set(reds)), 6)
+            self.assertTrue(all(1 <= x <= 33 for x in reds) and 1 <= blue <= 16)
+            self.assertEqual(rank(reds, blue), r)
+            mask = Ticket(reds, blue).to_mask()
+            self.assertEqual(unrank_mask(r), mask)
+            self.assertEqual(rank_mask(mask), r)
+        self.assertEqual(unrank(0), ((1, 2, 3, 4, 5, 6), 1))
+        self.assertEqual(unrank(TOTAL - 1), ((28, 29, 30, 31, 32, 33), 16))
+        with self.assertRaises(ValueError):
+            unrank(TOTAL)
+
+    def test_red_order_matches_mask_order(self):
+        # 红球编号就是全部组合按红球掩码从小到大排列后的位置（前 2000 个逐一核对）
+        combos = sorted((Ticket(c, 1).to_mask() & RED_MASK
+                         for c in itertools.combinations(range(1, 34), 6)))
+        self.assertEqual(len(combos), RED_TOTAL)
+        rng = random.Random(2)
+        for i in list(range(2000)) + [rng.randrange(RED_TOTAL) for _ in range(2000)]:
+            self.assertEqual(unrank_mask(i * 16) & RED_MASK, combos[i])
+
+class BitmapTest(unittest.TestCase):
+    def test_add_contains_count(self):
+        rng = random.Random(3)
+        tickets = [Ticket(tuple(sorted(rng.sample(range(1, 34), 6))), rng.randint(1, 16)) for _ in range(3000)]
+        bm = TicketBitmap()
+        bm.add_masks([t.to_mask() for t in tickets])
+        ranks = {rank(t.reds, t.blue) for t in tickets}
+        self.assertEqual(bm.count(), len(ranks))
+        self.assertEqual(bm.n, len(tickets))
+        self.assertTrue(all(bm.has(t) for t in tickets))
+        for _ in range(3000):
+            r = rng.randrange(TOTAL)
+            self.assertEqual(r in bm, r in ranks)
+        other = TicketBitmap()
+        other.add(0)
+        other.add(TOTAL - 1)
+        self.assertEqual((bm | other).count(), len(ranks | {0, TOTAL - 1}))
+        back = TicketBitmap.loads(bm.dumps([7]), [7])
+        self.assertEqual((back.bits, back.n), (bm.bits, bm.n))
+        self.assertIsNone(TicketBitmap.loads(bm.dumps([7]), [8]))
+
+if __name__ == "__main__":
+    unittest.main()
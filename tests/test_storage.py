@@ -0,0 +1,95 @@
+"""JSON 文件后端：历史的追加与按位置删除、收藏操作日志的整理、旧格式文件，以及开奖文件解析。"""
+import json, os, random, tempfile, unittest
+from pathlib import Path
+
+from dualcolorball.records import parse_draws
+from dualcolorball.storage import JsonStorage, migrate_json_to_sqlite
+from dualcolorball.tickets import Ticket
+
+def random_tickets(n, seed):
+    rng = random.Random(seed)
+    return [Ticket(tuple(sorted(rng.sample(range(1, 34), 6))), rng.randint(1, 16), float(i)) for i in range(n)]
+
+def keys(tickets):
+    return [(t.to_mask(), t.ts) for t in tickets]
+
+class JsonStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_history_append_remove(self):
+        st = JsonStorage(self.base)
+        model = random_tickets(500, 1)
+        st.history_append(model[:200])
+        st.history_append(model[200:])
+        rng = random.Random(2)
+        for _ in range(60):
+            pos = rng.randrange(len(model))   # pos 从最新一条数起
+            self.assertTrue(st.history_remove_at(pos, model[-1 - pos]))
+            del model[-1 - pos]
+        self.assertFalse(st.history_remove_at(0, model[0]))   # 号码不符时不删
+        self.assertFalse(st.history_remove_at(len(model)))
+        self.assertEqual(keys(st.iter_history()), keys(model))
+        self.assertEqual(keys(st.history_tail(10)), keys(model[::-1][:10]))
+        self.assertEqual(keys(JsonStorage(self.base).iter_history()), keys(model))
+        self.assertEqual(sorted(os.listdir(self.base)), ["history.jsonl"])   # 没有残留的临时文件
+
+    def test_favorites_log_compaction(self):
+        st = JsonStorage(self.base)
+        model = {}
+        rng = random.Random(3)
+        pool = random_tickets(300, 4)
+        for _ in range(5000):
+            t = rng.choice(pool)
+            if t.to_mask() in model:
+                self.assertTrue(st.favorite_remove(t))
+                del model[t.to_mask()]
+            else:
+                self.assertTrue(st.favorite_add(t))
+                model[t.to_mask()] = t
+        self.assertFalse(st.favorite_add(next(iter(model.values()))))
+        self.assertEqual(keys(st.favorite_list()), keys(model.values()))
+        # 整理过的日志重新加载后内容与顺序不变，且行数远少于操作次数
+        self.assertEqual(keys(JsonStorage(self.base).favorite_list()), keys(model.values()))
+        lines = (self.base / "favorites.jsonl").read_text(encoding="utf-8").count("\n")
+        self.assertLess(lines, 2 * 1000 + 2 * len(model) + 2)
+
+    def test_legacy_files_kept(self):
+        legacy = [{"reds": list(t.reds), "blue": t.blue, "ts": t.ts} for t in random_tickets(30, 5)]
+        text = json.dumps(legacy)
+        (self.base / "history.json").write_text(text, encoding="utf-8")
+        counts = migrate_json_to_sqlite(self.base, self.base / "x.db")
+        self.assertEqual(counts["history"], 30)
+        self.assertEqual(sorted(os.listdir(self.base)), ["history.json", "x.db"])
+        self.assertEqual(len(list(JsonStorage(self.base).iter_history())), 30)
+        self.assertEqual((self.base / "history.json").read_text(encoding="utf-8"), text)
+
+    def test_corrupt_legacy_stops_migration(self):
+        (self.base / "history.json").write_text('[{"reds": [1, 2', encoding="utf-8")
+        with self.assertRaises(ValueError):
+            migrate_json_to_sqlite(self.base, self.base / "x.db")
+        self.assertEqual(sorted(os.listdir(self.base)), ["history.json"])
+
+class ParseDrawsTest(unittest.TestCase):
+    def test_bad_lines_counted(self):
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "d.jsonl"
+            p.write_text('{"issue": "1", "reds": [1, 2, 3, 4, 5, 6], "blue": 7}\nnot json\n[1]\n\n'
+                         '{"issue": "2", "reds": [1, 2, 3, 4, 5, 40], "blue": 7}\n', encoding="utf-8")
+            draws, bad = parse_draws(p)
+            self.assertEqual(([d.issue for d in draws], bad), (["1"], 3))
+            p = Path(d) / "d.json"
+            p.write_text('{"issue": "1"}', encoding="utf-8")
+            self.assertEqual(parse_draws(p), ([], 1))
+            p = Path(d) / "d.csv"
+            p.write_text("期号,日期,号码\n2024001,2024-01-02,01 02 03 04 05 06+07\n2024002,x\n", encoding="utf-8")
+            draws, bad = parse_draws(p)
+            self.assertEqual(([(d.issue, d.date, d.reds, d.blue) for d in draws], bad),
+                             ([("2024001", "2024-01-02", (1, 2, 3, 4, 5, 6), 7)], 1))
+
+if __name__ == "__main__":
+    unittest.main()